@@ -0,0 +1,135 @@
+import time
+import asyncio
+import concurrent.futures
+from config import Config
+from metrics import ANALYSIS_CALLS, ANALYSIS_BATCH_SIZE, ANALYSIS_OVER_BUDGET
+from utils import MovieBotUtils
+from cache import TTLCache
+
+# ===================== TEXT ANALYSIS EXECUTOR =====================
+# Chhote messages event loop pe hi classify hote hain. Bade (ya crafted 4096-char)
+# messages batch karke process/thread pool mein jaate hain taaki baaki chats ke
+# updates ruke nahi. ANALYSIS_EXECUTOR khali ho to sab inline chalta hai.
+
+def analyze_one(text: str, vocab=None):
+    """(quality, validation) — validation sirf JUNK ke liye banta hai.
+    vocab: chat ka custom ChatVocab (None = default lists)
+
+    Har stage linear hai, phir bhi ek message ko ANALYSIS_BUDGET se zyada CPU nahi
+    milta: text ANALYSIS_MAX_CHARS tak kata jaata hai aur scan ke baad budget nikal
+    gaya ho to title check skip ("OVER_BUDGET" — memo nahi hota, group_filter kuch nahi
+    karta). LINK / ABUSE / JUNK scan hamesha poora hota hai; ban chuka JUNK verdict
+    budget se nahi badalta (validation bacha hua linear kaam hai).
+    Budget thread ka CPU time hai, wall clock nahi — GIL ya batch queue ka
+    intezaar kisi message ka verdict nahi badalta."""
+    deadline = time.thread_time() + Config.ANALYSIS_BUDGET
+    text = text[:Config.ANALYSIS_MAX_CHARS]
+    matcher, junk_words = (None, None) if vocab is None else (vocab.matcher, vocab.format_junk)
+
+    quality = MovieBotUtils.check_message_quality(text, matcher, deadline)
+    if quality != "JUNK":
+        return quality, None
+    return quality, MovieBotUtils.validate_movie_format(text, junk_words)
+
+def analyze_batch(jobs: list) -> list:
+    return [analyze_one(text, vocab) for text, vocab in jobs]
+
+class AnalysisExecutor:
+
+    def __init__(self, kind: str, workers: int, threshold: int, batch_size: int, batch_wait: float):
+        self.kind = kind
+        self.workers = workers
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.executor = None
+        self.pending = []
+        self.flush_handle = None
+
+    def _get_executor(self):
+        if self.executor is None and self.kind:
+            if self.kind == "process":
+                self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self.executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="analysis"
+                )
+        return self.executor
+
+    async def analyze(self, text: str, vocab=None):
+        result = await self._analyze(text, vocab)
+        # Metric yahan (parent mein) — process pool ke child ka counter wahin kho jaata
+        if result[0] == "OVER_BUDGET":
+            ANALYSIS_OVER_BUDGET.inc()
+        return result
+
+    async def _analyze(self, text: str, vocab=None):
+        if not self.kind or len(text) < self.threshold:
+            ANALYSIS_CALLS.inc(path="inline")
+            return analyze_one(text, vocab)
+
+        ANALYSIS_CALLS.inc(path="offload")
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self.pending.append((text, vocab, fut))
+        if len(self.pending) >= self.batch_size:
+            self._flush()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.batch_wait, self._flush)
+        return await fut
+
+    def _flush(self):
+        if self.flush_handle:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        ANALYSIS_BATCH_SIZE.observe(len(batch))
+        loop = asyncio.get_running_loop()
+        work = loop.run_in_executor(self._get_executor(), analyze_batch, [(t, v) for t, v, _ in batch])
+
+        def deliver(done):
+            error = done.exception()
+            for i, (text, vocab, fut) in enumerate(batch):
+                if fut.done():
+                    continue
+                if error:
+                    # Pool fail hua to inline fallback, message skip nahi hona chahiye
+                    fut.set_result(analyze_one(text, vocab))
+                else:
+                    fut.set_result(done.result()[i])
+
+        work.add_done_callback(deliver)
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+analysis_executor = AnalysisExecutor(
+    kind=Config.ANALYSIS_EXECUTOR,
+    workers=Config.ANALYSIS_WORKERS,
+    threshold=Config.ANALYSIS_OFFLOAD_CHARS,
+    batch_size=Config.ANALYSIS_BATCH_SIZE,
+    batch_wait=Config.ANALYSIS_BATCH_WAIT,
+)
+
+# Movie groups mein wahi strings ("pushpa 2 movie dedo") din mein sau baar aati hain.
+# (vocab key, exact text) -> (quality, validation). Default lists ka key 0; chat ki custom
+# list badalne pe naya ChatVocab (naya key) banta hai, purani entries LRU se nikal jaati hain.
+# Lambe texts memo nahi hote (kam repeat, zyada memory). Cached validation dict read-only hai.
+# OVER_BUDGET memo nahi hota — woh us waqt ke load ka nateeja hai, text ka nahi; agli baar
+# (kam load pe) wahi text poora classify hoga.
+analysis_memo = TTLCache("analysis_memo", max_size=Config.ANALYSIS_MEMO_SIZE)
+
+async def analyze_message(text: str, vocab=None):
+    if len(text) > Config.ANALYSIS_MEMO_MAX_CHARS:
+        return await analysis_executor.analyze(text, vocab)
+    key = (vocab.key if vocab is not None else 0, text)
+    result = analysis_memo.get(key)
+    if result is None:
+        result = await analysis_executor.analyze(text, vocab)
+        if result[0] != "OVER_BUDGET":
+            analysis_memo.set(key, result)
+    return result
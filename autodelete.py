@@ -0,0 +1,70 @@
+import heapq
+import asyncio
+import itertools
+import logging
+from config import Config
+from metrics import QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+# ===================== SCHEDULED DELETES =====================
+# Pehle har warning / FAQ / notice ke liye ek coroutine `asyncio.sleep(delay)` mein
+# minutes tak padi rehti thi. Ab deletes ek heap mein jaate hain aur sirf ek timer
+# (call_at) sabse pehle wale ke liye laga rehta hai. Jo deletes DELETE_BATCH_WINDOW ke
+# andar due hain woh chat-wise ek delete_messages call mein jaate hain.
+# Pending deletes process memory mein hain — restart pe chale jaate hain (pehle bhi aisa tha).
+
+# Telegram ek delete_messages mein itne ids leta hai
+MAX_DELETE_IDS = 100
+
+class DeleteScheduler:
+
+    def __init__(self, batch_window: float):
+        self.batch_window = batch_window
+        self.heap = []          # (due, seq, client, chat_id, message_id)
+        self.seq = itertools.count()
+        self.timer = None
+        self.timer_at = None
+        QUEUE_DEPTH.set_function(lambda: len(self.heap), queue="scheduled_deletes")
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def schedule(self, client, chat_id, message_id, delay: float):
+        loop = asyncio.get_running_loop()
+        due = loop.time() + delay
+        heapq.heappush(self.heap, (due, next(self.seq), client, chat_id, message_id))
+        if self.timer is None or due < self.timer_at:
+            self._arm(loop)
+
+    def _arm(self, loop):
+        if self.timer:
+            self.timer.cancel()
+        self.timer_at = self.heap[0][0]
+        self.timer = loop.call_at(self.timer_at, self._fire)
+
+    def _fire(self):
+        loop = asyncio.get_running_loop()
+        self.timer = None
+        cutoff = loop.time() + self.batch_window
+        batches = {}
+        while self.heap and self.heap[0][0] <= cutoff:
+            _, _, client, chat_id, message_id = heapq.heappop(self.heap)
+            batches.setdefault((client, chat_id), []).append(message_id)
+        for (client, chat_id), ids in batches.items():
+            for i in range(0, len(ids), MAX_DELETE_IDS):
+                loop.create_task(self._delete(client, chat_id, ids[i:i + MAX_DELETE_IDS]))
+        if self.heap:
+            self._arm(loop)
+
+    async def _delete(self, client, chat_id, ids):
+        try:
+            await client.delete_messages(chat_id, ids)
+        except Exception as e:
+            logger.debug(f"Scheduled delete fail ({chat_id}, {len(ids)} msgs): {e}")
+
+delete_scheduler = DeleteScheduler(batch_window=Config.DELETE_BATCH_WINDOW)
+
+def schedule_delete(client, message, delay: float = Config.AUTO_DELETE_TIME):
+    """`delay` sec baad message delete — koi coroutine wait nahi karti"""
+    delete_scheduler.schedule(client, message.chat.id, message.id, delay)
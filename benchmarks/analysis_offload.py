@@ -0,0 +1,81 @@
+"""Crafted 4096-char spam ke neeche event loop lag: inline vs thread vs process.
+
+    python -m benchmarks.analysis_offload --messages 400
+    python -m benchmarks.analysis_offload --check
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+import benchmarks.fakes  # noqa: F401  (dummy env)
+from analysis import AnalysisExecutor
+
+def crafted_spam(count: int, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+    words = ["kalki", "pushpa", "movie", "hindi", "zz", "abc", "2024", "s01", "ep02", "the"]
+    out = []
+    for _ in range(count):
+        text = " ".join(rnd.choice(words) for _ in range(900))[:4095] + "!"
+        out.append(text)
+    return out
+
+async def measure(kind: str, texts: list, workers: int) -> dict:
+    executor = AnalysisExecutor(kind, workers, threshold=512, batch_size=16, batch_wait=0.005)
+    lags = []
+    stop = False
+
+    async def sampler():
+        while not stop:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(max(0.0, time.perf_counter() - start - 0.01))
+
+    task = asyncio.create_task(sampler())
+    start = time.perf_counter()
+    verdicts = await asyncio.gather(*[executor.analyze(t) for t in texts])
+    elapsed = time.perf_counter() - start
+    stop = True
+    await task
+    executor.shutdown()
+
+    lags.sort()
+    return {
+        "executor": kind or "inline",
+        "elapsed_s": round(elapsed, 3),
+        "max_lag_ms": round(lags[-1] * 1000, 1) if lags else 0,
+        "p99_lag_ms": round(lags[int(0.99 * (len(lags) - 1))] * 1000, 1) if lags else 0,
+        "verdicts": verdicts,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analysis offload event loop lag")
+    parser.add_argument("--messages", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-lag-ms", type=float, default=100.0, help="--check: offload pe p99 loop lag budget")
+    parser.add_argument("--check", action="store_true",
+                        help="offload pe loop lag budget se upar ho ya verdict inline se alag ho to exit code 1")
+    args = parser.parse_args(argv)
+
+    texts = crafted_spam(args.messages)
+    results = []
+    for kind in ("", "thread", "process"):
+        result = asyncio.run(measure(kind, texts, args.workers))
+        verdicts = result.pop("verdicts")
+        # repr se compare — MovieQuery mein __eq__ nahi hai
+        result["verdict_mismatch"] = 0 if not results else sum(
+            1 for a, b in zip(verdicts, results[0][1]) if repr(a) != repr(b)
+        )
+        results.append((result, verdicts))
+        print(result)
+
+    if args.check:
+        ok = all(
+            r["p99_lag_ms"] < args.max_lag_ms and r["verdict_mismatch"] == 0
+            for r, _ in results[1:]
+        )
+        sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
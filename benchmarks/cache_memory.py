@@ -0,0 +1,73 @@
+"""TTLCache memory aur speed check: millions of unique keys daalo, memory flat rehni chahiye.
+
+    python -m benchmarks.cache_memory --keys 2000000 --max-size 10000
+    python -m benchmarks.cache_memory --check   # memory badhi to exit code 1
+"""
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+
+import benchmarks.fakes  # noqa: F401  (dummy env)
+from cache import TTLCache
+
+def fill(cache: TTLCache, keys: int, checkpoints: int) -> list:
+    """[(keys inserted, traced bytes)] har checkpoint pe"""
+    samples = []
+    step = max(1, keys // checkpoints)
+    for i in range(keys):
+        cache.set(("user", i), {"i": i})
+        cache.get(("user", i - 7))
+        if (i + 1) % step == 0:
+            samples.append((i + 1, tracemalloc.get_traced_memory()[0]))
+    return samples
+
+async def coalescing(concurrency: int) -> int:
+    """Ek key pe `concurrency` callers, loader sirf ek baar chalna chahiye"""
+    cache = TTLCache("bench_coalesce", max_size=10)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    await asyncio.gather(*[cache.get_or_load("k", loader) for _ in range(concurrency)])
+    return calls
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=2_000_000)
+    parser.add_argument("--max-size", type=int, default=10_000)
+    parser.add_argument("--ttl", type=float, default=60)
+    parser.add_argument("--tolerance", type=float, default=0.1, help="warm-up ke baad allowed growth")
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args(argv)
+
+    cache = TTLCache("bench", max_size=args.max_size, ttl=args.ttl)
+    tracemalloc.start()
+    start = time.perf_counter()
+    samples = fill(cache, args.keys, checkpoints=10)
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    for n, used in samples:
+        print(f"{n:>10,} keys  {used / 1024:10.1f} KiB")
+    # Pehla checkpoint warm-up (cache full hone tak), uske baad flat hona chahiye
+    baseline = samples[1][1] if len(samples) > 1 else samples[0][1]
+    peak = max(used for _, used in samples[1:]) if len(samples) > 1 else baseline
+    growth = (peak - baseline) / baseline if baseline else 0.0
+    print(f"size={len(cache)}  growth after warm-up={growth:.1%}  "
+          f"{elapsed / args.keys * 1e6:.2f} us/op (tracemalloc on)")
+    print(f"stats: {cache.stats()}")
+
+    calls = asyncio.run(coalescing(1000))
+    print(f"get_or_load: 1000 concurrent callers -> {calls} load")
+
+    if args.check and (growth > args.tolerance or len(cache) > args.max_size or calls != 1):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
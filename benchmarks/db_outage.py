@@ -0,0 +1,177 @@
+"""Mongo outage ke dauran hot path: degraded mode kaam karta hai ya nahi.
+
+Asli `bot.group_filter` ko fake Mongo ke saath paanch phases mein chalata hai:
+healthy -> down (har op error) -> slow (har op deadline se zyada atakta hai, op lagta nahi)
+-> lagging (write lag jaata hai par jawab deadline ke baad aata hai) -> recovered.
+Lagging phase mein timeout hua write Mongo mein ho chuka hai — replay use dobara na gine.
+Har phase ki latency aur moderation actions report hote hain, phir check hota hai ki
+recover hone ke baad journal replay hua aur Mongo ka warnings/settings state wahi hai
+jo bot ne degraded mode mein maana tha.
+
+    python -m benchmarks.db_outage
+    python -m benchmarks.db_outage --messages 2000 --stall 0.5 --check
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from benchmarks.fakes import FakeClient, FakeMongo, make_group_message
+from benchmarks.hot_path import generate_traffic, percentile
+
+async def run(messages_per_phase: int, deadline: float, cooldown: float, stall: float,
+              concurrency: int, chats: int, users: int) -> dict:
+    import bot
+    import database
+    from utils import MovieBotUtils
+
+    client = FakeClient()
+    mongo = FakeMongo().install()
+    bot.app = client
+    database.breaker.deadline = deadline
+    database.breaker.cooldown = cooldown
+
+    async def no_ai(query, context=""):
+        return None
+
+    async def no_omdb(name, year=None):
+        return {"found": False, "text": "", "poster": None, "title": ""}
+
+    async def no_delete(client, message, delay=0):
+        return None
+
+    MovieBotUtils.get_ai_response = staticmethod(no_ai)
+    MovieBotUtils.get_omdb_info = staticmethod(no_omdb)
+    MovieBotUtils.auto_delete_message = staticmethod(no_delete)
+
+    texts = generate_traffic("spam", messages_per_phase * 5)
+    msg_ids = iter(range(1, len(texts) + 1))
+    errors = []
+
+    async def phase(name: str, batch: list) -> dict:
+        calls_before = sum(client.calls.values())
+        latencies = []
+        queue = iter(batch)
+
+        async def worker():
+            for i, text in queue:
+                message = make_group_message(client, -100 - (i % chats), 1000 + (i * 7919) % users,
+                                             text, next(msg_ids))
+                start = time.perf_counter()
+                try:
+                    await bot.group_filter(client, message)
+                except Exception as e:
+                    errors.append(f"{name}: {e!r}")
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        ordered = sorted(latencies)
+        return {
+            "elapsed_s": round(time.perf_counter() - start, 3),
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0,
+            "moderation_calls": sum(client.calls.values()) - calls_before,
+            "breaker": database.breaker.state,
+            "journal": len(database.journal),
+        }
+
+    async def drain():
+        """Breaker band hone do aur journal replay khatam hone do"""
+        await asyncio.sleep(cooldown)
+        for _ in range(200):
+            if not len(database.journal) and database.breaker.state == "closed":
+                break
+            try:
+                # Cache wale reads Mongo tak nahi jaate — seedha breaker se probe
+                await database.breaker.call(mongo.admin.command, "ping")
+            except database.DBUnavailable:
+                pass
+            await asyncio.sleep(0.01)
+
+    toggled = -100
+
+    chunks = [list(enumerate(texts))[i::5] for i in range(5)]
+    result = {"phases": {}}
+
+    result["phases"]["healthy"] = await phase("healthy", chunks[0])
+
+    mongo.down = True
+    result["phases"]["down"] = await phase("down", chunks[1])
+    # Admin ne outage ke beech setting badli
+    expected_spelling = not (await database.get_settings(toggled)).get("spelling_on", True)
+    await database.toggle_setting(toggled, "spelling_on")
+
+    mongo.down = False
+    mongo.stall = stall
+    result["phases"]["slow"] = await phase("slow", chunks[2])
+
+    mongo.stall = 0.0
+    await drain()
+    mongo.lag = stall
+    # Breaker band hai, to pehla warning Mongo tak jaata hai, lagta hai aur timeout hota hai
+    for _ in range(3):
+        await database.add_warning(-100, 999)
+    result["phases"]["lagging"] = await phase("lagging", chunks[3])
+
+    mongo.lag = 0.0
+    await asyncio.sleep(stall)
+    result["phases"]["recovered"] = await phase("recovered", chunks[4])
+    await drain()
+
+    # Mongo state vs bot ka maana hua state
+    mismatches = 0
+    warnings = mongo.collections["warnings_col"].docs.values()
+    stored = {(w["chat_id"], w["user_id"]): w["count"] for w in warnings}
+    for key, value in list(database.snapshot.data.items()):
+        if key[0] == "warnings" and stored.get(key[1:], 0) != value[1]:
+            mismatches += 1
+    for (chat_id, user_id), count in stored.items():
+        if database.snapshot.peek(("warnings", chat_id, user_id)) is None:
+            mismatches += 1
+    setting = mongo.collections["settings_col"].docs.get(toggled, {}).get("spelling_on")
+
+    result.update({
+        "journal_left": len(database.journal),
+        "journal_dropped": database.journal.dropped,
+        "failed_db_ops": mongo.failed_ops,
+        "warning_mismatches": mismatches,
+        "toggle_persisted": setting == expected_spelling,
+        "handler_errors": len(errors),
+    })
+    if errors:
+        result["first_errors"] = errors[:3]
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mongo outage / degraded mode benchmark")
+    parser.add_argument("--messages", type=int, default=1000, help="messages per phase")
+    parser.add_argument("--deadline", type=float, default=0.05, help="per-op deadline (sec)")
+    parser.add_argument("--cooldown", type=float, default=0.2, help="breaker cooldown (sec)")
+    parser.add_argument("--stall", type=float, default=0.2, help="slow phase mein har op ki atak (sec)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--check", action="store_true", help="degraded mode fail ho to exit code 1")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run(args.messages, args.deadline, args.cooldown, args.stall,
+                             args.concurrency, args.chats, args.users))
+    print(json.dumps(result, indent=2))
+
+    if args.check:
+        phases = result["phases"]
+        ok = (
+            result["handler_errors"] == 0
+            and result["journal_left"] == 0
+            and result["warning_mismatches"] == 0
+            and result["toggle_persisted"]
+            and phases["down"]["moderation_calls"] > 0
+            and phases["down"]["p99_ms"] < args.deadline * 1000 * 2
+        )
+        sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
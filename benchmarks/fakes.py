@@ -0,0 +1,397 @@
+"""Offline benchmarks ke liye fake Telegram client aur in-memory Mongo.
+
+Dono har call/op ko ginte hain taaki benchmark "API calls per message" aur
+"DB ops per message" report kar sake. Koi network access nahi hota.
+"""
+import os
+import asyncio
+import datetime
+import itertools
+import random
+from collections import Counter
+
+# bot/database import se pehle dummy config (motor lazily connect karta hai)
+os.environ.setdefault("MONGO_DB_URL", "mongodb://localhost:27017")
+os.environ.setdefault("API_ID", "1")
+os.environ.setdefault("API_HASH", "bench")
+os.environ.setdefault("BOT_TOKEN", "1:bench")
+
+from pymongo.errors import DuplicateKeyError, ServerSelectionTimeoutError
+from pyrogram.enums import ChatMemberStatus, ChatType, ParseMode
+from pyrogram.types import Chat, User, Message
+
+# ===================== IN-MEMORY MONGO =====================
+
+def _matches(doc: dict, query: dict) -> bool:
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(_matches(doc, q) for q in cond):
+                return False
+            continue
+        value = doc.get(key)
+        if isinstance(cond, dict) and any(k.startswith("$") for k in cond):
+            for op, arg in cond.items():
+                if op == "$lt" and not (value is not None and value < arg):
+                    return False
+                if op == "$lte" and not (value is not None and value <= arg):
+                    return False
+                if op == "$gt" and not (value is not None and value > arg):
+                    return False
+                if op == "$gte" and not (value is not None and value >= arg):
+                    return False
+                if op == "$in" and value not in arg:
+                    return False
+                if op == "$ne" and value == arg:
+                    return False
+                if op == "$exists" and (key in doc) != bool(arg):
+                    return False
+        elif value != cond:
+            return False
+    return True
+
+def _eval(doc: dict, expr):
+    """Update pipeline expressions ka chhota subset: "$field", "$$REMOVE", $ifNull, $eq, $cond,
+    $in, $add, $concatArrays, $slice"""
+    if expr == "$$REMOVE":
+        return expr
+    if isinstance(expr, str) and expr.startswith("$"):
+        return doc.get(expr[1:])
+    if isinstance(expr, dict) and len(expr) == 1:
+        op, args = next(iter(expr.items()))
+        if op == "$ifNull":
+            value = _eval(doc, args[0])
+            return _eval(doc, args[1]) if value is None else value
+        if op == "$eq":
+            return _eval(doc, args[0]) == _eval(doc, args[1])
+        if op == "$cond":
+            return _eval(doc, args[1]) if _eval(doc, args[0]) else _eval(doc, args[2])
+        if op == "$in":
+            return _eval(doc, args[0]) in _eval(doc, args[1])
+        if op == "$add":
+            return sum(_eval(doc, a) for a in args)
+        if op == "$concatArrays":
+            return [x for a in args for x in _eval(doc, a)]
+        if op == "$slice":
+            items, n = _eval(doc, args[0]), args[1]
+            return items[n:] if n < 0 else items[:n]
+    return expr
+
+def _apply_update(doc: dict, update, inserting: bool):
+    if isinstance(update, list):
+        for step in update:
+            # Ek stage ke sab fields stage se pehle wale doc pe evaluate hote hain
+            before = dict(doc)
+            for k, expr in step.get("$set", {}).items():
+                value = _eval(before, expr)
+                if value == "$$REMOVE":
+                    doc.pop(k, None)
+                else:
+                    doc[k] = value
+        return
+    for op, fields in update.items():
+        if op == "$set":
+            doc.update(fields)
+        elif op == "$setOnInsert" and inserting:
+            doc.update(fields)
+        elif op == "$unset":
+            for k in fields:
+                doc.pop(k, None)
+        elif op == "$inc":
+            for k, v in fields.items():
+                doc[k] = doc.get(k, 0) + v
+        elif op == "$addToSet":
+            for k, v in fields.items():
+                doc.setdefault(k, [])
+                if v not in doc[k]:
+                    doc[k].append(v)
+        elif op == "$pull":
+            for k, v in fields.items():
+                doc[k] = [x for x in doc.get(k, []) if x != v]
+
+class _Result:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def batch_size(self, n):
+        return self
+
+    def sort(self, key, direction=1):
+        self._docs = sorted(self._docs, key=lambda d: d.get(key), reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self._docs = self._docs[:n] if n else self._docs
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self._docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return dict(next(self._iter))
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        return [dict(d) for d in self._docs[:length]]
+
+class FakeCollection:
+    _ids = itertools.count(1)
+
+    def __init__(self, name: str, ops: Counter, latency: float = 0.0, faults=None):
+        self.name = name
+        self.docs = {}
+        self.ops = ops
+        self.latency = latency
+        self.faults = faults
+
+    async def _op(self, kind: str):
+        self.ops[f"{self.name}.{kind}"] += 1
+        if self.faults:
+            await self.faults.inject()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def _applied(self):
+        """Write lag chuka; ab jawab atakta hai (client timeout dekhe, Mongo mein change ho chuka)"""
+        if self.faults and self.faults.lag:
+            await asyncio.sleep(self.faults.lag)
+
+    def _find(self, query: dict) -> list:
+        if "_id" in query and not isinstance(query["_id"], dict):
+            doc = self.docs.get(query["_id"])
+            return [doc] if doc is not None and _matches(doc, query) else []
+        return [d for d in self.docs.values() if _matches(d, query)]
+
+    async def find_one(self, query: dict, projection=None, sort=None):
+        await self._op("find_one")
+        found = self._find(query)
+        for key, direction in reversed(sort or []):
+            found = sorted(found, key=lambda d: d.get(key) or 0, reverse=direction < 0)
+        return dict(found[0]) if found else None
+
+    def find(self, query: dict = None, projection=None):
+        self.ops[f"{self.name}.find"] += 1
+        return FakeCursor(self._find(query or {}))
+
+    async def insert_one(self, doc: dict):
+        await self._op("insert_one")
+        doc = dict(doc)
+        doc.setdefault("_id", next(self._ids))
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("duplicate _id")
+        self.docs[doc["_id"]] = doc
+        return _Result(inserted_id=doc["_id"])
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        await self._op("update_one")
+        result = self._update_one(query, update, upsert)
+        await self._applied()
+        return result
+
+    def _update_one(self, query: dict, update: dict, upsert: bool):
+        found = self._find(query)
+        if found:
+            _apply_update(found[0], update, inserting=False)
+            return _Result(matched_count=1, modified_count=1, upserted_id=None)
+        if upsert:
+            doc = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+            if doc.get("_id") in self.docs:
+                raise DuplicateKeyError("duplicate _id")
+            doc.setdefault("_id", next(self._ids))
+            _apply_update(doc, update, inserting=True)
+            self.docs[doc["_id"]] = doc
+            return _Result(matched_count=0, modified_count=0, upserted_id=doc["_id"])
+        return _Result(matched_count=0, modified_count=0, upserted_id=None)
+
+    async def find_one_and_update(self, query: dict, update: dict, upsert: bool = False,
+                                  return_document=None, projection=None):
+        await self._op("find_one_and_update")
+        result = self._find_one_and_update(query, update, upsert)
+        await self._applied()
+        return result
+
+    def _find_one_and_update(self, query: dict, update: dict, upsert: bool):
+        found = self._find(query)
+        if found:
+            _apply_update(found[0], update, inserting=False)
+            return dict(found[0])
+        if upsert:
+            doc = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+            if doc.get("_id") in self.docs:
+                raise DuplicateKeyError("duplicate _id")
+            doc.setdefault("_id", next(self._ids))
+            _apply_update(doc, update, inserting=True)
+            self.docs[doc["_id"]] = doc
+            return dict(doc)
+        return None
+
+    async def bulk_write(self, requests: list, ordered: bool = True):
+        """Sirf UpdateOne (upsert) — ek hi op gina jaata hai, jaise asli Mongo mein"""
+        await self._op("bulk_write")
+        for req in requests:
+            found = self._find(req._filter)
+            if found:
+                _apply_update(found[0], req._doc, inserting=False)
+            elif req._upsert:
+                doc = {k: v for k, v in req._filter.items() if not k.startswith("$")}
+                _apply_update(doc, req._doc, inserting=True)
+                self.docs[doc["_id"]] = doc
+        return _Result(upserted_count=len(requests))
+
+    async def delete_one(self, query: dict):
+        await self._op("delete_one")
+        found = self._find(query)
+        if found:
+            del self.docs[found[0]["_id"]]
+        await self._applied()
+        return _Result(deleted_count=len(found[:1]))
+
+    async def delete_many(self, query: dict):
+        await self._op("delete_many")
+        found = self._find(query)
+        for d in found:
+            del self.docs[d["_id"]]
+        return _Result(deleted_count=len(found))
+
+    async def count_documents(self, query: dict):
+        await self._op("count_documents")
+        return len(self._find(query))
+
+    async def create_index(self, *args, **kwargs):
+        return "index"
+
+class FakeAdmin:
+    def __init__(self, db):
+        self.db = db
+
+    async def command(self, name, *args, **kwargs):
+        await self.db.ops_sleep()
+        return {"ok": 1}
+
+class FakeMongo:
+    """database.py ke sab *_col globals ko in-memory collections se badal deta hai.
+
+    Outage simulate karne ke liye: `down = True` (har op ServerSelectionTimeoutError),
+    `stall = 5.0` (har op itna extra atakta hai, op lagne se pehle), `lag = 5.0` (write lag
+    jaata hai, phir jawab itna atakta hai — "applied but timed out"), ya `fail_rate = 0.3`
+    (random ops fail).
+    """
+
+    def __init__(self, latency: float = 0.0, seed: int = 0):
+        self.ops = Counter()
+        self.latency = latency
+        self.collections = {}
+        self.admin = FakeAdmin(self)
+        self.down = False
+        self.stall = 0.0
+        self.lag = 0.0
+        self.fail_rate = 0.0
+        self.failed_ops = 0
+        self._rnd = random.Random(seed)
+
+    async def inject(self):
+        if self.stall:
+            await asyncio.sleep(self.stall)
+        if self.down or (self.fail_rate and self._rnd.random() < self.fail_rate):
+            self.failed_ops += 1
+            raise ServerSelectionTimeoutError("fake mongo down")
+
+    async def ops_sleep(self):
+        await self.inject()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def install(self):
+        import database
+        for name in dir(database):
+            if name.endswith("_col"):
+                col = FakeCollection(name, self.ops, self.latency, faults=self)
+                self.collections[name] = col
+                setattr(database, name, col)
+        database.client = self
+        return self
+
+    @property
+    def total_ops(self) -> int:
+        return sum(self.ops.values())
+
+# ===================== FAKE TELEGRAM CLIENT =====================
+
+class FakeChatMember:
+    def __init__(self, status):
+        self.status = status
+
+class FakeClient:
+    """Pyrogram Client ke sirf woh methods jo handlers use karte hain; har call ginta hai"""
+
+    def __init__(self, api_latency: float = 0.0, admins=()):
+        self.calls = Counter()
+        self.api_latency = api_latency
+        self.admins = set(admins)
+        self.parse_mode = ParseMode.DEFAULT
+        self.is_connected = True
+        self.me = User(id=777, first_name="Bench", username="bench_bot", is_self=True, is_bot=True)
+        self._msg_ids = itertools.count(10_000_000)
+
+    async def _call(self, method: str):
+        self.calls[method] += 1
+        if self.api_latency:
+            await asyncio.sleep(self.api_latency)
+
+    def _message(self, chat_id: int, text: str = "") -> Message:
+        chat = Chat(id=chat_id, type=ChatType.SUPERGROUP, title="Bench Group", client=self)
+        return Message(id=next(self._msg_ids), chat=chat, text=text, client=self,
+                       date=datetime.datetime.now())
+
+    async def get_me(self):
+        await self._call("get_me")
+        return self.me
+
+    async def get_chat_member(self, chat_id, user_id):
+        await self._call("get_chat_member")
+        status = ChatMemberStatus.ADMINISTRATOR if user_id in self.admins else ChatMemberStatus.MEMBER
+        return FakeChatMember(status)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        await self._call("send_message")
+        return self._message(chat_id, text)
+
+    async def send_photo(self, chat_id, photo, caption="", **kwargs):
+        await self._call("send_photo")
+        return self._message(chat_id, caption)
+
+    async def edit_message_text(self, chat_id, message_id, text, **kwargs):
+        await self._call("edit_message_text")
+        return self._message(chat_id, text)
+
+    async def delete_messages(self, chat_id, message_ids, revoke=True):
+        await self._call("delete_messages")
+        return len(message_ids) if isinstance(message_ids, (list, range)) else 1
+
+    async def restrict_chat_member(self, chat_id, user_id, permissions, until_date=None):
+        await self._call("restrict_chat_member")
+        return True
+
+    async def ban_chat_member(self, chat_id, user_id, until_date=None):
+        await self._call("ban_chat_member")
+        return True
+
+    async def send_chat_action(self, chat_id, action):
+        await self._call("send_chat_action")
+        return True
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+def make_group_message(client: FakeClient, chat_id: int, user_id: int, text: str, msg_id: int) -> Message:
+    chat = Chat(id=chat_id, type=ChatType.SUPERGROUP, title=f"Group {chat_id}", client=client)
+    user = User(id=user_id, first_name=f"User{user_id}", client=client)
+    return Message(id=msg_id, chat=chat, from_user=user, text=text, client=client,
+                   date=datetime.datetime.now())
@@ -0,0 +1,86 @@
+"""Flood detector: burst / duplicate / copy-paste wave sach mein pakde jaate hain ya nahi.
+
+Pehle detector pe seedha scenarios chalte hain (FLOOD, DUPLICATE, WAVE, aur normal
+baatcheet pe koi hit nahi), phir asli `bot.group_filter` pe ek user ka instant burst —
+moderation (delete / warning) hona chahiye.
+
+    python -m benchmarks.flood_burst
+    python -m benchmarks.flood_burst --check
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from benchmarks.fakes import FakeClient, FakeMongo, make_group_message
+from flood import FloodDetector
+
+# time.monotonic() jaisa bada base — chhote `now` pe idle sweep wale bugs chhup jaate hain
+T0 = 50000.0
+
+def detector_scenarios() -> dict:
+    results = {}
+
+    d = FloodDetector()
+    hits = [d.check(-1, 1, f"msg {i}", now=T0 + i * 0.1) for i in range(d.max_msgs)]
+    results["burst"] = hits[-1]
+    results["tracked_chats"] = len(d.chats)
+
+    d = FloodDetector()
+    hits = [d.check(-1, 1, "movie dedo", now=T0 + i) for i in range(d.dup_limit)]
+    results["duplicate"] = hits[-1]
+
+    d = FloodDetector()
+    text = "join karo sab log yaha free movies milti hain roz"
+    hits = [d.check(-1, 100 + u, text, now=T0 + u) for u in range(d.wave_users)]
+    results["wave"] = hits[-1]
+
+    d = FloodDetector()
+    hits = [d.check(-1, 1 + i % 3, f"kal {i} baje aana", now=T0 + i * 5) for i in range(30)]
+    results["normal_hits"] = sum(1 for h in hits if h)
+
+    return results
+
+async def pipeline_burst(messages: int) -> dict:
+    import bot
+    from utils import MovieBotUtils
+
+    client = FakeClient()
+    FakeMongo().install()
+    bot.app = client
+
+    async def no_delete(client, message, delay=0):
+        return None
+
+    MovieBotUtils.auto_delete_message = staticmethod(no_delete)
+
+    for i in range(messages):
+        message = make_group_message(client, -500, 4242, f"Kalki 2898 AD part {i}", i + 1)
+        await bot.group_filter(client, message)
+    return {"messages": messages, "deleted": client.calls["delete_messages"],
+            "warnings": client.calls["send_message"]}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flood detector burst check")
+    parser.add_argument("--messages", type=int, default=20, help="group_filter burst size")
+    parser.add_argument("--check", action="store_true", help="koi scenario na pakda jaaye to exit code 1")
+    args = parser.parse_args(argv)
+
+    result = {"detector": detector_scenarios(), "pipeline": asyncio.run(pipeline_burst(args.messages))}
+    print(json.dumps(result, indent=2))
+
+    if args.check:
+        d, p = result["detector"], result["pipeline"]
+        ok = (
+            d["burst"] == "FLOOD"
+            and d["duplicate"] == "DUPLICATE"
+            and d["wave"] == "WAVE"
+            and d["normal_hits"] == 0
+            and d["tracked_chats"] == 1
+            and p["deleted"] > 0
+            and p["warnings"] > 0
+        )
+        sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Group message hot path ka offline benchmark.
+
+Asli `bot.group_filter` handler ko fake client + in-memory Mongo ke saath chalata hai
+aur throughput, latency percentiles, DB ops/message aur API calls/message report karta hai.
+Har run `benchmarks/results/hot_path.jsonl` mein save hota hai aur pichhle same-config
+run se compare hota hai.
+
+    python -m benchmarks.hot_path --messages 5000 --mix default
+    python -m benchmarks.hot_path --rate 300 --duration 10
+    python -m benchmarks.hot_path --replay traffic.txt --check
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks.fakes import FakeClient, FakeMongo, make_group_message
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# ===================== TRAFFIC =====================
+
+TRAFFIC = {
+    "clean": [
+        "Kalki 2898 AD", "Pushpa 2 The Rule", "Jawan 2023", "Animal", "Stranger Things S04",
+        "The Family Man S02 E05", "Mirzapur S03", "Interstellar", "Oppenheimer 2023", "Gadar 2",
+    ],
+    "junk": [
+        "kalki hindi movie dedo", "pushpa 2 movie dedo bhai", "jawan hd 720p chahiye plz",
+        "mirzapur season 3 all episode bhejo", "animal full movie download link do",
+        "koi stranger things series send karo", "oppenheimer hindi dubbed chahiye yaar",
+    ],
+    "link": [
+        "join karo t.me/freemovies123", "https://bit.ly/xyz free movies", "www.moviesdownload.in pe milegi",
+        "sab movies yaha hai telegram.me/joinchat/abc",
+    ],
+    "abuse": [
+        "bc kab aayegi movie", "admin chutiya hai kya", "mc reply karo", "kya bakwas hai gandu",
+    ],
+    "ai": [
+        "kalki ka climax kaisa laga sabko", "koi achhi thriller batao dekhne ko",
+        "jawan aur pathaan mein kon better hai", "aaj kya dekhu kuch suggest karo",
+    ],
+}
+
+MIXES = {
+    "default": {"clean": 0.35, "junk": 0.35, "link": 0.05, "abuse": 0.05, "ai": 0.20},
+    "clean": {"clean": 1.0},
+    "junk": {"junk": 1.0},
+    "spam": {"link": 0.45, "abuse": 0.45, "junk": 0.10},
+    "ai": {"ai": 1.0},
+}
+
+def generate_traffic(mix: str, count: int, seed: int = 42) -> list:
+    rnd = random.Random(seed)
+    weights = MIXES[mix]
+    kinds = rnd.choices(list(weights), weights=list(weights.values()), k=count)
+    return [rnd.choice(TRAFFIC[k]) for k in kinds]
+
+def load_replay(path: str) -> list:
+    """Ek line = ek message. `kind<TAB>text` format bhi chalega (kind ignore hota hai)."""
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n").split("\t")[-1] for line in f if line.strip()]
+
+# ===================== RUN =====================
+
+def percentile(ordered: list, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def run(texts: list, rate: float, concurrency: int, chats: int, users: int,
+              db_latency: float, api_latency: float) -> dict:
+    import bot
+    from analysis import analysis_memo
+    from utils import MovieBotUtils
+
+    client = FakeClient(api_latency=api_latency)
+    mongo = FakeMongo(latency=db_latency).install()
+    bot.app = client  # is_admin / show_typing module-level app use karte hain
+
+    async def fake_ai(query, context=""):
+        return "🤖 bench reply"
+
+    async def fake_omdb(name, year=None):
+        return {"found": False, "text": "", "poster": None, "title": ""}
+
+    async def no_delete(client, message, delay=0):
+        return None
+
+    MovieBotUtils.get_ai_response = staticmethod(fake_ai)
+    MovieBotUtils.get_omdb_info = staticmethod(fake_omdb)
+    MovieBotUtils.auto_delete_message = staticmethod(no_delete)
+
+    latencies = []
+    messages = [
+        make_group_message(client, -100 - (i % chats), 1000 + (i * 7919) % users, text, i + 1)
+        for i, text in enumerate(texts)
+    ]
+
+    async def handle(message, scheduled: float):
+        await bot.group_filter(client, message)
+        latencies.append(time.perf_counter() - scheduled)
+
+    start = time.perf_counter()
+    if rate > 0:
+        tasks = []
+        for i, message in enumerate(messages):
+            due = start + i / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(handle(message, due)))
+        await asyncio.gather(*tasks)
+    else:
+        queue = iter(messages)
+
+        async def worker():
+            for message in queue:
+                await handle(message, time.perf_counter())
+
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    # Pure CPU classification cost (bina I/O ke)
+    t = time.perf_counter()
+    for text in texts:
+        MovieBotUtils.check_message_quality(text)
+        MovieBotUtils.validate_movie_format(text)
+    classify = time.perf_counter() - t
+
+    ordered = sorted(latencies)
+    n = len(texts)
+    return {
+        "messages": n,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_msg_s": round(n / elapsed, 1) if elapsed else 0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "db_ops_per_msg": round(mongo.total_ops / n, 3),
+        "api_calls_per_msg": round(client.total_calls / n, 3),
+        "classify_us_per_msg": round(classify / n * 1e6, 2),
+        "analysis_memo_hit_rate": analysis_memo.stats()["hit_rate"],
+        "db_ops": dict(mongo.ops.most_common(8)),
+        "api_calls": dict(client.calls.most_common(8)),
+    }
+
+# ===================== RESULTS =====================
+
+def git_version() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
+
+def load_previous(path: str, config: dict):
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            if row.get("config") == config:
+                previous = row
+    return previous
+
+def compare(previous: dict, current: dict, tolerance: float) -> list:
+    """Regressions ki list: (metric, pehle, ab)"""
+    regressions = []
+    for key in ("p95_ms", "p99_ms", "db_ops_per_msg", "api_calls_per_msg", "classify_us_per_msg"):
+        old, new = previous["result"].get(key), current.get(key)
+        if old and new is not None and new > old * (1 + tolerance):
+            regressions.append((key, old, new))
+    old, new = previous["result"].get("throughput_msg_s"), current.get("throughput_msg_s")
+    if old and new < old * (1 - tolerance):
+        regressions.append(("throughput_msg_s", old, new))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="group_filter hot path benchmark")
+    parser.add_argument("--mix", default="default", choices=sorted(MIXES))
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--replay", help="recorded traffic file (ek line = ek message)")
+    parser.add_argument("--rate", type=float, default=0, help="msgs/sec (0 = jitna tez ho sake)")
+    parser.add_argument("--duration", type=float, help="--rate ke saath: itne seconds chalao")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--db-latency", type=float, default=0.0, help="fake Mongo latency per op (sec)")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="fake Telegram latency per call (sec)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="regression threshold (0.2 = 20%%)")
+    parser.add_argument("--check", action="store_true", help="regression mile to exit code 1")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        texts = load_replay(args.replay)
+    else:
+        count = int(args.rate * args.duration) if args.rate and args.duration else args.messages
+        texts = generate_traffic(args.mix, count)
+
+    config = {
+        "source": os.path.basename(args.replay) if args.replay else args.mix,
+        "messages": len(texts), "rate": args.rate, "concurrency": args.concurrency,
+        "chats": args.chats, "users": args.users,
+        "db_latency": args.db_latency, "api_latency": args.api_latency,
+    }
+    result = asyncio.run(run(texts, args.rate, args.concurrency, args.chats, args.users,
+                             args.db_latency, args.api_latency))
+
+    print(json.dumps(result, indent=2))
+
+    path = os.path.join(RESULTS_DIR, "hot_path.jsonl")
+    previous = load_previous(path, config)
+    regressions = compare(previous, result, args.tolerance) if previous else []
+    if previous:
+        print(f"\nCompared with {previous['version']} ({previous['timestamp']}):")
+        for key, old, new in regressions:
+            print(f"  ⚠️ {key}: {old} -> {new}")
+        if not regressions:
+            print("  ✅ no regressions")
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "version": git_version(),
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "config": config,
+                "result": result,
+            }) + "\n")
+
+    if args.check and regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Purana check_message_quality (regex loop) vs naya Aho-Corasick matcher.
+
+Corpus: hot_path ka generated traffic, uske obfuscated variants ("b.c", leetspeak,
+zero-width, repeated letters) aur kuch 4096-char messages.
+
+    python -m benchmarks.quality_matcher --messages 20000
+    python -m benchmarks.quality_matcher --check
+"""
+import argparse
+import random
+import re
+import sys
+import time
+
+import benchmarks.fakes  # noqa: F401  (dummy env)
+from benchmarks.hot_path import generate_traffic
+from utils import MovieBotUtils
+
+def legacy_check_message_quality(text: str) -> str:
+    """Baseline: matcher se pehle wala implementation, as-is"""
+    text_lower = text.lower().strip()
+    link_patterns = [
+        r't\.me/', r'telegram\.me/', r'http://', r'https://',
+        r'www\.', r'\.com', r'\.in', r'\.net', r'\.org', r'\.io',
+        r'joinchat', r'bit\.ly', r'tinyurl'
+    ]
+    for p in link_patterns:
+        if re.search(p, text_lower):
+            return "LINK"
+    abuse_words = [
+        "mc", "bc", "bkl", "chutiya", "kutta", "fuck", "bitch", "porn",
+        "randi", "gand", "lund", "bhosda", "madarchod", "behenchod", "harami",
+        "bsdk", "gandu", "lavde", "motherfucker", "asshole", "bastard"
+    ]
+    words = text_lower.split()
+    for word in abuse_words:
+        if word in words:
+            return "ABUSE"
+    junk_words = [
+        "dedo", "chahiye", "chaiye", "mangta", "bhej", "send", "kardo",
+        "karo", "plz", "pls", "please", "request", "link", "download",
+        "downlod", "movie", "film", "series", "season", "episode", "hd",
+        "480p", "720p", "1080p", "bhai", "bro", "sir", "admin", "yaar",
+        "mujhe", "mereko", "full", "dubbed", "dena", "chahie", "milega"
+    ]
+    for word in junk_words:
+        clean_words = [re.sub(r'[^\w]', '', w) for w in words]
+        if word in clean_words:
+            return "JUNK"
+    clean_pattern = r'^[a-zA-Z0-9\s\-\:\'\&\.]+(?:\s\d{4})?(?:\s?[Ss]\d{1,2})?(?:\s?[Ee][Pp]?\d{1,2})?$'
+    if re.match(clean_pattern, text, re.IGNORECASE):
+        return "CLEAN"
+    return "IGNORE"
+
+OBFUSCATED_ABUSE = [
+    "b.c kab aayegi", "m@darch0d admin", "chuuutiya bot", "behen\u200bchod", "g4ndu hai kya", "ｃｈｕｔｉｙａ",
+]
+
+def corpus(count: int, seed: int = 11) -> list:
+    rnd = random.Random(seed)
+    texts = generate_traffic("default", count, seed)
+    texts += [rnd.choice(OBFUSCATED_ABUSE) for _ in range(count // 20)]
+    words = ["kalki", "pushpa", "hindi", "zz", "abc", "2024", "the", "s01"]
+    texts += [" ".join(rnd.choice(words) for _ in range(900))[:4096] for _ in range(max(1, count // 500))]
+    rnd.shuffle(texts)
+    return texts
+
+def timeit(fn, texts: list) -> float:
+    start = time.perf_counter()
+    for t in texts:
+        fn(t)
+    return time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quality matcher vs legacy regex loop")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--min-speedup", type=float, default=2.0, help="--check: matcher kam se kam itna tez")
+    parser.add_argument("--check", action="store_true",
+                        help="verdict badle, obfuscated abuse chhoote ya speedup kam ho to exit code 1")
+    args = parser.parse_args(argv)
+
+    texts = corpus(args.messages)
+    legacy = timeit(legacy_check_message_quality, texts)
+    new = timeit(MovieBotUtils.check_message_quality, texts)
+
+    plain = [t for t in texts if t not in OBFUSCATED_ABUSE]
+    differ = sum(1 for t in plain if legacy_check_message_quality(t) != MovieBotUtils.check_message_quality(t))
+    caught = sum(1 for t in OBFUSCATED_ABUSE if MovieBotUtils.check_message_quality(t) == "ABUSE")
+    legacy_caught = sum(1 for t in OBFUSCATED_ABUSE if legacy_check_message_quality(t) == "ABUSE")
+
+    n = len(texts)
+    print(f"corpus: {n} messages")
+    print(f"legacy : {legacy / n * 1e6:8.2f} us/msg")
+    print(f"matcher: {new / n * 1e6:8.2f} us/msg  ({legacy / new:.1f}x faster)")
+    print(f"verdict differences on plain traffic: {differ}/{len(plain)}")
+    print(f"obfuscated abuse caught: matcher {caught}/{len(OBFUSCATED_ABUSE)}, legacy {legacy_caught}/{len(OBFUSCATED_ABUSE)}")
+
+    if args.check:
+        ok = differ == 0 and caught == len(OBFUSCATED_ABUSE) and legacy / new >= args.min_speedup
+        sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""MovieQuery parser: golden corpus check + throughput.
+
+Golden corpus (benchmarks/data/golden_queries.jsonl) asli group messages jaisa hai —
+har line pe text aur expected title/year/season/episode/quality/language/key.
+Parser badlo to pehle yeh chalao; jaan-boojh ke behaviour badla ho to corpus update karo.
+Throughput purane validate_movie_format (junk strip + title case) ke against hai, aur
+traffic pe distinct texts vs distinct keys dikhata hai (OMDb cache / dedup kitna share hota hai).
+
+    python -m benchmarks.query_parser
+    python -m benchmarks.query_parser --messages 50000 --check
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import benchmarks.fakes  # noqa: F401  (dummy env)
+from benchmarks.hot_path import generate_traffic
+from titles import parse_query
+from utils import FORMAT_JUNK_WORDS
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "data", "golden_queries.jsonl")
+
+def load_golden(path: str = GOLDEN_PATH) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def legacy_validate_movie_format(text: str, junk_words=FORMAT_JUNK_WORDS) -> dict:
+    """Baseline: parser se pehle wala implementation, as-is"""
+    text_lower = text.lower().strip()
+    languages = {'hindi', 'english', 'tamil', 'telugu', 'malayalam', 'kannada', 'marathi', 'punjabi'}
+    words = text_lower.split()
+    found_junk = []
+    detected_lang = ""
+    clean_words = []
+    for word in words:
+        clean_w = re.sub(r'[^\w]', '', word)
+        if clean_w in junk_words:
+            if clean_w not in found_junk:
+                found_junk.append(clean_w)
+        elif clean_w in languages:
+            detected_lang = clean_w.title()
+        else:
+            clean_words.append(word)
+    clean_text = " ".join(clean_words).title()
+    correct_format = f"{clean_text} [{detected_lang}]" if detected_lang else clean_text
+    return {
+        'is_valid': len(found_junk) == 0,
+        'found_junk': found_junk,
+        'clean_name': clean_text,
+        'correct_format': correct_format,
+        'search_query': clean_text.replace(" ", "+")
+    }
+
+def check_golden(cases: list) -> list:
+    failures = []
+    for case in cases:
+        got = parse_query(case["text"], FORMAT_JUNK_WORDS).as_dict()
+        diff = {k: (v, got.get(k)) for k, v in case["expect"].items() if got.get(k) != v}
+        if diff:
+            failures.append({"text": case["text"], "diff": diff})
+    return failures
+
+def throughput(fn, texts: list) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        fn(text, FORMAT_JUNK_WORDS)
+    return len(texts) / (time.perf_counter() - start)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Movie query parser golden check + throughput")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--check", action="store_true", help="golden mismatch ho to exit code 1")
+    args = parser.parse_args(argv)
+
+    golden = load_golden()
+    failures = check_golden(golden)
+
+    texts = generate_traffic("default", args.messages)
+    texts += [case["text"] for case in golden] * max(1, args.messages // (len(golden) * 10))
+    keys = {parse_query(t, FORMAT_JUNK_WORDS).key for t in texts}
+
+    result = {
+        "golden_cases": len(golden),
+        "golden_failures": len(failures),
+        "messages": len(texts),
+        "parse_query_msgs_per_s": round(throughput(parse_query, texts)),
+        "legacy_validate_msgs_per_s": round(throughput(legacy_validate_movie_format, texts)),
+        "distinct_texts": len(set(texts)),
+        "distinct_keys": len(keys),
+    }
+    if failures:
+        result["first_failures"] = failures[:5]
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    if args.check:
+        sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Worst-case inputs pe per-message analysis cost: purane regex vs linear parser/intent.
+
+Adversarial generators (backtracking traps, leetspeak, zero-width, fullwidth unicode,
+almost-clean titles) aur random fuzz se 4096-char tak ke messages banta hai, phir
+har message pe teen cheezein time hoti hain: purane regex, unki jagah wale linear checks,
+aur poora analysis (analyze_one + DOWNLOAD_HELP intent) jo budget ke andar rehna chahiye.
+Purane regex sirf chhote sizes pe chalte hain — 4096 chars pe intent regex seconds leta hai.
+
+    python -m benchmarks.redos_fuzz
+    python -m benchmarks.redos_fuzz --fuzz 5000 --legacy-max 2048 --check
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+
+import benchmarks.fakes  # noqa: F401  (dummy env)
+from analysis import analyze_one
+from config import Config
+from intents import DOWNLOAD_HELP
+from titles import is_clean_title
+
+LEGACY_CLEAN = re.compile(
+    r'^[a-zA-Z0-9\s\-\:\'\&\.]+(?:\s\d{4})?(?:\s?[Ss]\d{1,2})?(?:\s?[Ee][Pp]?\d{1,2})?$', re.IGNORECASE
+)
+LEGACY_INTENT = re.compile(r'(?i)(how|where|when).*(download|watch|get).*(movie|film|series)')
+
+def _fill(unit: str, n: int, tail: str = "") -> str:
+    return (unit * (n // len(unit) + 1))[:n - len(tail)] + tail
+
+# name -> n -> text
+WORST_CASES = {
+    "intent_how_get": lambda n: _fill("how get ", n),
+    "intent_glued": lambda n: _fill("howdownload", n),
+    "intent_where_watch": lambda n: _fill("where watch when ", n, " mov"),
+    "clean_tags_then_bang": lambda n: _fill("s1 e1 2024 ", n, "!"),
+    "clean_digits_then_emoji": lambda n: _fill("1", n, "🎬"),
+    "clean_title_near_miss": lambda n: _fill("Kalki 2898 AD S01 EP05 ", n, "@"),
+    "leet_repeats": lambda n: _fill("a@", n),
+    "repeated_letter": lambda n: _fill("o", n),
+    "zero_width": lambda n: _fill("b\u200bc\u200d", n),
+    "fullwidth": lambda n: _fill("ｃｈｕｔｉｙａ ", n),
+    "junk_words": lambda n: _fill("movie dedo bhai hd plz ", n),
+}
+
+FUZZ_TOKENS = [
+    "how", "where", "when", "download", "watch", "get", "movie", "film", "series",
+    "s01", "e05", "ep5", "2024", "kalki", "dedo", "plz", "hindi", "-", ":", "'", "&",
+    ".", "@", "!", "🎬", "\u200b", "ｍｏｖｉｅ", "aaaa", "b.c", "t.me/x", "\n",
+]
+
+def fuzz_corpus(count: int, max_len: int, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        size = rnd.choice((16, 64, 256, 1024, max_len))
+        parts, length = [], 0
+        while length < size:
+            token = rnd.choice(FUZZ_TOKENS)
+            parts.append(token)
+            length += len(token) + 1
+        texts.append(" ".join(parts)[:size] if rnd.random() < 0.5 else "".join(parts)[:size])
+    return texts
+
+def legacy_path(text: str):
+    """Purane do regex"""
+    LEGACY_CLEAN.match(text)
+    LEGACY_INTENT.search(text)
+
+def new_path(text: str):
+    """Unki jagah wale linear checks"""
+    is_clean_title(text)
+    DOWNLOAD_HELP.match(text)
+
+def full_path(text: str):
+    """Group message pe poora kaam: analyze_one (Aho-Corasick scan + title + validation) + intent"""
+    analyze_one(text)
+    DOWNLOAD_HELP.match(text)
+
+def cost(fn, text: str, repeat: int = 3) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run(fuzz: int, max_len: int, legacy_max: int) -> dict:
+    sizes = [s for s in (256, 1024, max_len) if s <= max_len]
+    cases = {}
+    for name, make in WORST_CASES.items():
+        row = {}
+        for n in sizes:
+            text = make(n)
+            if n <= legacy_max:
+                row[f"legacy_{n}_us"] = round(cost(legacy_path, text, repeat=1) * 1e6, 1)
+            row[f"new_{n}_us"] = round(cost(new_path, text) * 1e6, 1)
+            row[f"full_{n}_us"] = round(cost(full_path, text) * 1e6, 1)
+        row["growth"] = round(row[f"full_{max_len}_us"] / max(row[f"full_{sizes[0]}_us"], 1.0), 1)
+        cases[name] = row
+
+    fuzz_costs = sorted(cost(full_path, t) for t in fuzz_corpus(fuzz, max_len))
+    worst_case = max(row[f"full_{max_len}_us"] for row in cases.values())
+    return {
+        "budget_us": Config.ANALYSIS_BUDGET * 1e6,
+        "size_ratio": max_len / sizes[0],
+        "worst_case_us": worst_case,
+        "max_growth": max(row["growth"] for row in cases.values()),
+        "fuzz": {
+            "messages": len(fuzz_costs),
+            "p50_us": round(fuzz_costs[len(fuzz_costs) // 2] * 1e6, 1),
+            "p99_us": round(fuzz_costs[int(len(fuzz_costs) * 0.99)] * 1e6, 1),
+            "max_us": round(fuzz_costs[-1] * 1e6, 1),
+        },
+        "cases": cases,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ReDoS / worst-case analysis cost benchmark")
+    parser.add_argument("--fuzz", type=int, default=2000, help="random fuzz messages")
+    parser.add_argument("--max-len", type=int, default=4096)
+    parser.add_argument("--legacy-max", type=int, default=1024,
+                        help="purane regex is length tak hi (4096 pe intent regex ~10s)")
+    parser.add_argument("--check", action="store_true",
+                        help="worst case budget se upar ya length ke saath super-linear ho to exit code 1")
+    args = parser.parse_args(argv)
+
+    result = run(args.fuzz, args.max_len, args.legacy_max)
+    print(json.dumps(result, indent=2))
+
+    if args.check:
+        ok = (
+            result["worst_case_us"] < result["budget_us"]
+            and result["fuzz"]["max_us"] < result["budget_us"]
+            # Linear: 16x bada input ~16x cost; 2x slack noise ke liye
+            and result["max_growth"] < result["size_ratio"] * 2
+        )
+        sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
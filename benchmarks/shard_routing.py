@@ -0,0 +1,175 @@
+"""Multi-worker update routing: har update ek hi baar, apne owner worker pe, order mein.
+
+Ek process mein WORKERS queues (sharding.ShardQueue) banti hain; worker 0 receiver hai
+aur Telegram jaise raw updates (channel messages, private messages, callback queries,
+member updates, bina chat wale deletes) uski queue mein jaate hain. Forward ka transport
+in-process hai par payload wahi raw TL bytes hain jo HTTP pe jaate. Dusre scenario mein
+ek worker down hai — uske updates receiver pe handle hone chahiye, drop nahi.
+Owner worker pe forwarded update ke users/chats dispatch se pehle fetch_peers hone chahiye
+(warna naye user pe reply / mute peer resolve nahi hota).
+
+    python -m benchmarks.shard_routing
+    python -m benchmarks.shard_routing --updates 20000 --check
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from io import BytesIO
+
+import benchmarks.fakes  # noqa: F401  (dummy env)
+from pyrogram import raw
+from pyrogram.raw.core import TLObject
+from sharding import ShardQueue, decode_packets, shard_of
+
+def make_updates(count: int, chats: int) -> list:
+    """(packet, expected_chat_id, seq) — seq se har update pehchana jaata hai"""
+    users = {u: raw.types.User(id=u, first_name=f"user{u}") for u in range(1000, 1050)}
+    out = []
+    for seq in range(count):
+        user_id = 1000 + seq % 50
+        kind = seq % 10
+        if kind < 6:
+            channel = 1500000000 + seq % chats
+            update = raw.types.UpdateNewChannelMessage(
+                message=raw.types.Message(
+                    id=seq, peer_id=raw.types.PeerChannel(channel_id=channel), date=0,
+                    message=f"Kalki 2898 AD {seq}", from_id=raw.types.PeerUser(user_id=user_id)
+                ),
+                pts=seq, pts_count=1
+            )
+            chat_id = int(f"-100{channel}")
+        elif kind < 8:
+            update = raw.types.UpdateNewMessage(
+                message=raw.types.Message(id=seq, peer_id=raw.types.PeerUser(user_id=user_id), date=0,
+                                          message=f"/start {seq}"),
+                pts=seq, pts_count=1
+            )
+            chat_id = user_id
+        elif kind == 8:
+            channel = 1500000000 + seq % chats
+            update = raw.types.UpdateBotCallbackQuery(
+                query_id=seq, user_id=user_id, peer=raw.types.PeerChannel(channel_id=channel),
+                msg_id=seq, chat_instance=0, data=b"settings"
+            )
+            chat_id = int(f"-100{channel}")
+        elif seq % 20 == 9:
+            channel = 1500000000 + seq % chats
+            update = raw.types.UpdateChannelParticipant(
+                channel_id=channel, date=0, actor_id=user_id, user_id=user_id, qts=seq
+            )
+            chat_id = int(f"-100{channel}")
+        else:
+            # Chat nahi pata — receiver khud
+            update = raw.types.UpdateDeleteMessages(messages=[seq], pts=seq, pts_count=1)
+            chat_id = None
+        # Bytes se padha hua — jaise session Telegram se padhta hai (khaali vectors wagairah)
+        update = TLObject.read(BytesIO(update.write()))
+        out.append(((update, {user_id: users[user_id]}, {}), chat_id, seq))
+    return out
+
+def update_seq(update) -> int:
+    for attr in ("message", "query_id", "qts"):
+        value = getattr(update, attr, None)
+        if isinstance(value, int):
+            return value
+        if value is not None and hasattr(value, "id"):
+            return value.id
+    return update.messages[0]
+
+class PeerClient:
+    """Client.fetch_peers ka fake: kaunse peer ids storage tak pahunche"""
+
+    def __init__(self):
+        self.peers = set()
+
+    async def fetch_peers(self, peers):
+        self.peers.update(p.id for p in peers)
+
+async def route(workers: int, updates: list, down: set) -> dict:
+    clients = [PeerClient() for _ in range(workers)]
+    queues = [ShardQueue(i, workers, client=clients[i]) for i in range(workers)]
+
+    async def send(index, body):
+        if index in down:
+            raise ConnectionError("worker down")
+        await asyncio.sleep(0)
+        await queues[index].accept(decode_packets(body))
+
+    receiver = queues[0]
+    receiver.send = send
+    start = time.perf_counter()
+    for packet, _, _ in updates:
+        receiver.put_nowait(packet)
+    while any(not t.done() for t in receiver.senders.values()):
+        await asyncio.gather(*receiver.senders.values())
+    elapsed = time.perf_counter() - start
+
+    expected = {seq: chat_id for _, chat_id, seq in updates}
+    # write() bytes nahi — pyrogram padhe hue object ko dobara same bytes mein nahi likhta
+    originals = {seq: str(packet[0]) for packet, _, seq in updates}
+    seen, lost_body, misrouted, out_of_order, unknown_peers = {}, 0, 0, 0, 0
+    for index, queue in enumerate(queues):
+        last = {}
+        while not queue.empty():
+            update, users, _ = queue.get_nowait()
+            seq = update_seq(update)
+            seen[seq] = seen.get(seq, 0) + 1
+            if str(update) != originals[seq]:
+                lost_body += 1
+            # Receiver ke apne updates ke peers Client.handle_updates fetch karta hai
+            if index != 0 and not set(users) <= clients[index].peers:
+                unknown_peers += 1
+            chat_id = expected[seq]
+            owner = 0 if chat_id is None else shard_of(chat_id, workers)
+            if owner != index and not (owner in down and index == 0):
+                misrouted += 1
+            if chat_id is not None:
+                if seq < last.get(chat_id, -1):
+                    out_of_order += 1
+                last[chat_id] = seq
+
+    return {
+        "workers": workers,
+        "down": sorted(down),
+        "updates": len(updates),
+        "handled": sum(seen.values()),
+        "missing": len(set(expected) - set(seen)),
+        "duplicates": sum(1 for n in seen.values() if n > 1),
+        "misrouted": misrouted,
+        "out_of_order": out_of_order,
+        "payload_mismatch": lost_body,
+        "unknown_peers": unknown_peers,
+        "route_updates_per_s": round(len(updates) / elapsed),
+    }
+
+async def run(count: int, workers: int, chats: int) -> dict:
+    updates = make_updates(count, chats)
+    return {
+        "all_up": await route(workers, updates, down=set()),
+        "worker_down": await route(workers, updates, down={workers - 1}),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-worker update routing check")
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--check", action="store_true", help="koi update kho jaaye / galat jaaye to exit code 1")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run(args.updates, args.workers, args.chats))
+    print(json.dumps(result, indent=2))
+
+    if args.check:
+        ok = all(
+            r["handled"] == r["updates"] and r["missing"] == 0 and r["duplicates"] == 0
+            and r["misrouted"] == 0 and r["out_of_order"] == 0 and r["payload_mismatch"] == 0
+            and r["unknown_peers"] == 0
+            for r in result.values()
+        )
+        sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -4,41 +4,107 @@ import time
 import re
 import datetime
 import random
-from pyrogram import Client, filters, idle
+from pyrogram import Client, filters, raw
 from pyrogram.enums import ChatMemberStatus, ChatType, ChatAction
 from pyrogram.types import (
     Message, InlineKeyboardMarkup, InlineKeyboardButton,
     CallbackQuery, ChatMemberUpdated, ChatPermissions, ChatJoinRequest,
     BotCommand, BotCommandScopeAllGroupChats
 )
-from pyrogram.errors import FloodWait, UserNotParticipant, ChatAdminRequired, PeerIdInvalid
+from pyrogram.errors import (
+    FloodWait, UserNotParticipant, ChatAdminRequired, PeerIdInvalid,
+    MediaEmpty, MediaInvalid, PhotoInvalid, FileIdInvalid, FileReferenceExpired, FileReferenceInvalid
+)
 from config import Config
 from database import *
-from utils import MovieBotUtils
+from utils import MovieBotUtils, FORMAT_JUNK_WORDS
+from titles import parse_query
+from intents import intent_router
+from autodelete import schedule_delete
+from metrics import instrument, stage, call_stats, monitor_loop_lag, TELEGRAM_API_CALLS, FLOODWAIT_TOTAL, FLOODWAIT_SECONDS
+from profiler import profiler
+from analysis import analyze_message, analysis_memo
+from loadshed import shedder
+from flood import flood_detector
+from vocab import vocab_cache, normalize_word, is_default_word, WORD_KINDS
+from sharding import ShardQueue, receives_updates, run_once_per_slot, WORKER_ID
+from cache import TTLCache
+from mongo_storage import MongoStorage
+from scheduler import run_schedule
+from fanout import DEAD_CHAT_ERRORS
+from chatinfo import get_chat_info, chat_link, bot_is_admin, invalidate_chat, is_chat_admin, invalidate_member
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-app = Client(
-    name="movie_helper_bot",
+class MovieBotClient(Client):
+    """Har Telegram API call aur FloodWait ko metrics mein gino, har handler ko instrument karo"""
+
+    def __init__(self, *args, **kwargs):
+        # Session storage sirf yahin tay hota hai: "mongo" = MongoStorage, warna in_memory session
+        kwargs["in_memory"] = Config.SESSION_STORAGE != "mongo"
+        super().__init__(*args, **kwargs)
+        if Config.SESSION_STORAGE == "mongo":
+            # Bot id session key mein, taaki BOT_TOKEN badle to purana session use na ho
+            bot_id = Config.BOT_TOKEN.split(":")[0]
+            self.storage = MongoStorage(f"{self.name}:{bot_id}")
+        # Startup cache preload hone tak updates dispatch nahi hote (main.startup set karta hai)
+        self.caches_ready = asyncio.Event()
+        # WORKERS > 1: updates sirf receiver ko, woh chat ke owner worker ki queue tak bhejta hai
+        self.receives_updates = receives_updates()
+        if Config.WORKERS > 1:
+            self.dispatcher.updates_queue = ShardQueue(Config.WORKER_INDEX, Config.WORKERS, client=self)
+
+    async def handle_updates(self, updates):
+        if not self.caches_ready.is_set():
+            await self.caches_ready.wait()
+        return await super().handle_updates(updates)
+
+    def add_handler(self, handler, group: int = 0):
+        handler.callback = instrument(handler.callback.__name__)(handler.callback)
+        return super().add_handler(handler, group)
+
+    async def invoke(self, query, *args, **kwargs):
+        method = type(query).__name__
+        TELEGRAM_API_CALLS.inc(method=method)
+        if not self.receives_updates:
+            # Is session pe Telegram updates na bheje — sirf receiver worker leta hai
+            query = raw.functions.InvokeWithoutUpdates(query=query)
+        try:
+            with stage(f"tg.{method}"):
+                return await super().invoke(query, *args, **kwargs)
+        except FloodWait as e:
+            FLOODWAIT_TOTAL.inc(method=method)
+            FLOODWAIT_SECONDS.inc(e.value)
+            raise
+
+app = MovieBotClient(
+    name="movie_helper_bot" if Config.WORKERS <= 1 else f"movie_helper_bot_{WORKER_ID}",
     api_id=Config.API_ID,
     api_hash=Config.API_HASH,
-    bot_token=Config.BOT_TOKEN,
-    in_memory=True
+    bot_token=Config.BOT_TOKEN
 )
 
-fsub_cache = set()
+# (user_id, chat_id) -> force sub check abhi hua (duplicate member updates skip)
+fsub_seen = TTLCache("fsub_seen", max_size=10000, ttl=5)
+# (user_id, channel_id) -> forward / ID se mila channel, confirm button tak
+pending_channels = TTLCache("pending_channels", max_size=5000, ttl=Config.PENDING_CHANNEL_TTL)
+# "imdb:tt..." / "url:..." -> Telegram file_id (Mongo media_cache ke upar memory layer)
+poster_file_ids = TTLCache("poster_file_ids", max_size=Config.POSTER_CACHE_SIZE, ttl=Config.POSTER_CACHE_TTL)
+# (chat_id, MovieQuery.key) -> is chat mein yeh title haal hi mein request hua
+recent_requests = TTLCache("recent_requests", max_size=Config.REQUEST_DEDUP_SIZE, ttl=Config.REQUEST_DEDUP_TTL)
+
+# Cached file_id ab kaam nahi karta — hata ke URL se dobara upload
+STALE_MEDIA_ERRORS = (
+    MediaEmpty, MediaInvalid, PhotoInvalid, FileIdInvalid, FileReferenceExpired, FileReferenceInvalid, ValueError
+)
 
 # ===================== HELPERS =====================
 
 async def is_admin(chat_id, user_id):
     if user_id == Config.OWNER_ID:
         return True
-    try:
-        member = await app.get_chat_member(chat_id, user_id)
-        return member.status in [ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER]
-    except:
-        return False
+    return await is_chat_admin(app, chat_id, user_id)
 
 async def show_typing(chat_id):
     try:
@@ -46,9 +112,30 @@ async def show_typing(chat_id):
     except:
         pass
 
+def poster_key(omdb):
+    return f"imdb:{omdb['imdb_id']}" if omdb.get("imdb_id") else f"url:{omdb['poster']}"
+
+async def send_poster(client, chat_id, omdb, caption):
+    """OMDb poster bhejo. Pehli successful upload ka file_id save hota hai, uske baad
+    har group mein wahi file_id jaata hai — Telegram ko poster CDN se dobara fetch nahi karna padta."""
+    key = poster_key(omdb)
+    file_id = await poster_file_ids.get_or_load(key, lambda: get_media_file_id(key))
+    if file_id:
+        try:
+            return await client.send_photo(chat_id, photo=file_id, caption=caption)
+        except STALE_MEDIA_ERRORS:
+            poster_file_ids.pop(key)
+            await delete_media_file_id(key)
+
+    msg = await client.send_photo(chat_id, photo=omdb["poster"], caption=caption)
+    if msg and msg.photo:
+        poster_file_ids.set(key, msg.photo.file_id)
+        await save_media_file_id(key, msg.photo.file_id, omdb["poster"])
+    return msg
+
 # ===================== SETTINGS MENU =====================
 
-async def show_settings_menu(client, target, is_new=False, menu="main"):
+async def show_settings_menu(client, target, is_new=False, menu="main", st=None):
     if is_new:
         chat_id = target.chat.id
         chat_title = target.chat.title
@@ -56,7 +143,8 @@ async def show_settings_menu(client, target, is_new=False, menu="main"):
         chat_id = target.message.chat.id
         chat_title = target.message.chat.title
 
-    st = await get_settings(chat_id)
+    if st is None:
+        st = await get_settings(chat_id)
 
     if menu == "main":
         spell_status = "✅ ON" if st.get("spelling_on") else "❌ OFF"
@@ -65,6 +153,8 @@ async def show_settings_menu(client, target, is_new=False, menu="main"):
         ai = "✅ ON" if st.get("ai_enabled", True) else "❌ OFF"
         link_prot = "✅ ON" if st.get("link_protection", True) else "❌ OFF"
         abuse_prot = "✅ ON" if st.get("abuse_protection", True) else "❌ OFF"
+        flood_prot = "✅ ON" if st.get("flood_protection", True) else "❌ OFF"
+        custom_count = len(st.get("custom_abuse", [])) + len(st.get("custom_junk", []))
 
         text = (
             f"⚙️ **Settings Panel**\n"
@@ -78,6 +168,8 @@ async def show_settings_menu(client, target, is_new=False, menu="main"):
             [InlineKeyboardButton(f"🤖 AI Chat {ai}", callback_data="menu_ai")],
             [InlineKeyboardButton(f"🔗 Link Protection {link_prot}", callback_data="toggle_link_prot"),
              InlineKeyboardButton(f"🤬 Abuse Filter {abuse_prot}", callback_data="toggle_abuse_prot")],
+            [InlineKeyboardButton(f"🌊 Flood Filter {flood_prot}", callback_data="toggle_flood_prot")],
+            [InlineKeyboardButton(f"🧾 Custom Words ({custom_count})", callback_data="menu_words")],
             [InlineKeyboardButton("❌ Band Karo", callback_data="close_settings")]
         ])
 
@@ -155,6 +247,27 @@ async def show_settings_menu(client, target, is_new=False, menu="main"):
             [InlineKeyboardButton("🔙 Wapas Jao", callback_data="settings_main")]
         ])
 
+    elif menu == "words":
+        def word_list(key):
+            words = st.get(key, [])
+            return ", ".join(f"`{w}`" for w in words) if words else "—"
+
+        text = (
+            f"🧾 **Custom Filter Words**\n\n"
+            f"🤬 **Abuse:** {word_list('custom_abuse')}\n"
+            f"✏️ **Junk:** {word_list('custom_junk')}\n"
+            f"✅ **Allowed (default se hataye):** {word_list('allowed_words')}\n\n"
+            f"**Word add karo:**\n"
+            f"• `/addword abuse [word]` → gaali list mein\n"
+            f"• `/addword junk [word]` → spelling check junk list mein\n\n"
+            f"**Word hatao:** `/delword [word]`\n"
+            f"→ Default list ka word ho to is group ke liye allow ho jayega."
+        )
+        buttons = InlineKeyboardMarkup([
+            [InlineKeyboardButton("🗑️ Sab Custom Words Hatao", callback_data="reset_words")],
+            [InlineKeyboardButton("🔙 Wapas Jao", callback_data="settings_main")]
+        ])
+
     if is_new:
         msg = await target.reply_text(text, reply_markup=buttons)
         asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 300))
@@ -237,6 +350,48 @@ async def settings_cmd(client, message: Message):
         return asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 5))
     await show_settings_menu(client, message, is_new=True)
 
+@app.on_message(filters.command("addword") & filters.group)
+async def addword_cmd(client, message: Message):
+    if not message.from_user or not await is_admin(message.chat.id, message.from_user.id):
+        return await message.reply_text("❌ Sirf admins use kar sakte hain!")
+
+    if len(message.command) < 3 or message.command[1].lower() not in WORD_KINDS:
+        return await message.reply_text(
+            "❌ **Usage:**\n"
+            "`/addword abuse [word]` ya `/addword junk [word]`"
+        )
+
+    kind = message.command[1].lower()
+    word = normalize_word(message.command[2])
+    if not word:
+        return await message.reply_text("❌ Word 2-32 letters ka hona chahiye, bina space ke.")
+
+    st = await get_settings(message.chat.id)
+    if len(st.get("custom_abuse", [])) + len(st.get("custom_junk", [])) >= Config.CUSTOM_WORDS_LIMIT:
+        return await message.reply_text(f"❌ Maximum {Config.CUSTOM_WORDS_LIMIT} custom words allowed hain.")
+
+    await add_custom_word(message.chat.id, kind, word)
+    await message.reply_text(f"✅ `{word}` **{kind}** list mein add ho gaya!")
+
+@app.on_message(filters.command("delword") & filters.group)
+async def delword_cmd(client, message: Message):
+    if not message.from_user or not await is_admin(message.chat.id, message.from_user.id):
+        return await message.reply_text("❌ Sirf admins use kar sakte hain!")
+
+    if len(message.command) < 2:
+        return await message.reply_text("❌ **Usage:** `/delword [word]`")
+
+    word = normalize_word(message.command[1])
+    if not word:
+        return await message.reply_text("❌ Invalid word.")
+
+    allow = is_default_word(word)
+    await remove_custom_word(message.chat.id, word, allow_default=allow)
+    if allow:
+        await message.reply_text(f"✅ `{word}` ab is group mein allowed hai.")
+    else:
+        await message.reply_text(f"🗑️ `{word}` custom list se hata diya.")
+
 # ===================== CHANNEL AUTO ACCEPT SYSTEM =====================
 
 @app.on_message(filters.command("mychannels") & filters.private)
@@ -323,9 +478,8 @@ async def handle_forwarded(client, message: Message):
         f"Kya aap is channel ko Auto Accept ke liye add karna chahte hain?",
         reply_markup=buttons
     )
-    # Save temporarily
-    await update_settings(user_id * -1, f"pending_channel_{user_id}", {
-        "channel_id": channel_id,
+    # Confirm button tak memory mein
+    pending_channels.set((user_id, channel_id), {
         "channel_title": channel_title,
         "channel_username": channel_username
     })
@@ -337,15 +491,13 @@ async def handle_channel_id_input(client, message: Message):
     user_id = message.from_user.id
     
     try:
-        chat = await client.get_chat(channel_id)
-        channel_title = chat.title
-        channel_username = chat.username
+        chat = await get_chat_info(client, channel_id)
+        channel_title = chat["title"]
+        channel_username = chat["username"]
 
         # Bot admin hai?
         try:
-            bot_me = await client.get_me()
-            bot_member = await client.get_chat_member(channel_id, bot_me.id)
-            if bot_member.status not in [ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER]:
+            if not await bot_is_admin(client, channel_id):
                 await message.reply_text(
                     f"❌ **Bot admin nahi hai `{channel_title}` mein!**\n\n"
                     f"Pehle bot ko admin banao, phir dobara try karo."
@@ -379,15 +531,10 @@ async def handle_channel_id_input(client, message: Message):
             ]
         ])
         
-        # Store pending
-        import json
-        pending_key = f"pending_ch_{user_id}"
-        await update_settings(-99999999, pending_key, json.dumps({
-            "channel_id": channel_id,
+        pending_channels.set((user_id, channel_id), {
             "channel_title": channel_title,
-            "channel_username": channel_username,
-            "user_id": user_id
-        }))
+            "channel_username": channel_username
+        })
 
         await message.reply_text(
             f"📢 **Channel Mila!**\n\n"
@@ -442,48 +589,78 @@ async def auto_approve(client, request: ChatJoinRequest):
 IGNORE_COMMANDS = [
     "start", "help", "settings", "request", "setwelcome", "addfsub", "stats",
     "ai", "broadcast", "ban", "unban", "add_premium", "remove_premium",
-    "premiumstats", "ping", "id", "clean", "mychannels", "groupstats"
+    "premiumstats", "ping", "id", "clean", "mychannels", "groupstats",
+    "perf", "profile", "addword", "delword", "jobs",
+    # other.py (handler group -1) ke commands — warna group_filter inhe bhi JUNK samajh ke
+    # delete + warning deta hai
+    "cleangroup", "pinmovie", "feature", "movieoftheday", "motd", "poll", "moviepoll",
+    "purge", "clearchat", "ginfo", "purgeuser", "cancelpurge",
 ]
 
+async def warn_and_mute(client, message, get_warning, mute_reason, fallback):
+    """Message hatao, warning do; limit pe 24 ghante ke liye mute (link / flood)"""
+    try:
+        await message.delete()
+    except:
+        pass
+    count = await add_warning(message.chat.id, message.from_user.id)
+    limit = Config.MAX_WARNINGS
+
+    if count >= limit:
+        try:
+            until = datetime.datetime.now() + datetime.timedelta(hours=24)
+            await client.restrict_chat_member(
+                message.chat.id, message.from_user.id,
+                ChatPermissions(can_send_messages=False), until_date=until
+            )
+            msg = await message.reply_text(
+                f"🚫 **{message.from_user.mention} ko 24 ghante ke liye mute kar diya!**\n"
+                f"Wajah: {mute_reason}"
+            )
+            await reset_warnings(message.chat.id, message.from_user.id)
+        except:
+            msg = await message.reply_text(f"⚠️ {message.from_user.mention}, {fallback}")
+    else:
+        warn_text = get_warning(message.from_user.first_name or "User", count, limit)
+        msg = await message.reply_text(warn_text)
+
+    asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 10))
+
 @app.on_message(filters.group & filters.text & ~filters.command(IGNORE_COMMANDS))
 async def group_filter(client, message: Message):
     if not message.from_user:
         return
+
+    # Flood check in-memory hai, DB/API se pehle
+    flood = flood_detector.check(message.chat.id, message.from_user.id, message.text)
+    if flood and not await is_admin(message.chat.id, message.from_user.id):
+        settings = await get_settings(message.chat.id)
+        if settings.get("flood_protection", True):
+            return await warn_and_mute(
+                client, message, MovieBotUtils.get_flood_warning,
+                "Flood / spam messages.", "spam mat karo!"
+            )
+
     if await is_admin(message.chat.id, message.from_user.id):
         return
 
     settings = await get_settings(message.chat.id)
-    quality = MovieBotUtils.check_message_quality(message.text)
+    vocab = vocab_cache.get(message.chat.id, settings)
+    with stage("classify"):
+        quality, validation = await analyze_message(message.text, vocab)
     user_name = message.from_user.first_name or "User"
 
+    # Sawaal ("movie kaha se download kare?") — FAQ, format warning nahi
+    intent = None
+    if quality not in ("LINK", "ABUSE") and shedder.allows("extras"):
+        intent = intent_router.match(message.text)
+
     # --- LINK ---
     if quality == "LINK" and settings.get("link_protection", True):
-        try:
-            await message.delete()
-        except:
-            pass
-        count = await add_warning(message.chat.id, message.from_user.id)
-        limit = Config.MAX_WARNINGS
-        
-        if count >= limit:
-            try:
-                until = datetime.datetime.now() + datetime.timedelta(hours=24)
-                await client.restrict_chat_member(
-                    message.chat.id, message.from_user.id,
-                    ChatPermissions(can_send_messages=False), until_date=until
-                )
-                msg = await message.reply_text(
-                    f"🚫 **{message.from_user.mention} ko 24 ghante ke liye mute kar diya!**\n"
-                    f"Wajah: Links allowed nahi hain."
-                )
-                await reset_warnings(message.chat.id, message.from_user.id)
-            except:
-                msg = await message.reply_text(f"⚠️ {message.from_user.mention}, links mat bhejo!")
-        else:
-            warn_text = MovieBotUtils.get_link_warning(user_name, count, limit)
-            msg = await message.reply_text(warn_text)
-        
-        asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 10))
+        await warn_and_mute(
+            client, message, MovieBotUtils.get_link_warning,
+            "Links allowed nahi hain.", "links mat bhejo!"
+        )
 
     # --- ABUSE ---
     elif quality == "ABUSE" and settings.get("abuse_protection", True):
@@ -510,9 +687,14 @@ async def group_filter(client, message: Message):
         
         asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 10))
 
+    # --- INTENT (FAQ) ---
+    # Cooldown chal raha ho (claim False) to neeche JUNK / AI wala normal raasta
+    elif intent and intent_router.claim(message.chat.id, intent):
+        msg = await message.reply_text(intent.reply)
+        schedule_delete(client, msg, intent.delete_after)
+
     # --- JUNK (SPELLING CHECK) ---
-    elif quality == "JUNK" and settings.get("spelling_on", True):
-        validation = MovieBotUtils.validate_movie_format(message.text)
+    elif quality == "JUNK" and settings.get("spelling_on", True) and shedder.allows("spelling"):
         if not validation['is_valid']:
             try:
                 await message.delete()
@@ -520,6 +702,8 @@ async def group_filter(client, message: Message):
                 pass
 
             mode = settings.get("spelling_mode", "simple")
+            if mode == "advanced" and not shedder.allows("advanced_spelling"):
+                mode = "simple"
             junk_str = ", ".join(validation['found_junk'])
 
             if mode == "simple":
@@ -531,8 +715,7 @@ async def group_filter(client, message: Message):
                 asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 15))
 
             elif mode == "advanced":
-                clean_name = validation['clean_name']
-                omdb = await MovieBotUtils.get_omdb_info(clean_name)
+                omdb = await MovieBotUtils.find_movie(validation['query'])
 
                 if omdb["found"]:
                     header = MovieBotUtils.get_advanced_found_msg(user_name, message.text)
@@ -540,11 +723,7 @@ async def group_filter(client, message: Message):
 
                     if omdb.get("poster"):
                         try:
-                            await client.send_photo(
-                                message.chat.id,
-                                photo=omdb["poster"],
-                                caption=full_text
-                            )
+                            await send_poster(client, message.chat.id, omdb, full_text)
                         except:
                             await message.reply_text(full_text)
                     else:
@@ -555,7 +734,8 @@ async def group_filter(client, message: Message):
                     asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 15))
 
     # --- AI CHAT (jab koi akela message kare bina tag kiye) ---
-    elif quality in ["CLEAN", "IGNORE"] and settings.get("ai_enabled", True):
+    # OVER_BUDGET yahan nahi aata: text poora dekha hi nahi gaya
+    elif quality in ["CLEAN", "IGNORE"] and settings.get("ai_enabled", True) and shedder.allows("auto_ai"):
         # Check karo message kisi ko tag kar raha hai ya reply hai
         if message.reply_to_message or "@" in message.text:
             return
@@ -605,7 +785,7 @@ async def welcome_new(client, message: Message):
         pass
 
     settings = await get_settings(message.chat.id)
-    if not settings.get("welcome_enabled", True):
+    if not settings.get("welcome_enabled", True) or not shedder.allows("welcome"):
         return
 
     custom = await get_welcome_message(message.chat.id)
@@ -628,7 +808,7 @@ async def welcome_new(client, message: Message):
                 if rows:
                     markup = InlineKeyboardMarkup(rows)
 
-            if photo:
+            if photo and shedder.allows("welcome_photo"):
                 try:
                     wm = await client.send_photo(message.chat.id, photo=photo, caption=text or "", reply_markup=markup)
                 except:
@@ -652,7 +832,7 @@ async def welcome_new(client, message: Message):
             ])
             
             sent = False
-            if member.photo:
+            if member.photo and shedder.allows("welcome_photo"):
                 try:
                     wm = await client.send_photo(message.chat.id, photo=member.photo.big_file_id, caption=caption, reply_markup=buttons)
                     sent = True
@@ -707,10 +887,22 @@ async def request_handler(client, message: Message):
     else:
         movie_name = re.split(r'request\s+', message.text, flags=re.IGNORECASE, maxsplit=1)[-1].strip()
 
-    if not movie_name:
+    query = parse_query(movie_name, FORMAT_JUNK_WORDS)
+    if not query.title:
         msg = await message.reply_text("❌ Movie ka naam bhi likho bhai!")
         return asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 10))
 
+    # "pushpa 2 hindi dedo" aur "Pushpa 2 plz" same request hai
+    if not recent_requests.add((message.chat.id, query.key)):
+        msg = await message.reply_text(
+            f"⏳ **{query.label}** ki request pehle hi admins tak pahunch chuki hai. Thoda intezaar karo!"
+        )
+        try:
+            await message.delete()
+        except:
+            pass
+        return asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 10))
+
     # Admins tag karo
     mentions = []
     try:
@@ -727,7 +919,7 @@ async def request_handler(client, message: Message):
 
     req_text = (
         f"📨 **Nayi Request!**\n\n"
-        f"🎬 **Movie/Series:** `{movie_name}`\n"
+        f"🎬 **Movie/Series:** `{query.label}`\n"
         f"👤 **Request kiya:** {message.from_user.mention}\n"
         f"🔔 **Tag:** {tag_text}\n"
         f"🕐 **Time:** {datetime.datetime.now().strftime('%d %b %Y, %I:%M %p')}"
@@ -759,6 +951,9 @@ async def ai_cmd(client, message: Message):
             "• `/ai Spider-Man ka review do`"
         )
 
+    if not shedder.allows("ai_command"):
+        return await message.reply_text("⏳ Bot abhi bahut busy hai, thodi der baad `/ai` try karo!")
+
     query = " ".join(message.command[1:])
     await show_typing(message.chat.id)
     thinking = await message.reply_text(f"💭 {MovieBotUtils.get_ai_thinking()}")
@@ -770,6 +965,30 @@ async def ai_cmd(client, message: Message):
     if message.chat.type != ChatType.PRIVATE:
         asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 300))
 
+# ===================== CHAT INFO INVALIDATION =====================
+# chatinfo caches TTL pe refresh hote hain; yeh events aate hi turant purana hata do
+
+@app.on_chat_member_updated(group=-1)
+async def chat_info_member_update(client, update: ChatMemberUpdated):
+    # Bot khud promote / demote / remove hua
+    if update.new_chat_member and update.new_chat_member.user.is_self:
+        invalidate_chat(update.chat.id)
+    # Kisi ka admin status badla (promote / demote / left)
+    member = update.new_chat_member or update.old_chat_member
+    if member and member.user:
+        invalidate_member(update.chat.id, member.user.id)
+
+@app.on_message(
+    (filters.new_chat_title | filters.new_chat_photo | filters.delete_chat_photo
+     | filters.migrate_to_chat_id | filters.migrate_from_chat_id),
+    group=-1
+)
+async def chat_info_service_update(client, message: Message):
+    invalidate_chat(message.chat.id)
+    for other_id in (message.migrate_to_chat_id, message.migrate_from_chat_id):
+        if other_id:
+            invalidate_chat(other_id)
+
 # ===================== FORCE SUBSCRIBE =====================
 
 @app.on_chat_member_updated()
@@ -785,12 +1004,8 @@ async def handle_new_member(client, update: ChatMemberUpdated):
 
     user_id = new.user.id
     chat_id = update.chat.id
-    cache_key = f"{user_id}_{chat_id}"
-
-    if cache_key in fsub_cache:
+    if not fsub_seen.add((user_id, chat_id)):
         return
-    fsub_cache.add(cache_key)
-    asyncio.get_event_loop().call_later(5, lambda: fsub_cache.discard(cache_key))
 
     fsub = await get_force_sub(chat_id)
     if not fsub:
@@ -822,9 +1037,9 @@ async def handle_new_member(client, update: ChatMemberUpdated):
         return
 
     try:
-        ch_info = await client.get_chat(channel_id)
-        link = ch_info.invite_link or (f"https://t.me/{ch_info.username}" if ch_info.username else None)
-        ch_name = ch_info.title
+        ch_info = await get_chat_info(client, channel_id)
+        link = chat_link(ch_info)
+        ch_name = ch_info["title"]
     except:
         link = None
         ch_name = "Channel"
@@ -877,9 +1092,8 @@ async def addfsub_cmd(client, message: Message):
         return await message.reply_text("❌ Usage: `/addfsub -100xxxxxxx`")
 
     try:
-        chat = await client.get_chat(channel_id)
-        me = await client.get_chat_member(channel_id, (await client.get_me()).id)
-        if me.status not in [ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER]:
+        chat = await get_chat_info(client, channel_id)
+        if not await bot_is_admin(client, channel_id):
             return await message.reply_text("❌ Mujhe us channel mein admin banao pehle!")
     except:
         return await message.reply_text("❌ Channel nahi mila ya access nahi hai!")
@@ -887,361 +1101,354 @@ async def addfsub_cmd(client, message: Message):
     await set_force_sub(message.chat.id, channel_id)
     msg = await message.reply_text(
         f"✅ **Force Subscribe Set Ho Gaya!**\n\n"
-        f"Channel: **{chat.title}**\n"
+        f"Channel: **{chat['title']}**\n"
         f"Naye members ko pehle join karna hoga."
     )
     asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 30))
 
 # ===================== CALLBACK QUERIES =====================
+# Routing table: exact callback_data -> handler, ya "naam_<id>" -> handler (id int arg banta hai).
+# Har handler ko (client, query, chat_id, user_id, arg) milta hai; admin check router karta hai.
+
+CALLBACK_ROUTES = {}
+CALLBACK_PREFIX_ROUTES = {}
+
+def callback_route(*names, prefix=False, admin=False):
+    """Callback handler register karo. prefix=True: data "naam_<int>" format mein aata hai"""
+    def decorator(func):
+        routes = CALLBACK_PREFIX_ROUTES if prefix else CALLBACK_ROUTES
+        for name in names:
+            routes[name] = (func, admin)
+        return func
+    return decorator
+
+def resolve_callback(data: str):
+    """(handler, admin_only, arg) ya None agar route nahi mila"""
+    route = CALLBACK_ROUTES.get(data)
+    if route:
+        return route[0], route[1], None
+    name, _, payload = data.rpartition("_")
+    route = CALLBACK_PREFIX_ROUTES.get(name)
+    if route:
+        try:
+            return route[0], route[1], int(payload)
+        except ValueError:
+            return None
+    return None
 
 @app.on_callback_query()
 async def callback_handler(client, query: CallbackQuery):
     data = query.data
+    route = resolve_callback(data) if data else None
+    if not route:
+        # other.py ke callbacks (group -1) apna kaam khud karte hain
+        return
+    handler, admin_only, arg = route
     chat_id = query.message.chat.id if query.message else query.from_user.id
     user_id = query.from_user.id
 
     try:
-        # ---- SETTINGS ----
-        if data == "settings_main":
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            await show_settings_menu(client, query, menu="main")
-
-        elif data == "menu_spelling":
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            await show_settings_menu(client, query, menu="spelling")
-
-        elif data == "menu_autodelete":
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            await show_settings_menu(client, query, menu="autodelete")
-
-        elif data == "menu_welcome":
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            await show_settings_menu(client, query, menu="welcome")
-
-        elif data == "menu_ai":
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            await show_settings_menu(client, query, menu="ai")
-
-        elif data == "toggle_spelling":
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            st = await get_settings(chat_id)
-            new_val = not st.get("spelling_on", True)
-            await update_settings(chat_id, "spelling_on", new_val)
-            await query.answer(f"✏️ Spelling: {'ON ✅' if new_val else 'OFF ❌'}")
-            await show_settings_menu(client, query, menu="spelling")
-
-        elif data == "toggle_spell_mode":
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            st = await get_settings(chat_id)
-            new_mode = "advanced" if st.get("spelling_mode", "simple") == "simple" else "simple"
-            await update_settings(chat_id, "spelling_mode", new_mode)
-            await query.answer(f"Mode: {new_mode.upper()}")
-            await show_settings_menu(client, query, menu="spelling")
-
-        elif data.startswith("adel_"):
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            mins = int(data.split("_")[1])
-            if mins == 0:
-                await update_settings(chat_id, "auto_delete_on", False)
-                await update_settings(chat_id, "delete_time", 0)
-                await query.answer("🗑️ Auto Delete band ho gaya")
-            else:
-                await update_settings(chat_id, "auto_delete_on", True)
-                await update_settings(chat_id, "delete_time", mins)
-                await query.answer(f"✅ Auto Delete: {mins} min")
-            await show_settings_menu(client, query, menu="autodelete")
-
-        elif data == "toggle_welcome":
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            st = await get_settings(chat_id)
-            new_val = not st.get("welcome_enabled", True)
-            await update_settings(chat_id, "welcome_enabled", new_val)
-            await query.answer(f"👋 Welcome: {'ON ✅' if new_val else 'OFF ❌'}")
-            await show_settings_menu(client, query, menu="welcome")
-
-        elif data == "clear_welcome":
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            await update_settings(chat_id, "welcome_text", "")
-            await update_settings(chat_id, "welcome_photo", None)
-            await update_settings(chat_id, "welcome_buttons", [])
-            await query.answer("🗑️ Custom welcome hata diya!")
-            await show_settings_menu(client, query, menu="welcome")
-
-        elif data == "toggle_ai":
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            st = await get_settings(chat_id)
-            new_val = not st.get("ai_enabled", True)
-            await update_settings(chat_id, "ai_enabled", new_val)
-            await query.answer(f"🤖 AI Chat: {'ON ✅' if new_val else 'OFF ❌'}")
-            await show_settings_menu(client, query, menu="ai")
-
-        elif data == "toggle_link_prot":
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            st = await get_settings(chat_id)
-            new_val = not st.get("link_protection", True)
-            await update_settings(chat_id, "link_protection", new_val)
-            await query.answer(f"🔗 Link Protection: {'ON ✅' if new_val else 'OFF ❌'}")
-            await show_settings_menu(client, query, menu="main")
-
-        elif data == "toggle_abuse_prot":
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            st = await get_settings(chat_id)
-            new_val = not st.get("abuse_protection", True)
-            await update_settings(chat_id, "abuse_protection", new_val)
-            await query.answer(f"🤬 Abuse Filter: {'ON ✅' if new_val else 'OFF ❌'}")
-            await show_settings_menu(client, query, menu="main")
-
-        elif data == "close_settings":
-            await query.message.delete()
-            await query.answer()
-
-        # ---- CHANNEL MANAGEMENT ----
-        elif data == "channel_setup_home":
-            text = (
-                "📢 **Channel Auto Accept Setup**\n\n"
-                "Main aapke channel ki join requests automatically approve karta hoon!\n\n"
-                "**Setup kaise karein:**\n"
-                "1️⃣ Mujhe apne channel mein **Admin** banao\n"
-                "2️⃣ Apne channel se koi bhi message yahan forward karo\n"
-                "   Ya channel ID daalo (jaise: `-1001234567890`)\n"
-                "3️⃣ Bot automatically sab handle karega!\n\n"
-                "**Apne channels manage karne ke liye:**"
-            )
-            buttons = InlineKeyboardMarkup([
-                [InlineKeyboardButton("📋 Mere Channels Dekho", callback_data="show_my_channels")],
-                [InlineKeyboardButton("➕ Channel Add Karo", callback_data="add_channel_prompt")],
-                [InlineKeyboardButton("❌ Band Karo", callback_data="close_help")]
-            ])
-            try:
-                await query.message.edit_text(text, reply_markup=buttons)
-            except:
-                await query.message.reply_text(text, reply_markup=buttons)
-
-        elif data == "show_my_channels":
-            channels = await get_user_channels(user_id)
-            await send_channels_panel(client, query.message, user_id, channels, edit=True)
-
-        elif data == "add_channel_prompt":
-            await query.message.edit_text(
-                "📢 **Channel Add Karo**\n\n"
-                "**2 tarike hain:**\n\n"
-                "**Tarika 1:** Apne channel se koi bhi message yahan forward karo\n\n"
-                "**Tarika 2:** Channel ID daalo\n"
-                "Channel ID mila nahi? @username_to_id_bot se pata karo\n"
-                "Format: `-100xxxxxxxxxx`",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("🔙 Wapas", callback_data="channel_setup_home")]
-                ])
-            )
+        if admin_only and not await is_admin(chat_id, user_id):
+            return await query.answer("❌ Sirf admins!", show_alert=True)
+        await handler(client, query, chat_id, user_id, arg)
+    except Exception as e:
+        logger.error(f"Callback error [{data}]: {e}")
+        try:
+            await query.answer("❌ Kuch error aa gaya!", show_alert=True)
+        except:
+            pass
 
-        elif data.startswith("confirm_add_ch_"):
-            channel_id = int(data.split("_")[-1])
-            try:
-                chat = await client.get_chat(channel_id)
-                
-                # Bot admin check
-                bot_me = await client.get_me()
-                bot_member = await client.get_chat_member(channel_id, bot_me.id)
-                if bot_member.status not in [ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER]:
-                    await query.answer("❌ Bot channel mein admin nahi hai!", show_alert=True)
-                    return
-
-                await add_user_channel(user_id, channel_id, chat.title, chat.username)
-                await set_auto_accept(channel_id, True)
-
-                await query.message.edit_text(
-                    f"✅ **{chat.title} Connected Ho Gaya!**\n\n"
-                    f"Ab main is channel ki join requests automatically approve karoonga.\n\n"
-                    f"Manage karne ke liye `/mychannels` use karo.",
-                    reply_markup=InlineKeyboardMarkup([
-                        [InlineKeyboardButton("📋 Mere Channels", callback_data="show_my_channels")]
-                    ])
-                )
-            except Exception as e:
-                await query.answer(f"Error: {e}", show_alert=True)
+# ---- SETTINGS ----
+
+SETTINGS_MENUS = {
+    "settings_main": "main",
+    "menu_spelling": "spelling",
+    "menu_autodelete": "autodelete",
+    "menu_welcome": "welcome",
+    "menu_ai": "ai",
+    "menu_words": "words",
+}
+
+# callback -> (settings key, default, toast label, menu)
+SETTING_TOGGLES = {
+    "toggle_spelling": ("spelling_on", True, "✏️ Spelling", "spelling"),
+    "toggle_welcome": ("welcome_enabled", True, "👋 Welcome", "welcome"),
+    "toggle_ai": ("ai_enabled", True, "🤖 AI Chat", "ai"),
+    "toggle_link_prot": ("link_protection", True, "🔗 Link Protection", "main"),
+    "toggle_abuse_prot": ("abuse_protection", True, "🤬 Abuse Filter", "main"),
+    "toggle_flood_prot": ("flood_protection", True, "🌊 Flood Filter", "main"),
+}
+
+@callback_route(*SETTINGS_MENUS, admin=True)
+async def cb_settings_menu(client, query, chat_id, user_id, arg):
+    await show_settings_menu(client, query, menu=SETTINGS_MENUS[query.data])
+
+@callback_route(*SETTING_TOGGLES, admin=True)
+async def cb_toggle_setting(client, query, chat_id, user_id, arg):
+    # Ek atomic DB op, wahi document menu render karta hai
+    key, default, label, menu = SETTING_TOGGLES[query.data]
+    st = await toggle_setting(chat_id, key, default)
+    await query.answer(f"{label}: {'ON ✅' if st.get(key) else 'OFF ❌'}")
+    await show_settings_menu(client, query, menu=menu, st=st)
+
+@callback_route("toggle_spell_mode", admin=True)
+async def cb_toggle_spell_mode(client, query, chat_id, user_id, arg):
+    st = await toggle_setting(chat_id, "spelling_mode", "simple", values=("simple", "advanced"))
+    await query.answer(f"Mode: {st['spelling_mode'].upper()}")
+    await show_settings_menu(client, query, menu="spelling", st=st)
+
+@callback_route("adel", prefix=True, admin=True)
+async def cb_auto_delete_time(client, query, chat_id, user_id, mins):
+    st = await set_settings(chat_id, {"auto_delete_on": mins > 0, "delete_time": mins})
+    await query.answer(f"✅ Auto Delete: {mins} min" if mins else "🗑️ Auto Delete band ho gaya")
+    await show_settings_menu(client, query, menu="autodelete", st=st)
+
+@callback_route("clear_welcome", admin=True)
+async def cb_clear_welcome(client, query, chat_id, user_id, arg):
+    st = await set_settings(chat_id, {"welcome_text": "", "welcome_photo": None, "welcome_buttons": []})
+    await query.answer("🗑️ Custom welcome hata diya!")
+    await show_settings_menu(client, query, menu="welcome", st=st)
+
+@callback_route("reset_words", admin=True)
+async def cb_reset_words(client, query, chat_id, user_id, arg):
+    st = await reset_custom_words(chat_id)
+    await query.answer("🗑️ Custom words hata diye!")
+    await show_settings_menu(client, query, menu="words", st=st)
+
+@callback_route("close_settings", "close_help")
+async def cb_close(client, query, chat_id, user_id, arg):
+    await query.message.delete()
+    await query.answer()
+
+# ---- CHANNEL MANAGEMENT ----
+
+@callback_route("channel_setup_home", "auto_accept_setup")
+async def cb_channel_setup_home(client, query, chat_id, user_id, arg):
+    text = (
+        "📢 **Channel Auto Accept Setup**\n\n"
+        "Main aapke channel ki join requests automatically approve karta hoon!\n\n"
+        "**Setup kaise karein:**\n"
+        "1️⃣ Mujhe apne channel mein **Admin** banao\n"
+        "2️⃣ Apne channel se koi bhi message yahan forward karo\n"
+        "   Ya channel ID daalo (jaise: `-1001234567890`)\n"
+        "3️⃣ Bot automatically sab handle karega!\n\n"
+        "**Apne channels manage karne ke liye:**"
+    )
+    buttons = InlineKeyboardMarkup([
+        [InlineKeyboardButton("📋 Mere Channels Dekho", callback_data="show_my_channels")],
+        [InlineKeyboardButton("➕ Channel Add Karo", callback_data="add_channel_prompt")],
+        [InlineKeyboardButton("❌ Band Karo", callback_data="close_help")]
+    ])
+    try:
+        await query.message.edit_text(text, reply_markup=buttons)
+    except:
+        await query.message.reply_text(text, reply_markup=buttons)
 
-        elif data == "cancel_add_ch":
-            await query.message.edit_text("❌ Channel add nahi kiya.")
+@callback_route("show_my_channels")
+async def cb_show_my_channels(client, query, chat_id, user_id, arg):
+    channels = await get_user_channels(user_id)
+    await send_channels_panel(client, query.message, user_id, channels, edit=True)
+
+@callback_route("add_channel_prompt")
+async def cb_add_channel_prompt(client, query, chat_id, user_id, arg):
+    await query.message.edit_text(
+        "📢 **Channel Add Karo**\n\n"
+        "**2 tarike hain:**\n\n"
+        "**Tarika 1:** Apne channel se koi bhi message yahan forward karo\n\n"
+        "**Tarika 2:** Channel ID daalo\n"
+        "Channel ID mila nahi? @username_to_id_bot se pata karo\n"
+        "Format: `-100xxxxxxxxxx`",
+        reply_markup=InlineKeyboardMarkup([
+            [InlineKeyboardButton("🔙 Wapas", callback_data="channel_setup_home")]
+        ])
+    )
 
-        elif data.startswith("ch_detail_"):
-            channel_id = int(data.split("_")[-1])
-            ch = await get_user_channel(user_id, channel_id)
-            if not ch:
-                await query.answer("Channel nahi mila!", show_alert=True)
-                return
+@callback_route("confirm_add_ch", prefix=True)
+async def cb_confirm_add_channel(client, query, chat_id, user_id, channel_id):
+    try:
+        # Forward / ID step pe channel info mil chuki ho to dobara get_chat nahi
+        pending = pending_channels.pop((user_id, channel_id))
+        if pending:
+            title, username = pending["channel_title"], pending["channel_username"]
+        else:
+            chat = await get_chat_info(client, channel_id)
+            title, username = chat["title"], chat["username"]
 
-            is_connected = ch.get("connected", False)
-            title = ch.get("channel_title", "Unknown")
+        # Bot admin check
+        if not await bot_is_admin(client, channel_id):
+            await query.answer("❌ Bot channel mein admin nahi hai!", show_alert=True)
+            return
 
-            text = (
-                f"📢 **{title}**\n\n"
-                f"**ID:** `{channel_id}`\n"
-                f"**Status:** {'🟢 Connected (Auto Accept ON)' if is_connected else '🔴 Disconnected'}\n\n"
-                f"Neeche se manage karo:"
-            )
-            buttons = InlineKeyboardMarkup([
-                [InlineKeyboardButton(
-                    "🔴 Disconnect Karo" if is_connected else "🟢 Connect Karo",
-                    callback_data=f"toggle_ch_{channel_id}"
-                )],
-                [InlineKeyboardButton("🗑️ Remove Karo", callback_data=f"remove_ch_{channel_id}")],
-                [InlineKeyboardButton("🔙 Wapas", callback_data="show_my_channels")]
+        await add_user_channel(user_id, channel_id, title, username)
+        await set_auto_accept(channel_id, True)
+
+        await query.message.edit_text(
+            f"✅ **{title} Connected Ho Gaya!**\n\n"
+            f"Ab main is channel ki join requests automatically approve karoonga.\n\n"
+            f"Manage karne ke liye `/mychannels` use karo.",
+            reply_markup=InlineKeyboardMarkup([
+                [InlineKeyboardButton("📋 Mere Channels", callback_data="show_my_channels")]
             ])
-            await query.message.edit_text(text, reply_markup=buttons)
-
-        elif data.startswith("toggle_ch_"):
-            channel_id = int(data.split("_")[-1])
-            ch = await get_user_channel(user_id, channel_id)
-            if not ch:
-                return await query.answer("Channel nahi mila!", show_alert=True)
-
-            new_status = not ch.get("connected", False)
-            await toggle_channel_auto_accept(user_id, channel_id, new_status)
-            status_text = "🟢 Connect ho gaya!" if new_status else "🔴 Disconnect ho gaya!"
-            await query.answer(status_text)
-            # Refresh detail
-            query.data = f"ch_detail_{channel_id}"
-            await callback_handler(client, query)
-
-        elif data.startswith("remove_ch_"):
-            channel_id = int(data.split("_")[-1])
-            ch = await get_user_channel(user_id, channel_id)
-            title = ch.get("channel_title", "Channel") if ch else "Channel"
-            await remove_user_channel(user_id, channel_id)
-            await query.answer("🗑️ Remove ho gaya!")
-            channels = await get_user_channels(user_id)
-            await send_channels_panel(client, query.message, user_id, channels, edit=True)
-
-        # ---- REQUESTS ----
-        elif data.startswith("req_done_"):
-            req_user_id = int(data.split("_")[-1])
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            await client.send_message(
-                chat_id,
-                f"✅ **Request Complete!**\n\n"
-                f"{query.from_user.mention} ne upload kar diya!\n"
-                f"<a href='tg://user?id={req_user_id}'>User</a>, dekho! 🎬"
-            )
-            await query.message.delete()
-            await query.answer("✅ Done!")
+        )
+    except Exception as e:
+        await query.answer(f"Error: {e}", show_alert=True)
 
-        elif data.startswith("req_no_"):
-            req_user_id = int(data.split("_")[-1])
-            if not await is_admin(chat_id, user_id):
-                return await query.answer("❌ Sirf admins!", show_alert=True)
-            await client.send_message(
-                chat_id,
-                f"❌ **Request Reject Ho Gayi**\n\n"
-                f"Admin {query.from_user.mention} ne bataya:\n"
-                f"Yeh movie/series abhi available nahi hai.\n"
-                f"<a href='tg://user?id={req_user_id}'>User</a>, baad mein try karo!"
-            )
-            await query.message.delete()
-            await query.answer("❌ Rejected!")
+@callback_route("cancel_add_ch")
+async def cb_cancel_add_channel(client, query, chat_id, user_id, arg):
+    await query.message.edit_text("❌ Channel add nahi kiya.")
 
-        # ---- FSUB VERIFY ----
-        elif data.startswith("fsub_verify_"):
-            target_id = int(data.split("_")[-1])
-            if user_id != target_id:
-                return await query.answer("❌ Yeh button tumhare liye nahi hai!", show_alert=True)
+async def show_channel_detail(query, channel_id, ch):
+    is_connected = ch.get("connected", False)
+    title = ch.get("channel_title", "Unknown")
 
-            fsub = await get_force_sub(chat_id)
-            if not fsub:
-                return await query.message.delete()
+    text = (
+        f"📢 **{title}**\n\n"
+        f"**ID:** `{channel_id}`\n"
+        f"**Status:** {'🟢 Connected (Auto Accept ON)' if is_connected else '🔴 Disconnected'}\n\n"
+        f"Neeche se manage karo:"
+    )
+    buttons = InlineKeyboardMarkup([
+        [InlineKeyboardButton(
+            "🔴 Disconnect Karo" if is_connected else "🟢 Connect Karo",
+            callback_data=f"toggle_ch_{channel_id}"
+        )],
+        [InlineKeyboardButton("🗑️ Remove Karo", callback_data=f"remove_ch_{channel_id}")],
+        [InlineKeyboardButton("🔙 Wapas", callback_data="show_my_channels")]
+    ])
+    await query.message.edit_text(text, reply_markup=buttons)
+
+@callback_route("ch_detail", prefix=True)
+async def cb_channel_detail(client, query, chat_id, user_id, channel_id):
+    ch = await get_user_channel(user_id, channel_id)
+    if not ch:
+        return await query.answer("Channel nahi mila!", show_alert=True)
+    await show_channel_detail(query, channel_id, ch)
+
+@callback_route("toggle_ch", prefix=True)
+async def cb_toggle_channel(client, query, chat_id, user_id, channel_id):
+    ch = await get_user_channel(user_id, channel_id)
+    if not ch:
+        return await query.answer("Channel nahi mila!", show_alert=True)
+
+    new_status = not ch.get("connected", False)
+    await toggle_channel_auto_accept(user_id, channel_id, new_status)
+    await query.answer("🟢 Connect ho gaya!" if new_status else "🔴 Disconnect ho gaya!")
+    # Detail wahi document se refresh, dobara DB read nahi
+    ch["connected"] = new_status
+    await show_channel_detail(query, channel_id, ch)
+
+@callback_route("remove_ch", prefix=True)
+async def cb_remove_channel(client, query, chat_id, user_id, channel_id):
+    await remove_user_channel(user_id, channel_id)
+    await query.answer("🗑️ Remove ho gaya!")
+    channels = await get_user_channels(user_id)
+    await send_channels_panel(client, query.message, user_id, channels, edit=True)
 
-            channel_id = fsub["channel_id"]
-            try:
-                member = await client.get_chat_member(channel_id, user_id)
-                if member.status not in [ChatMemberStatus.LEFT, ChatMemberStatus.BANNED]:
-                    await client.restrict_chat_member(chat_id, user_id, ChatPermissions(
-                        can_send_messages=True, can_send_media_messages=True, can_send_other_messages=True
-                    ))
-                    await query.message.delete()
-                    wm = await client.send_message(
-                        chat_id,
-                        f"✅ **{query.from_user.mention} verify ho gaye!**\n"
-                        f"Ab message bhej sakte ho. Welcome! 😊"
-                    )
-                    asyncio.create_task(MovieBotUtils.auto_delete_message(client, wm, 30))
-                    await query.answer("✅ Verified!")
-                else:
-                    await query.answer("❌ Abhi join nahi kiya!", show_alert=True)
-            except UserNotParticipant:
-                await query.answer("❌ Pehle channel join karo!", show_alert=True)
-
-        # ---- HELP ----
-        elif data == "help_main":
-            text = (
-                "**❓ Help Menu**\n\n"
-                "**Bot kya karta hai:**\n"
-                "• ✏️ Movie spelling check karta hai\n"
-                "• ✅ Channel join requests auto approve karta hai\n"
-                "• 🤖 AI se movie suggestions deta hai\n"
-                "• 🛡️ Links aur abuse se bachata hai\n\n"
-                "**Commands:**\n"
-                "• `/settings` — Group settings\n"
-                "• `/request [naam]` — Movie request\n"
-                "• `/ai [sawaal]` — AI se poocho\n"
-                "• `/mychannels` — Channels manage karo\n"
-                "• `/ping` — Bot status\n"
-                "• `/id` — ID dekho"
-            )
-            buttons = InlineKeyboardMarkup([
-                [InlineKeyboardButton("💎 Premium", callback_data="premium_info")],
-                [InlineKeyboardButton("📢 Channel Setup", callback_data="channel_setup_home")],
-                [InlineKeyboardButton("❌ Band Karo", callback_data="close_help")]
-            ])
-            try:
-                await query.message.edit_text(text, reply_markup=buttons)
-            except:
-                await query.message.reply_text(text, reply_markup=buttons)
-
-        elif data == "premium_info":
-            text = (
-                "💎 **Premium Plans**\n\n"
-                "**Fayde:**\n"
-                "• 🔗 Force Subscribe System\n"
-                "• 🔇 No Broadcasts\n"
-                "• ⚡ Priority Support\n"
-                "• 🎯 Advanced Features\n\n"
-                "**Pricing:**\n"
-                "• 1 Mahina: ₹100\n"
-                "• 3 Mahine: ₹250\n"
-                "• Lifetime: ₹500\n\n"
-                "Khareedne ke liye @asbhai_bsr se contact karo."
-            )
-            buttons = InlineKeyboardMarkup([
-                [InlineKeyboardButton("💬 Contact Karo", url="https://t.me/asbhai_bsr")],
-                [InlineKeyboardButton("🔙 Wapas", callback_data="help_main")]
-            ])
-            await query.message.edit_text(text, reply_markup=buttons)
+# ---- REQUESTS ----
+
+@callback_route("req_done", prefix=True, admin=True)
+async def cb_request_done(client, query, chat_id, user_id, req_user_id):
+    await client.send_message(
+        chat_id,
+        f"✅ **Request Complete!**\n\n"
+        f"{query.from_user.mention} ne upload kar diya!\n"
+        f"<a href='tg://user?id={req_user_id}'>User</a>, dekho! 🎬"
+    )
+    await query.message.delete()
+    await query.answer("✅ Done!")
+
+@callback_route("req_no", prefix=True, admin=True)
+async def cb_request_rejected(client, query, chat_id, user_id, req_user_id):
+    await client.send_message(
+        chat_id,
+        f"❌ **Request Reject Ho Gayi**\n\n"
+        f"Admin {query.from_user.mention} ne bataya:\n"
+        f"Yeh movie/series abhi available nahi hai.\n"
+        f"<a href='tg://user?id={req_user_id}'>User</a>, baad mein try karo!"
+    )
+    await query.message.delete()
+    await query.answer("❌ Rejected!")
+
+# ---- FSUB VERIFY ----
+
+@callback_route("fsub_verify", prefix=True)
+async def cb_fsub_verify(client, query, chat_id, user_id, target_id):
+    if user_id != target_id:
+        return await query.answer("❌ Yeh button tumhare liye nahi hai!", show_alert=True)
+
+    fsub = await get_force_sub(chat_id)
+    if not fsub:
+        return await query.message.delete()
 
-        elif data == "close_help":
+    channel_id = fsub["channel_id"]
+    try:
+        member = await client.get_chat_member(channel_id, user_id)
+        if member.status not in [ChatMemberStatus.LEFT, ChatMemberStatus.BANNED]:
+            await client.restrict_chat_member(chat_id, user_id, ChatPermissions(
+                can_send_messages=True, can_send_media_messages=True, can_send_other_messages=True
+            ))
             await query.message.delete()
+            wm = await client.send_message(
+                chat_id,
+                f"✅ **{query.from_user.mention} verify ho gaye!**\n"
+                f"Ab message bhej sakte ho. Welcome! 😊"
+            )
+            asyncio.create_task(MovieBotUtils.auto_delete_message(client, wm, 30))
+            await query.answer("✅ Verified!")
+        else:
+            await query.answer("❌ Abhi join nahi kiya!", show_alert=True)
+    except UserNotParticipant:
+        await query.answer("❌ Pehle channel join karo!", show_alert=True)
 
-        elif data == "auto_accept_setup":
-            await callback_handler(client, type('Q', (), {'data': 'channel_setup_home', 'message': query.message, 'from_user': query.from_user, 'answer': query.answer})())
+# ---- HELP ----
 
-    except Exception as e:
-        logger.error(f"Callback error [{data}]: {e}")
-        try:
-            await query.answer("❌ Kuch error aa gaya!", show_alert=True)
-        except:
-            pass
+@callback_route("help_main")
+async def cb_help_main(client, query, chat_id, user_id, arg):
+    text = (
+        "**❓ Help Menu**\n\n"
+        "**Bot kya karta hai:**\n"
+        "• ✏️ Movie spelling check karta hai\n"
+        "• ✅ Channel join requests auto approve karta hai\n"
+        "• 🤖 AI se movie suggestions deta hai\n"
+        "• 🛡️ Links aur abuse se bachata hai\n\n"
+        "**Commands:**\n"
+        "• `/settings` — Group settings\n"
+        "• `/request [naam]` — Movie request\n"
+        "• `/ai [sawaal]` — AI se poocho\n"
+        "• `/mychannels` — Channels manage karo\n"
+        "• `/ping` — Bot status\n"
+        "• `/id` — ID dekho"
+    )
+    buttons = InlineKeyboardMarkup([
+        [InlineKeyboardButton("💎 Premium", callback_data="premium_info")],
+        [InlineKeyboardButton("📢 Channel Setup", callback_data="channel_setup_home")],
+        [InlineKeyboardButton("❌ Band Karo", callback_data="close_help")]
+    ])
+    try:
+        await query.message.edit_text(text, reply_markup=buttons)
+    except:
+        await query.message.reply_text(text, reply_markup=buttons)
+
+@callback_route("premium_info")
+async def cb_premium_info(client, query, chat_id, user_id, arg):
+    text = (
+        "💎 **Premium Plans**\n\n"
+        "**Fayde:**\n"
+        "• 🔗 Force Subscribe System\n"
+        "• 🔇 No Broadcasts\n"
+        "• ⚡ Priority Support\n"
+        "• 🎯 Advanced Features\n\n"
+        "**Pricing:**\n"
+        "• 1 Mahina: ₹100\n"
+        "• 3 Mahine: ₹250\n"
+        "• Lifetime: ₹500\n\n"
+        "Khareedne ke liye @asbhai_bsr se contact karo."
+    )
+    buttons = InlineKeyboardMarkup([
+        [InlineKeyboardButton("💬 Contact Karo", url="https://t.me/asbhai_bsr")],
+        [InlineKeyboardButton("🔙 Wapas", callback_data="help_main")]
+    ])
+    await query.message.edit_text(text, reply_markup=buttons)
 
 # ===================== MISC COMMANDS =====================
 
@@ -1311,22 +1518,15 @@ async def broadcast_cmd(client, message: Message):
         try:
             await message.reply_to_message.copy(cid)
             success += 1
-        except (PeerIdInvalid, UserNotParticipant):
+        except DEAD_CHAT_ERRORS:
+            # Sirf pakka band chats hatao. PeerIdInvalid = peer cache miss, user/group zinda ho sakta hai
             if is_group:
                 await remove_group(cid)
             else:
                 await delete_user(cid)
             cleaned += 1
-        except Exception as e:
-            err = str(e)
-            if any(x in err for x in ["USER_IS_BLOCKED", "INPUT_USER_DEACTIVATED", "chat not found"]):
-                if is_group:
-                    await remove_group(cid)
-                else:
-                    await delete_user(cid)
-                cleaned += 1
-            else:
-                failed += 1
+        except Exception:
+            failed += 1
         await asyncio.sleep(0.1)
 
     await progress.edit_text(
@@ -1337,6 +1537,61 @@ async def broadcast_cmd(client, message: Message):
         f"🗑️ Cleaned: {cleaned}"
     )
 
+@app.on_message(filters.command("jobs") & filters.user(Config.OWNER_ID))
+async def jobs_cmd(client, message: Message):
+    runs = await get_job_runs(limit=5)
+    if not runs:
+        return await message.reply_text("ℹ️ Abhi tak koi scheduled run nahi hua.")
+    lines = ["🗓 **Scheduled Runs**\n"]
+    for run in runs:
+        stats = run.get("stats") or {}
+        lines.append(
+            f"• `{run['name']}` {run['slot']:%d %b %H:%M} — **{run.get('status')}**\n"
+            f"  ✅ {stats.get('sent', 0)} | ⏭ {stats.get('skipped', 0)} | "
+            f"❌ {stats.get('failed', 0)} | 🗑 {stats.get('dead', 0)}"
+        )
+    await message.reply_text("\n".join(lines))
+
+@app.on_message(filters.command("perf") & filters.user(Config.OWNER_ID))
+async def perf_cmd(client, message: Message):
+    kind = message.command[1] if len(message.command) > 1 else None
+    rows = sorted(call_stats(kind), key=lambda r: r[4].get(0.95, 0), reverse=True)[:20]
+    if not rows:
+        return await message.reply_text("📉 Abhi koi data nahi hai.")
+
+    db = db_status()
+    memo = analysis_memo.stats()
+    lines = [
+        f"🗄 DB: breaker **{db['breaker']}** • journal {db['journal']} (dropped {db['journal_dropped']})",
+        f"🧠 Analysis memo: {memo['hit_rate'] * 100:.0f}% hits • {memo['size']}/{memo['max_size']}",
+        "📈 **Latency (p50 / p95 / p99 ms)**\n",
+    ]
+    for k, name, count, errors, q in rows:
+        p = " / ".join(f"{q.get(x, 0) * 1000:.0f}" for x in (0.5, 0.95, 0.99))
+        lines.append(f"`{k}:{name}` — {p} • {count} calls • {errors} err")
+    await message.reply_text("\n".join(lines))
+
+@app.on_message(filters.command("profile") & filters.user(Config.OWNER_ID))
+async def profile_cmd(client, message: Message):
+    action = message.command[1].lower() if len(message.command) > 1 else "status"
+
+    if action == "on":
+        profiler.start()
+        return await message.reply_text("🔬 Profiler chalu! `/profile off` se band karo.")
+
+    if action == "off":
+        profiler.stop()
+
+    if not profiler.samples:
+        return await message.reply_text("🔬 Profiler: koi samples nahi. `/profile on` se shuru karo.")
+
+    secs = int(time.time() - profiler.started_at)
+    lines = [f"🔬 **Profile** ({profiler.samples} samples, {secs}s, "
+             f"{'chal raha' if profiler.running else 'band'})\n"]
+    for fn, pct in profiler.top_functions():
+        lines.append(f"`{fn}` — {pct:.1f}%")
+    await message.reply_text("\n".join(lines))
+
 @app.on_message(filters.command("add_premium") & filters.user(Config.OWNER_ID))
 async def add_premium_cmd(client, message: Message):
     if len(message.command) < 3:
@@ -1388,64 +1643,70 @@ async def clean_cmd(client, message: Message):
     )
 
 # ===================== BOT START =====================
+# Startup orchestration main.py mein hai; yeh uske warm-up steps hain
+
+async def set_bot_commands():
+    commands = [
+        BotCommand("start", "Bot start karo"),
+        BotCommand("help", "Help dekho"),
+        BotCommand("settings", "Group settings"),
+        BotCommand("request", "Movie request karo"),
+        BotCommand("ai", "AI se poocho"),
+        BotCommand("mychannels", "Channels manage karo"),
+        BotCommand("ping", "Bot status"),
+        BotCommand("id", "Apna ID dekho"),
+    ]
+    group_cmds = [
+        BotCommand("request", "Movie request karo"),
+        BotCommand("ai", "AI se poocho"),
+        BotCommand("settings", "Settings"),
+        BotCommand("id", "ID dekho"),
+    ]
+    await asyncio.gather(
+        app.set_bot_commands(commands),
+        app.set_bot_commands(group_cmds, scope=BotCommandScopeAllGroupChats())
+    )
 
-async def start_bot():
-    asyncio.create_task(scheduled_cleanup())
-    await app.start()
-    bot_info = await app.get_me()
-    logger.info(f"✅ Bot started: @{bot_info.username}")
-
+async def notify_owner_start():
+    if not Config.OWNER_ID:
+        return
     try:
-        commands = [
-            BotCommand("start", "Bot start karo"),
-            BotCommand("help", "Help dekho"),
-            BotCommand("settings", "Group settings"),
-            BotCommand("request", "Movie request karo"),
-            BotCommand("ai", "AI se poocho"),
-            BotCommand("mychannels", "Channels manage karo"),
-            BotCommand("ping", "Bot status"),
-            BotCommand("id", "Apna ID dekho"),
-        ]
-        await app.set_bot_commands(commands)
-        group_cmds = [
-            BotCommand("request", "Movie request karo"),
-            BotCommand("ai", "AI se poocho"),
-            BotCommand("settings", "Settings"),
-            BotCommand("id", "ID dekho"),
-        ]
-        await app.set_bot_commands(group_cmds, scope=BotCommandScopeAllGroupChats())
-    except Exception as e:
-        logger.warning(f"Commands set failed: {e}")
-
-    if Config.OWNER_ID:
-        try:
-            await app.send_message(
-                Config.OWNER_ID,
-                f"🤖 Bot start ho gaya!\n@{bot_info.username}\n{datetime.datetime.now().strftime('%d %b %Y %H:%M')}"
-            )
-        except:
-            pass
+        await app.send_message(
+            Config.OWNER_ID,
+            f"🤖 Bot start ho gaya!\n@{app.me.username}\n{datetime.datetime.now().strftime('%d %b %Y %H:%M')}"
+        )
+    except:
+        pass
 
-    await idle()
+async def run_cleanup():
+    counts = await clear_junk()
+    total = sum(counts.values())
+    if total > 0:
+        logger.info(f"Cleanup: {counts}")
 
 async def scheduled_cleanup():
     while True:
         await asyncio.sleep(Config.CLEANUP_INTERVAL)
         try:
-            counts = await clear_junk()
-            total = sum(counts.values())
-            if total > 0:
-                logger.info(f"Cleanup: {counts}")
+            # Multi-worker mein har interval pe sirf ek worker cleanup chalaye
+            await run_once_per_slot("cleanup", Config.CLEANUP_INTERVAL, run_cleanup)
         except Exception as e:
             logger.error(f"Cleanup error: {e}")
 
+def start_background_tasks():
+    tasks = [
+        asyncio.create_task(scheduled_cleanup(), name="scheduled_cleanup"),
+        asyncio.create_task(monitor_loop_lag(on_sample=shedder.observe), name="monitor_loop_lag"),
+    ]
+    if Config.MOVIE_UPDATE_CRON:
+        from other import scheduled_movie_updates
+        tasks.append(asyncio.create_task(
+            run_schedule("movie_updates", Config.MOVIE_UPDATE_CRON, scheduled_movie_updates),
+            name="movie_updates"
+        ))
+    return tasks
+
 if __name__ == "__main__":
-    print("🚀 Movie Helper Bot starting...")
-    try:
-        app.run(start_bot())
-    except KeyboardInterrupt:
-        print("⏹️ Bot stopped.")
-    except Exception as e:
-        print(f"❌ Crash: {e}")
-        import traceback
-        traceback.print_exc()
+    # Ek hi startup path: main.py
+    import main
+    main.main()
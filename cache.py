@@ -0,0 +1,139 @@
+import time
+import asyncio
+from collections import OrderedDict
+from metrics import CACHE_REQUESTS, CACHE_EVICTIONS, CACHE_SIZE
+
+# ===================== TTL + LRU CACHE =====================
+# Module-level dicts/sets jo kabhi saaf nahi hote unki jagah yeh use karo.
+# Size hamesha max_size tak bounded hai (LRU eviction), entries ttl ke baad
+# expire hoti hain (lazy, access pe), koi timer/call_later handle nahi banta.
+# get_or_load same key ke concurrent loads ko ek hi load mein jod deta hai.
+
+_MISSING = object()
+
+class TTLCache:
+
+    def __init__(self, name: str, max_size: int, ttl: float = None):
+        """ttl=None: sirf LRU, expire nahi hota"""
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.data = OrderedDict()      # key -> (expires_at, value)
+        self.loading = {}              # key -> future (chal raha load)
+        self.hits = self.misses = self.loads = self.evictions = self.expirations = 0
+        CACHE_SIZE.set_function(lambda: len(self.data), cache=name)
+
+    def _expires_at(self, ttl):
+        ttl = self.ttl if ttl is None else ttl
+        return time.monotonic() + ttl if ttl is not None else None
+
+    def _lookup(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return _MISSING
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            self.expirations += 1
+            CACHE_EVICTIONS.inc(cache=self.name, reason="expired")
+            return _MISSING
+        self.data.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        if value is _MISSING:
+            self.misses += 1
+            CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            return default
+        self.hits += 1
+        CACHE_REQUESTS.inc(cache=self.name, result="hit")
+        return value
+
+    def peek(self, key, default=None):
+        """get jaisa, par hit/miss counters nahi badalte (internal checks ke liye)"""
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl: float = None):
+        self.data[key] = (self._expires_at(ttl), value)
+        self.data.move_to_end(key)
+        while len(self.data) > self.max_size:
+            self.data.popitem(last=False)
+            self.evictions += 1
+            CACHE_EVICTIONS.inc(cache=self.name, reason="size")
+
+    def add(self, key, ttl: float = None) -> bool:
+        """Set jaisa use: key pehle se (zinda) thi to False, warna add karke True"""
+        if self._lookup(key) is not _MISSING:
+            return False
+        self.set(key, True, ttl)
+        return True
+
+    def pop(self, key, default=None):
+        item = self.data.pop(key, None)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            return default
+        return value
+
+    def clear(self):
+        self.data.clear()
+
+    def __contains__(self, key) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    async def get_or_load(self, key, loader, ttl: float = None):
+        """Cache mein ho to wahi, warna `await loader()` — ek key ka ek hi load ek time pe.
+        Loader ka exception sab waiting callers ko milta hai aur cache nahi hota."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        while key in self.loading:
+            fut = self.loading[key]
+            try:
+                return await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                # Load karne wala cancel hua (hum nahi) to khud load karo
+                if not fut.cancelled():
+                    raise
+
+        fut = asyncio.get_running_loop().create_future()
+        self.loading[key] = fut
+        self.loads += 1
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            # Koi waiter na ho to "exception never retrieved" warning na aaye
+            fut.exception()
+            raise
+        else:
+            self.set(key, value, ttl)
+            fut.set_result(value)
+            return value
+        finally:
+            if self.loading.get(key) is fut:
+                del self.loading[key]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self.data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,75 @@
+from pyrogram.enums import ChatMemberStatus
+from config import Config
+from cache import TTLCache
+
+# ===================== CHAT METADATA CACHE =====================
+# Fsub prompt, /addfsub aur channel setup har baar get_chat / get_me / bot ka
+# get_chat_member karte the. Title, username, invite link aur bot ka admin status
+# kam hi badalte hain: lazily load, TTL pe refresh, aur chat update events
+# (title change, bot promote/demote) pe invalidate.
+# Multi-worker mein har worker ka apna cache hai; dusre workers mein TTL tak purana rehta hai.
+
+ADMIN_STATUSES = (ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER)
+
+chat_info_cache = TTLCache("chat_info", max_size=Config.CHAT_INFO_CACHE_SIZE, ttl=Config.CHAT_INFO_TTL)
+bot_status_cache = TTLCache("bot_status", max_size=Config.CHAT_INFO_CACHE_SIZE, ttl=Config.CHAT_INFO_TTL)
+# (chat_id, user_id) -> admin hai ya nahi. Har group message pe check hota tha (get_chat_member);
+# promote / demote ka chat_member update aate hi invalidate_member.
+member_admin_cache = TTLCache("member_admin", max_size=Config.ADMIN_CACHE_SIZE, ttl=Config.ADMIN_CACHE_TTL)
+
+async def get_me_id(client) -> int:
+    """Bot ki apni id — start pe client.me set ho jaata hai, get_me sirf fallback"""
+    if client.me is None:
+        client.me = await client.get_me()
+    return client.me.id
+
+async def get_chat_info(client, chat_id) -> dict:
+    """{"id", "title", "username", "invite_link", "type"} — errors cache nahi hote"""
+    async def load():
+        chat = await client.get_chat(chat_id)
+        return {
+            "id": chat.id,
+            "title": chat.title or chat.first_name or "Chat",
+            "username": chat.username,
+            "invite_link": chat.invite_link,
+            "type": chat.type,
+        }
+    return await chat_info_cache.get_or_load(chat_id, load)
+
+def chat_link(info: dict):
+    if info.get("invite_link"):
+        return info["invite_link"]
+    return f"https://t.me/{info['username']}" if info.get("username") else None
+
+async def get_bot_status(client, chat_id) -> ChatMemberStatus:
+    """Chat mein bot ka status. Sirf admin status cache hota hai — "admin nahi" wala
+    jawab cache nahi, taaki promote karne ke turant baad retry kaam kare."""
+    async def load():
+        member = await client.get_chat_member(chat_id, await get_me_id(client))
+        return member.status
+
+    status = await bot_status_cache.get_or_load(chat_id, load)
+    if status not in ADMIN_STATUSES:
+        bot_status_cache.pop(chat_id)
+    return status
+
+async def bot_is_admin(client, chat_id) -> bool:
+    return await get_bot_status(client, chat_id) in ADMIN_STATUSES
+
+async def is_chat_admin(client, chat_id, user_id) -> bool:
+    """User chat ka admin / owner hai? API error pe False (cache nahi hota)"""
+    async def load():
+        member = await client.get_chat_member(chat_id, user_id)
+        return member.status in ADMIN_STATUSES
+
+    try:
+        return await member_admin_cache.get_or_load((chat_id, user_id), load)
+    except:
+        return False
+
+def invalidate_member(chat_id, user_id):
+    member_admin_cache.pop((chat_id, user_id))
+
+def invalidate_chat(chat_id):
+    chat_info_cache.pop(chat_id)
+    bot_status_cache.pop(chat_id)
@@ -25,13 +25,109 @@ class Config:
     
     # Timings
     AUTO_DELETE_TIME = 300
+    DELETE_BATCH_WINDOW = 1.0       # itne sec ke andar due deletes ek call mein
     BROADCAST_DELAY = 0.3
     MAX_WARNINGS = 3
     CLEANUP_INTERVAL = 3600
+    GROUP_STATS_TTL = 900
+    GROUP_STATS_MAX_AGE = 86400     # sec; isse purana snapshot nahi dikhate, naya walk
+    GROUP_STATS_CACHE_SIZE = 10000
+    GROUP_STATS_REFRESH_COOLDOWN = 60
+    PURGE_CHUNK_SIZE = 100
+    PURGE_CONCURRENCY = 3
+    PURGE_PROGRESS_INTERVAL = 3
+    PURGE_USER_SCAN_LIMIT = 3000
+    SLOW_CALL_THRESHOLD = 1.0
     
     # Channels
     FORCE_SUB_CHANNEL = os.getenv("FORCE_SUB_CHANNEL", "")
     LOGS_CHANNEL = int(os.getenv("LOGS_CHANNEL", 0))
     
+    # Flood / spam detector (in-memory, per chat)
+    FLOOD_MAX_MSGS = 6          # itne messages...
+    FLOOD_WINDOW = 8            # ...itne seconds mein = flood
+    FLOOD_DUP_LIMIT = 3         # same text itni baar window mein
+    FLOOD_WAVE_USERS = 5        # itne alag users same lamba text bheje
+    FLOOD_WAVE_WINDOW = 60
+    FLOOD_WAVE_MIN_LEN = 30
+    FLOOD_MAX_CHATS = 20000
+    FLOOD_MAX_USERS = 512
+    FLOOD_IDLE = 600
+
+    # Per-chat custom filter words
+    CUSTOM_WORDS_LIMIT = 100
+    VOCAB_CACHE_SIZE = 5000
+    PENDING_CHANNEL_TTL = 600
+
+    # get_chat / bot admin status cache (chatinfo.py)
+    CHAT_INFO_TTL = 3600
+    CHAT_INFO_CACHE_SIZE = 20000
+    ADMIN_CACHE_TTL = 300           # user admin hai ya nahi (member update pe turant invalidate)
+    ADMIN_CACHE_SIZE = 100000
+
+    # OMDb poster -> Telegram file_id (Mongo media_cache + memory)
+    POSTER_CACHE_SIZE = 5000
+    POSTER_CACHE_TTL = 86400
+
+    # OMDb lookups / request dedup, MovieQuery.key pe (titles.py)
+    OMDB_CACHE_SIZE = 5000
+    OMDB_CACHE_TTL = 86400
+    OMDB_MISS_TTL = 600             # "nahi mila" jaldi expire ho (OMDb error bhi yahi lagta hai)
+    REQUEST_DEDUP_TTL = 6 * 3600    # same chat mein same title ki request itni der tak dobara nahi
+    REQUEST_DEDUP_SIZE = 20000
+
+    # Text analysis offload: "" (inline), "thread" ya "process"
+    ANALYSIS_EXECUTOR = os.getenv("ANALYSIS_EXECUTOR", "")
+    ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", 2))
+    ANALYSIS_OFFLOAD_CHARS = 512
+    ANALYSIS_BATCH_SIZE = 32
+    ANALYSIS_BATCH_WAIT = 0.005
+    ANALYSIS_MEMO_SIZE = 20000      # same text ka classification result
+    ANALYSIS_MEMO_MAX_CHARS = 256
+    ANALYSIS_MAX_CHARS = 4096       # isse aage ka text classify nahi hota
+    ANALYSIS_BUDGET = 0.01          # sec CPU (thread time) ek message ke scan pe, phir OVER_BUDGET
+    INTENT_COOLDOWN = 600           # sec; ek chat mein same FAQ itni der mein ek hi baar
+    INTENT_COOLDOWN_SIZE = 20000
+    INTENT_REPLY_DELETE = 120       # sec baad FAQ reply delete
+    LOOP_LAG_INTERVAL = 0.5
+    # Loop lag (sec) jispe load shedding level 1/2/3 lagta hai
+    SHED_THRESHOLDS = (0.1, 0.3, 1.0)
+
+    # Multi-worker mode (supervisor N processes chalata hai)
+    WORKERS = int(os.getenv("WORKERS", 1))
+    WORKER_INDEX = int(os.getenv("WORKER_INDEX", 0))
+    SHARD_SECRET = os.getenv("SHARD_SECRET", "")   # supervisor har run pe khud banata hai
+    SHARD_FORWARD_TIMEOUT = 5       # sec; owner worker tak updates na pahunche to receiver khud handle
+    SHARD_OUTBOX_SIZE = 10000       # ek worker ke pending forward updates, isse zyada receiver khud handle
+    LEASE_TTL = 120
+
+    # Pyrogram session + peers Mongo mein (warm restart). "memory" = purana in_memory session
+    SESSION_STORAGE = os.getenv("SESSION_STORAGE", "mongo")
+    PEER_CACHE_SIZE = 200000
+    PEER_FLUSH_INTERVAL = 5
+    PEER_FLUSH_BATCH = 500
+
+    # Scheduled group updates (fan-out) — har active non-premium group ko promo message.
+    # Default band; chalana ho to cron do, jaise MOVIE_UPDATE_CRON="0 */6 * * *" (har 6 ghante)
+    MOVIE_UPDATE_CRON = os.getenv("MOVIE_UPDATE_CRON", "")
+    FANOUT_RATE = 20            # messages/sec, sab workers mila ke
+    FANOUT_CONCURRENCY = 8
+    FANOUT_PROGRESS_INTERVAL = 10
+
+    # Mongo slow/down: per-op deadline + circuit breaker (dbguard.py)
+    DB_OP_TIMEOUT = 2.0             # sec, ek guarded op
+    DB_SERVER_SELECTION_TIMEOUT = 5.0
+    DB_BREAKER_FAILURES = 5         # itne lagataar fail = degraded mode
+    DB_BREAKER_COOLDOWN = 15        # sec baad ek probe
+    DB_JOURNAL_SIZE = 10000         # buffered writes (bhar jaaye to purane drop)
+    DB_SNAPSHOT_SIZE = 100000       # last-known settings / flags
+    DB_CACHE_SIZE = 100000          # settings / flags read cache
+    DB_CACHE_TTL = 300              # sec; dusre worker ka write itni der tak purana dikh sakta hai
+
+    # Startup preload (settings / auto-accept / force-sub / premium)
+    PRELOAD_BATCH = 1000
+    PRELOAD_MAX_DOCS = 20000        # har collection se
+    PRELOAD_MAX_WAIT = 10           # sec; isse zyada lage to updates preload ke bina shuru
+
     # Features
     WELCOME_WITH_PHOTO = True
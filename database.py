@@ -1,10 +1,27 @@
+import asyncio
+import logging
+import random
+import time
 import motor.motor_asyncio
 import datetime
 from datetime import timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 from config import Config
-
-# MongoDB connection
-client = motor.motor_asyncio.AsyncIOMotorClient(Config.MONGO_DB_URL)
+from metrics import instrument, DB_DEGRADED
+from cache import TTLCache
+from dbguard import CircuitBreaker, WriteJournal, DBUnavailable
+from sharding import owns_chat, WORKER_ID
+
+logger = logging.getLogger(__name__)
+
+# MongoDB connection (chhote timeouts: Mongo down ho to 30s tak atakna nahi)
+client = motor.motor_asyncio.AsyncIOMotorClient(
+    Config.MONGO_DB_URL,
+    serverSelectionTimeoutMS=int(Config.DB_SERVER_SELECTION_TIMEOUT * 1000),
+    connectTimeoutMS=int(Config.DB_SERVER_SELECTION_TIMEOUT * 1000),
+)
 db = client["movie_helper_bot"]
 
 # Collections
@@ -16,10 +33,102 @@ warnings_col = db["warnings"]
 auto_accept_col = db["auto_accept"]
 movie_requests_col = db["movie_requests"]
 user_channels_col = db["user_channels"]  # New: user ke channels store karne ke liye
+leases_col = db["leases"]  # Background jobs ka exactly-once lock (multi-worker)
+schedules_col = db["schedules"]  # Cron jobs ka agla run time
+job_runs_col = db["job_runs"]  # Har scheduled run ka progress record
+sessions_col = db["pyrogram_sessions"]  # Pyrogram auth key / dc (warm restart)
+peers_col = db["pyrogram_peers"]  # Pyrogram peer cache (id -> access_hash)
+media_col = db["media_cache"]  # Poster URL / imdbID -> Telegram file_id
+migrations_col = db["migrations"]  # Ek baar chalne wale data migrations ka record
+
+# ================ DEGRADED MODE (dbguard.py) ================
+# Mongo slow/down: reads snapshot/defaults se, writes journal mein (recover pe replay)
+
+def _collection(name):
+    # Naam se lookup, taaki replay ke time wala collection object mile
+    return globals()[name]
+
+def _on_db_recovered():
+    journal.schedule_replay(_collection, breaker)
+
+breaker = CircuitBreaker(
+    "mongo", threshold=Config.DB_BREAKER_FAILURES, cooldown=Config.DB_BREAKER_COOLDOWN,
+    deadline=Config.DB_OP_TIMEOUT, on_close=_on_db_recovered
+)
+journal = WriteJournal(Config.DB_JOURNAL_SIZE)
+# Last-known values: ("settings", chat_id), ("auto_accept", id), ("force_sub", id), ("premium", id), ("warnings", chat, user)
+snapshot = TTLCache("db_snapshot", max_size=Config.DB_SNAPSHOT_SIZE)
+# Read cache: startup preload ya pehle read se bhara, DB_CACHE_TTL pe refresh, is worker ke
+# writes pe update. Dusre worker ka write yahan TTL tak purana dikh sakta hai.
+warm = TTLCache("db_warm", max_size=Config.DB_CACHE_SIZE, ttl=Config.DB_CACHE_TTL)
+# kind -> monotonic time tak: preload poora hua, cache mein nahi = Mongo mein bhi nahi
+_complete_until = {}
+_ABSENT = {"auto_accept": False, "force_sub": None, "premium": None}
+
+def _remember(key, value, ttl=None):
+    snapshot.set(key, value)
+    warm.set(key, value, ttl)
+
+async def _cached_read(key, loader, fallback):
+    """warm cache -> Mongo (breaker ke through, same key ke loads ek saath) -> snapshot/default"""
+    kind = key[0]
+    if kind in _ABSENT and key not in warm and time.monotonic() < _complete_until.get(kind, 0):
+        warm.set(key, _ABSENT[kind])
+    try:
+        return await warm.get_or_load(key, lambda: breaker.call(loader))
+    except DBUnavailable:
+        DB_DEGRADED.inc(op=kind, mode="fallback")
+        return fallback()
+
+async def _journaled(collection, method, *args, **kwargs):
+    """Write op deadline ke saath. Mongo na mile — ya journal mein pehle se writes pending
+    hon (order bana rahe) — to journal mein daalo aur None lautao.
+    Timeout wala write Mongo mein lag chuka ho sakta hai aur phir bhi replay hota hai —
+    isliye yahan sirf idempotent writes bhejo ($set / delete, ya add_warning jaisa op id)."""
+    if not len(journal):
+        try:
+            return await breaker.call(getattr(_collection(collection), method), *args, **kwargs)
+        except DBUnavailable:
+            pass
+    journal.append(collection, method, *args, **kwargs)
+    if breaker.state == "closed":
+        journal.schedule_replay(_collection, breaker)
+    return None
+
+def db_status() -> dict:
+    return {
+        "breaker": breaker.state,
+        "journal": len(journal),
+        "journal_dropped": journal.dropped,
+        "snapshot": len(snapshot),
+        "cached": len(warm),
+    }
+
+async def ping_db(timeout: float = 2) -> bool:
+    try:
+        await asyncio.wait_for(client.admin.command("ping"), timeout)
+        return True
+    except Exception:
+        return False
+
+async def ensure_indexes():
+    await asyncio.gather(
+        warnings_col.create_index([("chat_id", 1), ("user_id", 1)]),
+        warnings_col.create_index("last_warning"),
+        user_channels_col.create_index([("user_id", 1), ("channel_id", 1)]),
+        movie_requests_col.create_index([("status", 1), ("updated_at", 1)]),
+        users_col.create_index("banned"),
+        leases_col.create_index("expires_at", expireAfterSeconds=3600),
+        job_runs_col.create_index([("name", 1), ("slot", -1)]),
+        job_runs_col.create_index("started_at", expireAfterSeconds=30 * 86400),
+        peers_col.create_index("username", sparse=True),
+        peers_col.create_index("phone_number", sparse=True),
+    )
 
 # ================ USER FUNCTIONS ================
 async def add_user(user_id, username=None, first_name=None):
-    await users_col.update_one(
+    await _journaled(
+        "users_col", "update_one",
         {"_id": user_id},
         {"$set": {
             "username": username,
@@ -47,7 +156,8 @@ async def delete_user(user_id):
 
 # ================ GROUP FUNCTIONS ================
 async def add_group(group_id, title=None, username=None):
-    await groups_col.update_one(
+    await _journaled(
+        "groups_col", "update_one",
         {"_id": group_id},
         {"$set": {
             "title": title,
@@ -71,6 +181,23 @@ async def get_all_groups():
 async def remove_group(group_id):
     await groups_col.delete_one({"_id": group_id})
 
+async def deactivate_group(group_id):
+    """Bot nikala gaya / likh nahi sakta: delete nahi, bas fan-out se bahar (add_group wapas active karta hai)"""
+    await groups_col.update_one({"_id": group_id}, {"$set": {"active": False}})
+
+async def iter_broadcast_groups(after_id=None):
+    """Active groups _id order mein stream karo: (group_id, skip_reason ya None).
+    Premium groups "no broadcast" wale hain, unhe skip mark karo."""
+    query = {"active": {"$ne": False}}
+    if after_id is not None:
+        query["_id"] = {"$gt": after_id}
+    now = datetime.datetime.now()
+    cursor = groups_col.find(query, {"is_premium": 1, "premium_expiry": 1}).sort("_id", 1).batch_size(500)
+    async for group in cursor:
+        expiry = group.get("premium_expiry")
+        premium = group.get("is_premium") and expiry and expiry > now
+        yield group["_id"], "premium" if premium else None
+
 # ================ PREMIUM FUNCTIONS ================
 async def add_premium(group_id, months):
     expiry = datetime.datetime.now() + timedelta(days=30 * int(months))
@@ -79,71 +206,214 @@ async def add_premium(group_id, months):
         {"$set": {"is_premium": True, "premium_expiry": expiry}},
         upsert=True
     )
+    _remember(("premium", group_id), expiry)
     return expiry
 
 async def remove_premium(group_id):
-    await groups_col.update_one(
+    _remember(("premium", group_id), None)
+    await _journaled(
+        "groups_col", "update_one",
         {"_id": group_id},
         {"$set": {"is_premium": False, "premium_expiry": None}}
     )
 
-async def check_is_premium(group_id):
-    group = await groups_col.find_one({"_id": group_id})
+def _premium_expiry(group):
+    """Cache mein premium ki expiry rehti hai (premium nahi = None), expire check read ke time"""
     if not group or not group.get("is_premium"):
+        return None
+    # Bina expiry wala purana flag = expired
+    return group.get("premium_expiry") or datetime.datetime.min
+
+async def _load_premium(group_id):
+    group = await groups_col.find_one({"_id": group_id}, {"is_premium": 1, "premium_expiry": 1})
+    expiry = _premium_expiry(group)
+    snapshot.set(("premium", group_id), expiry)
+    return expiry
+
+async def check_is_premium(group_id):
+    key = ("premium", group_id)
+    expiry = await _cached_read(key, lambda: _load_premium(group_id), lambda: snapshot.get(key))
+    if expiry is None:
         return False
-    expiry = group.get("premium_expiry")
-    if expiry and expiry > datetime.datetime.now():
+    if expiry > datetime.datetime.now():
         return True
     await remove_premium(group_id)
     return False
 
 # ================ SETTINGS FUNCTIONS ================
+# Settings docs sparse hain: Mongo mein sirf woh keys jo DEFAULT_SETTINGS se alag hain.
+# Read pe defaults ke upar merge hota hai; doc hi na ho = sab defaults (read kabhi insert
+# nahi karta). Writes ek hi upsert: default wali value $unset, baaki $set.
+# Defaults badlo to SETTINGS_DEFAULTS_VERSION badhao — compaction migration dobara chalega.
+
+SETTINGS_DEFAULTS_VERSION = 1
+DEFAULT_SETTINGS = {
+    "spelling_on": True,
+    "spelling_mode": "simple",
+    "auto_delete_on": False,
+    "delete_time": 0,
+    "welcome_enabled": True,
+    "welcome_text": "",
+    "welcome_photo": None,
+    "welcome_buttons": [],
+    "ai_enabled": True,
+    "link_protection": True,
+    "abuse_protection": True,
+    "flood_protection": True,
+    "custom_abuse": [],
+    "custom_junk": [],
+    "allowed_words": [],
+    "filters_version": 0,
+}
+_NO_DEFAULT = object()
+
+def default_settings(chat_id) -> dict:
+    default = {"_id": chat_id, **DEFAULT_SETTINGS}
+    for key in ("welcome_buttons", "custom_abuse", "custom_junk", "allowed_words"):
+        default[key] = []
+    return default
+
+def merge_settings(chat_id, doc=None) -> dict:
+    """Sparse doc + defaults = poora settings dict"""
+    settings = default_settings(chat_id)
+    if doc:
+        settings.update(doc)
+    return settings
+
+def is_default_setting(key, value) -> bool:
+    return DEFAULT_SETTINGS.get(key, _NO_DEFAULT) == value
+
+def _settings_update(fields: dict) -> dict:
+    """fields -> {"$set": alag values, "$unset": default wali}"""
+    update = {}
+    changed = {k: v for k, v in fields.items() if not is_default_setting(k, v)}
+    if changed:
+        update["$set"] = changed
+    if len(changed) < len(fields):
+        update["$unset"] = {k: "" for k in fields if k not in changed}
+    return update
+
+def _offline_settings(chat_id) -> dict:
+    return snapshot.get(("settings", chat_id)) or default_settings(chat_id)
+
+async def _load_settings(chat_id):
+    settings = merge_settings(chat_id, await settings_col.find_one({"_id": chat_id}))
+    snapshot.set(("settings", chat_id), settings)
+    return settings
+
 async def get_settings(chat_id):
-    settings = await settings_col.find_one({"_id": chat_id})
-    if not settings:
-        default = {
-            "_id": chat_id,
-            "spelling_on": True,
-            "spelling_mode": "simple",
-            "auto_delete_on": False,
-            "delete_time": 0,
-            "welcome_enabled": True,
-            "welcome_text": "",
-            "welcome_photo": None,
-            "welcome_buttons": [],
-            "ai_enabled": True,
-            "link_protection": True,
-            "abuse_protection": True,
-        }
+    """Cached settings doc — ise mutate mat karo, badalna ho to update/set_settings"""
+    return await _cached_read(
+        ("settings", chat_id), lambda: _load_settings(chat_id), lambda: _offline_settings(chat_id)
+    )
+
+def _settings_written(chat_id, fields: dict, doc=None) -> dict:
+    """Write ke baad caches taaza rakho. `doc` = Mongo ka naya (sparse) doc; na mila
+    (journal / update_one) to cached doc pe fields apply karo."""
+    key = ("settings", chat_id)
+    if doc is None:
+        cached = warm.peek(key)
+        if cached is None:
+            # Poora doc pata nahi — sirf fallback snapshot mein, read cache Mongo se bharega
+            doc = {**(snapshot.peek(key) or default_settings(chat_id)), **fields}
+            snapshot.set(key, doc)
+            return doc
+        doc = {**cached, **fields}
+    else:
+        doc = merge_settings(chat_id, doc)
+    _remember(key, doc)
+    return doc
+
+def _settings_changed(chat_id):
+    """Jin writes ka naya doc haath mein nahi, unke baad agla read Mongo se"""
+    warm.pop(("settings", chat_id))
+
+async def update_settings(chat_id, key, value):
+    await _journaled("settings_col", "update_one", {"_id": chat_id}, _settings_update({key: value}), upsert=True)
+    _settings_written(chat_id, {key: value})
+
+async def set_settings(chat_id, fields: dict):
+    """Kai keys ek saath set karo; naya (merged) settings document lautata hai"""
+    doc = await _journaled(
+        "settings_col", "find_one_and_update",
+        {"_id": chat_id},
+        _settings_update(fields),
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return _settings_written(chat_id, fields, doc)
+
+async def toggle_setting(chat_id, key, default=True, values=(True, False)):
+    """Atomic toggle, ek hi DB op: values[0] ho to values[1], warna values[0].
+    Naya settings document lautata hai (menu dobara padhne ki zaroorat nahi).
+    Mongo na mile to snapshot se naya value nikal ke set_settings journal karta hai — pipeline
+    journal nahi karte, timeout ke baad lag chuka ho to replay dobara toggle kar deta."""
+    default = DEFAULT_SETTINGS.get(key, default)
+    if breaker.state == "closed" and not len(journal):
+        current = {"$ifNull": [f"${key}", default]}
+        new = {"$cond": [{"$eq": [current, values[0]]}, values[1], values[0]]}
         try:
-            await settings_col.insert_one(default)
-        except:
+            doc = await breaker.call(
+                settings_col.find_one_and_update,
+                {"_id": chat_id},
+                # Naya value default ho to key hi hata do (sparse)
+                [{"$set": {key: {"$cond": [{"$eq": [new, default]}, "$$REMOVE", new]}}}],
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return _settings_written(chat_id, {}, doc)
+        except DBUnavailable:
             pass
-        return default
-    return settings
+    current = _offline_settings(chat_id).get(key, default)
+    return await set_settings(chat_id, {key: values[1] if current == values[0] else values[0]})
 
-async def update_settings(chat_id, key, value):
+# ================ CUSTOM FILTER WORDS ================
+# Har change pe filters_version badhta hai, compiled matcher cache usi se invalidate hota hai
+
+async def add_custom_word(chat_id, kind, word):
+    """kind: "abuse" ya "junk" """
     await settings_col.update_one(
         {"_id": chat_id},
-        {"$set": {key: value}},
+        {"$addToSet": {f"custom_{kind}": word}, "$pull": {"allowed_words": word},
+         "$inc": {"filters_version": 1}},
         upsert=True
     )
+    _settings_changed(chat_id)
+
+async def remove_custom_word(chat_id, word, allow_default=False):
+    """Custom lists se hatao; default word ho to allowed_words mein daalo"""
+    update = {"$pull": {"custom_abuse": word, "custom_junk": word}, "$inc": {"filters_version": 1}}
+    if allow_default:
+        update["$addToSet"] = {"allowed_words": word}
+    await settings_col.update_one({"_id": chat_id}, update, upsert=True)
+    _settings_changed(chat_id)
+
+async def reset_custom_words(chat_id):
+    doc = await settings_col.find_one_and_update(
+        {"_id": chat_id},
+        {"$unset": {"custom_abuse": "", "custom_junk": "", "allowed_words": ""},
+         "$inc": {"filters_version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return _settings_written(chat_id, {}, doc)
 
 # ================ WELCOME FUNCTIONS ================
 async def set_welcome_message(chat_id, text, photo_id=None, buttons=None):
     await settings_col.update_one(
         {"_id": chat_id},
-        {"$set": {
+        _settings_update({
             "welcome_text": text,
             "welcome_photo": photo_id,
             "welcome_buttons": buttons or [],
             "welcome_enabled": True
-        }},
+        }),
         upsert=True
     )
+    _settings_changed(chat_id)
 
 async def get_welcome_message(chat_id):
-    s = await settings_col.find_one({"_id": chat_id})
+    s = await get_settings(chat_id)
     if s and (s.get("welcome_text") or s.get("welcome_photo")):
         return {
             "text": s.get("welcome_text", ""),
@@ -159,12 +429,20 @@ async def set_force_sub(chat_id, channel_id):
         {"$set": {"channel_id": channel_id}},
         upsert=True
     )
+    _remember(("force_sub", chat_id), {"_id": chat_id, "channel_id": channel_id})
+
+async def _load_force_sub(chat_id):
+    fsub = await force_sub_col.find_one({"_id": chat_id})
+    snapshot.set(("force_sub", chat_id), fsub)
+    return fsub
 
 async def get_force_sub(chat_id):
-    return await force_sub_col.find_one({"_id": chat_id})
+    key = ("force_sub", chat_id)
+    return await _cached_read(key, lambda: _load_force_sub(chat_id), lambda: snapshot.get(key))
 
 async def remove_force_sub(chat_id):
     await force_sub_col.delete_one({"_id": chat_id})
+    _remember(("force_sub", chat_id), None)
 
 # ================ USER CHANNELS (AUTO ACCEPT) ================
 async def add_user_channel(user_id, channel_id, channel_title, channel_username=None):
@@ -195,6 +473,7 @@ async def remove_user_channel(user_id, channel_id):
     await user_channels_col.delete_one({"user_id": user_id, "channel_id": channel_id})
     # Auto accept bhi band karo
     await auto_accept_col.delete_one({"_id": channel_id})
+    _remember(("auto_accept", channel_id), False)
 
 async def toggle_channel_auto_accept(user_id, channel_id, status: bool):
     await user_channels_col.update_one(
@@ -213,32 +492,54 @@ async def toggle_channel_auto_accept(user_id, channel_id, status: bool):
             {"$set": {"enabled": False}},
             upsert=True
         )
+    _remember(("auto_accept", channel_id), status)
 
 # ================ AUTO ACCEPT ================
 async def set_auto_accept(chat_id, status: bool):
-    await auto_accept_col.update_one(
-        {"_id": chat_id},
-        {"$set": {"enabled": status}},
-        upsert=True
-    )
+    await _journaled("auto_accept_col", "update_one", {"_id": chat_id}, {"$set": {"enabled": status}}, upsert=True)
+    _remember(("auto_accept", chat_id), status)
 
-async def get_auto_accept(chat_id):
+async def _load_auto_accept(chat_id):
     data = await auto_accept_col.find_one({"_id": chat_id})
-    return data.get("enabled", False) if data else False
+    enabled = data.get("enabled", False) if data else False
+    snapshot.set(("auto_accept", chat_id), enabled)
+    return enabled
+
+async def get_auto_accept(chat_id):
+    key = ("auto_accept", chat_id)
+    return await _cached_read(key, lambda: _load_auto_accept(chat_id), lambda: snapshot.get(key, False))
 
 # ================ WARNING SYSTEM ================
+# Har warning ka apna op id doc ke `ops` mein jaata hai. Timeout hua write Mongo mein lag
+# chuka ho sakta hai aur phir bhi journal se replay hota hai — id pehle se ho to replay
+# kuch nahi karta, warning do baar nahi ginti.
+# Itne recent op ids doc mein rehte hain (journal replay inse purana nahi hota)
+WARNING_OP_IDS = 20
+
 async def add_warning(chat_id, user_id):
-    data = await warnings_col.find_one({"chat_id": chat_id, "user_id": user_id})
-    count = (data["count"] + 1) if data else 1
-    await warnings_col.update_one(
+    """Ek hi atomic op. Mongo na mile to snapshot ke count se aage ginte hain (op journal hota hai)"""
+    op_id = ObjectId()
+    ops = {"$ifNull": ["$ops", []]}
+    applied = {"$in": [op_id, ops]}
+    doc = await _journaled(
+        "warnings_col", "find_one_and_update",
         {"chat_id": chat_id, "user_id": user_id},
-        {"$set": {"count": count, "last_warning": datetime.datetime.now()}},
-        upsert=True
+        [{"$set": {
+            "count": {"$cond": [applied, "$count", {"$add": [{"$ifNull": ["$count", 0]}, 1]}]},
+            "last_warning": {"$cond": [applied, "$last_warning", datetime.datetime.now()]},
+            "ops": {"$cond": [applied, ops, {"$slice": [{"$concatArrays": [ops, [op_id]]}, -WARNING_OP_IDS]}]},
+        }}],
+        upsert=True,
+        return_document=ReturnDocument.AFTER
     )
+    key = ("warnings", chat_id, user_id)
+    count = doc["count"] if doc else (snapshot.peek(key) or 0) + 1
+    snapshot.set(key, count)
     return count
 
 async def reset_warnings(chat_id, user_id):
-    await warnings_col.delete_one({"chat_id": chat_id, "user_id": user_id})
+    snapshot.pop(("warnings", chat_id, user_id))
+    await _journaled("warnings_col", "delete_one", {"chat_id": chat_id, "user_id": user_id})
 
 # ================ MOVIE REQUESTS ================
 async def add_movie_request(chat_id, user_id, movie_name):
@@ -269,6 +570,93 @@ async def get_bot_stats():
     }
     return stats
 
+# ================ JOB LEASES ================
+async def acquire_lease(name, owner, ttl):
+    """Lease mil gayi (ya renew hui) to True. Expire hone tak koi aur worker nahi le sakta."""
+    now = datetime.datetime.now()
+    try:
+        doc = await leases_col.find_one_and_update(
+            {"_id": name, "$or": [{"owner": owner}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=ttl)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Kisi aur worker ke paas valid lease hai
+        return False
+    return bool(doc and doc.get("owner") == owner)
+
+async def release_lease(name, owner):
+    await leases_col.delete_one({"_id": name, "owner": owner})
+
+# ================ SCHEDULED JOBS ================
+async def get_schedule(name):
+    return await schedules_col.find_one({"_id": name})
+
+async def set_schedule(name, spec, next_run):
+    await schedules_col.update_one(
+        {"_id": name},
+        {"$set": {"spec": spec, "next_run": next_run}},
+        upsert=True
+    )
+
+async def start_job_run(name, slot, worker):
+    """Slot ka run record banao ya (crash ke baad) existing wala lautao"""
+    now = datetime.datetime.now()
+    return await job_runs_col.find_one_and_update(
+        {"_id": f"{name}:{slot:%Y%m%d%H%M}"},
+        {"$set": {"worker": worker, "updated_at": now},
+         "$setOnInsert": {"name": name, "slot": slot, "status": "running", "started_at": now,
+                          "stats": {}, "resume_after": None}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
+async def update_job_run(run_id, fields):
+    fields = dict(fields, updated_at=datetime.datetime.now())
+    await job_runs_col.update_one({"_id": run_id}, {"$set": fields})
+
+async def get_job_runs(limit=5):
+    return await job_runs_col.find({}).sort("slot", -1).limit(limit).to_list(limit)
+
+# ================ PYROGRAM STORAGE ================
+async def load_session(name):
+    return await sessions_col.find_one({"_id": name})
+
+async def save_session(name, fields):
+    await sessions_col.update_one({"_id": name}, {"$set": fields}, upsert=True)
+
+async def delete_session(name):
+    await sessions_col.delete_one({"_id": name})
+
+async def find_peer(query):
+    return await peers_col.find_one(query, sort=[("updated_at", -1)])
+
+async def upsert_peers(peers):
+    """peers: {peer_id: {access_hash, type, username, phone_number, updated_at}} — ek bulk write"""
+    if not peers:
+        return
+    await peers_col.bulk_write(
+        [UpdateOne({"_id": pid}, {"$set": doc}, upsert=True) for pid, doc in peers.items()],
+        ordered=False
+    )
+
+# ================ MEDIA CACHE (POSTER FILE_ID) ================
+
+async def get_media_file_id(key):
+    doc = await media_col.find_one({"_id": key})
+    return doc.get("file_id") if doc else None
+
+async def save_media_file_id(key, file_id, source=None):
+    await media_col.update_one(
+        {"_id": key},
+        {"$set": {"file_id": file_id, "source": source, "updated_at": datetime.datetime.now()}},
+        upsert=True
+    )
+
+async def delete_media_file_id(key):
+    await media_col.delete_one({"_id": key})
+
 # ================ CLEANUP ================
 async def clear_junk():
     counts = {"banned_users": 0, "old_warnings": 0, "old_requests": 0}
@@ -282,4 +670,118 @@ async def clear_junk():
         "updated_at": {"$lt": week_ago}
     })
     counts["old_requests"] = r.deleted_count
+    counts["legacy_pending"] = await clear_legacy_pending_channels()
     return counts
+
+async def clear_legacy_pending_channels():
+    """Purane code ne pending channels settings_col mein `-user_id` / -99999999 docs
+    ke andar likhe the; ab woh memory cache mein hain, purani keys hatao"""
+    removed = 0
+    r = await settings_col.delete_one({"_id": -99999999})
+    removed += r.deleted_count
+    async for doc in settings_col.find({"_id": {"$lt": 0, "$gt": -10**10}}):
+        keys = [k for k in doc if k.startswith("pending_channel_")]
+        if not keys:
+            continue
+        if len(doc) == len(keys) + 1:
+            await settings_col.delete_one({"_id": doc["_id"]})
+        else:
+            await settings_col.update_one({"_id": doc["_id"]}, {"$unset": {k: "" for k in keys}})
+        removed += 1
+    return removed
+
+# ================ MIGRATIONS ================
+
+async def compact_settings(batch_size=500) -> dict:
+    """Purane full settings docs se default values (aur legacy pending_channel_* keys) hatao.
+    Filter mein hatayi ja rahi values bhi hain, to beech mein badli key chhooti nahi.
+    Sirf defaults wale docs {_id} reh jaate hain (delete nahi — race mein naya write kho sakta tha)."""
+    stats = {"scanned": 0, "compacted": 0, "emptied": 0, "keys_removed": 0}
+    ops = []
+    async for doc in settings_col.find({}).batch_size(batch_size):
+        stats["scanned"] += 1
+        drop = [k for k, v in doc.items()
+                if k != "_id" and (is_default_setting(k, v) or k.startswith("pending_channel_"))]
+        if not drop:
+            continue
+        match = {"_id": doc["_id"]}
+        match.update({k: doc[k] for k in drop if not k.startswith("pending_channel_")})
+        ops.append(UpdateOne(match, {"$unset": {k: "" for k in drop}}))
+        stats["compacted"] += 1
+        stats["keys_removed"] += len(drop)
+        if len(drop) == len(doc) - 1:
+            stats["emptied"] += 1
+        if len(ops) >= batch_size:
+            await settings_col.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await settings_col.bulk_write(ops, ordered=False)
+    return stats
+
+async def run_migrations():
+    """Har defaults version pe compaction ek baar (multi-worker mein lease se ek hi worker)"""
+    name = f"settings_sparse_v{SETTINGS_DEFAULTS_VERSION}"
+    if await migrations_col.find_one({"_id": name}):
+        return None
+    if not await acquire_lease(f"migration:{name}", WORKER_ID, Config.LEASE_TTL):
+        return None
+    try:
+        stats = await compact_settings()
+        await migrations_col.update_one(
+            {"_id": name}, {"$set": {"done_at": datetime.datetime.now(), "stats": stats}}, upsert=True
+        )
+        logger.info(f"🗜 Migration {name}: {stats}")
+        return stats
+    finally:
+        await release_lease(f"migration:{name}", WORKER_ID)
+
+# ================ STARTUP PRELOAD ================
+# Restart ke baad har group ka pehla message / join request cold find_one karta tha (Mongo pe
+# herd). Startup pe yeh collections bade batches mein stream karke read cache bhar do.
+# Sirf is worker ke chats; har collection PRELOAD_MAX_DOCS tak (memory bounded).
+
+async def _preload(kind, col, projection, value_of) -> int:
+    count = 0
+    truncated = False
+    last_log = time.monotonic()
+    cursor = col.find({}, projection).batch_size(Config.PRELOAD_BATCH)
+    async for doc in cursor:
+        if not owns_chat(doc["_id"]):
+            continue
+        if count >= Config.PRELOAD_MAX_DOCS:
+            truncated = True
+            break
+        # TTL mein jitter, taaki sab entries ek saath expire hoke dobara herd na banayein
+        _remember((kind, doc["_id"]), value_of(doc), ttl=Config.DB_CACHE_TTL * random.uniform(0.5, 1.0))
+        count += 1
+        if count % Config.PRELOAD_BATCH == 0:
+            await asyncio.sleep(0)
+            if time.monotonic() - last_log >= 5:
+                last_log = time.monotonic()
+                logger.info(f"📦 Preload {kind}: {count} docs...")
+    if truncated:
+        logger.warning(f"📦 Preload {kind}: {Config.PRELOAD_MAX_DOCS} docs pe ruka, baaki on-demand")
+    else:
+        # Poora collection aa gaya: cache mein nahi = Mongo mein bhi nahi (TTL tak)
+        _complete_until[kind] = time.monotonic() + Config.DB_CACHE_TTL * 0.5
+    return count
+
+async def preload_caches() -> dict:
+    """settings, auto_accept, force_sub aur premium flags ek saath cache mein"""
+    kinds = ("settings", "auto_accept", "force_sub", "premium")
+    counts = await asyncio.gather(
+        _preload("settings", settings_col, None, lambda d: merge_settings(d["_id"], d)),
+        _preload("auto_accept", auto_accept_col, {"enabled": 1}, lambda d: d.get("enabled", False)),
+        _preload("force_sub", force_sub_col, None, lambda d: d),
+        _preload("premium", groups_col, {"is_premium": 1, "premium_expiry": 1}, _premium_expiry),
+    )
+    counts = dict(zip(kinds, counts))
+    logger.info(f"📦 Preload done: {counts}")
+    return counts
+
+# ================ INSTRUMENTATION ================
+# Is module ke har coroutine ka latency/error record ho (kind="db")
+import inspect as _inspect
+for _name, _fn in list(globals().items()):
+    if _inspect.iscoroutinefunction(_fn) and _fn.__module__ == __name__:
+        globals()[_name] = instrument(_name, kind="db")(_fn)
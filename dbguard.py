@@ -0,0 +1,137 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from pymongo.errors import ConnectionFailure, ExecutionTimeout
+from metrics import DB_BREAKER_STATE, DB_DEGRADED, DB_JOURNAL_DROPPED, QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+# ===================== DB CIRCUIT BREAKER =====================
+# Mongo slow / down ho to har handler 30s tak atakta tha aur moderation ruk jaata tha.
+# Har guarded op ki chhoti deadline hai; lagataar fail hone pe breaker "open" ho jaata
+# hai aur cooldown tak Mongo ko call hi nahi karte:
+#   reads  -> last-known snapshot ya hardcoded defaults (fallback)
+#   writes -> bounded in-memory journal, recover hone pe usi order mein replay
+# Cooldown ke baad ek probe op jaata hai (half-open); chal gaya to breaker band + replay.
+# Journal process memory mein hai — restart pe pending writes chale jaate hain.
+
+# Yeh errors = Mongo tak pahunch nahi / jawab time pe nahi. DuplicateKey jaise errors
+# ka matlab Mongo zinda hai, woh breaker nahi kholte.
+BREAKER_ERRORS = (asyncio.TimeoutError, ConnectionFailure, ExecutionTimeout)
+
+_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+class DBUnavailable(Exception):
+    """Breaker open hai ya op deadline/connection error se fail hua"""
+
+class CircuitBreaker:
+
+    def __init__(self, name: str, threshold: int, cooldown: float, deadline: float, on_close=None):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.deadline = deadline
+        self.on_close = on_close
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        DB_BREAKER_STATE.set_function(lambda: _STATE_VALUES[self.state], breaker=name)
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+        if self.state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != "closed":
+            self.state = "closed"
+            logger.info(f"✅ {self.name}: wapas aa gaya, breaker band")
+            if self.on_close:
+                self.on_close()
+
+    def record_failure(self, error=None):
+        self.failures += 1
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.threshold):
+            if self.state == "closed":
+                logger.warning(f"⚠️ {self.name}: {self.failures} fail ({error!r}), degraded mode {self.cooldown}s")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    async def call(self, fn, *args, **kwargs):
+        """`await fn(*args)` deadline ke saath; breaker open ho to turant DBUnavailable"""
+        if not self.allow():
+            raise DBUnavailable(f"{self.name} breaker {self.state}")
+        probe = self.state == "half_open"
+        try:
+            result = await asyncio.wait_for(fn(*args, **kwargs), self.deadline)
+        except DBUnavailable:
+            # Andar wala guarded op — woh khud record kar chuka
+            raise
+        except BREAKER_ERRORS as e:
+            self.record_failure(e)
+            raise DBUnavailable(str(e) or type(e).__name__) from e
+        except Exception:
+            self.record_success()
+            raise
+        finally:
+            if probe:
+                self.probing = False
+        self.record_success()
+        return result
+
+class WriteJournal:
+    """Degraded mode ke writes: (collection, method, args, kwargs). Bhar jaaye to sabse purana drop."""
+
+    def __init__(self, max_size: int):
+        self.entries = deque(maxlen=max_size)
+        self.dropped = 0
+        self.replaying = False
+        self._task = None
+        QUEUE_DEPTH.set_function(lambda: len(self.entries), queue="db_journal")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def append(self, collection: str, method: str, *args, **kwargs):
+        if len(self.entries) == self.entries.maxlen:
+            self.dropped += 1
+            DB_JOURNAL_DROPPED.inc()
+        self.entries.append((collection, method, args, kwargs))
+        DB_DEGRADED.inc(op=f"{collection}.{method}", mode="journal")
+
+    async def replay(self, resolve, breaker: CircuitBreaker) -> int:
+        """Purane se naye order mein chalao. Mongo phir gaya to baaki entries wahin rehti hain.
+        resolve(collection_name) -> collection object"""
+        if self.replaying:
+            return 0
+        self.replaying = True
+        done = 0
+        try:
+            while self.entries:
+                collection, method, args, kwargs = self.entries[0]
+                try:
+                    await breaker.call(getattr(resolve(collection), method), *args, **kwargs)
+                except DBUnavailable:
+                    break
+                except Exception as e:
+                    logger.warning(f"Journal replay: {collection}.{method} drop ({e})")
+                self.entries.popleft()
+                done += 1
+        finally:
+            self.replaying = False
+        if done:
+            logger.info(f"📼 Journal replay: {done} writes, {len(self.entries)} baaki")
+        return done
+
+    def schedule_replay(self, resolve, breaker: CircuitBreaker):
+        if self.entries and not self.replaying and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self.replay(resolve, breaker))
+        return self._task
@@ -0,0 +1,154 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from pyrogram.errors import (
+    FloodWait, ChatWriteForbidden, ChannelPrivate, ChannelInvalid, ChatIdInvalid,
+    UserIsBlocked, InputUserDeactivated
+)
+from config import Config
+from metrics import FANOUT_SENDS, QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+# ===================== FAN-OUT ENGINE =====================
+# Ek message bahut saare chats ko. Targets async iterator se stream hote hain (poori
+# list memory mein nahi aati), kuch workers concurrently bhejte hain, ek shared token
+# bucket global rate limit rakhta hai aur FloodWait aaye to sab workers ek saath rukte hain.
+
+# Yeh errors = chat mein ab bhej hi nahi sakte (PeerIdInvalid nahi — woh sirf peer cache miss hai)
+DEAD_CHAT_ERRORS = (
+    ChatWriteForbidden, ChannelPrivate, ChannelInvalid, ChatIdInvalid,
+    UserIsBlocked, InputUserDeactivated
+)
+
+class RateLimiter:
+    """Token bucket: `rate` sends/sec. pause() FloodWait ke baad sabko rokta hai."""
+
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+class Fanout:
+    """
+    send(chat_id)            -> ek chat ko bhejne wala coroutine
+    on_dead(chat_id)         -> chat band ho gaya (bot nikala gaya / likh nahi sakte)
+    on_progress(stats, mark) -> har progress_interval pe; `mark` tak ke sab targets ho chuke
+    """
+
+    def __init__(self, name: str, send, on_dead=None, on_progress=None, rate: float = None,
+                 concurrency: int = None, retries: int = 2, progress_interval: float = None):
+        self.name = name
+        self.send = send
+        self.on_dead = on_dead
+        self.on_progress = on_progress
+        self.concurrency = concurrency or Config.FANOUT_CONCURRENCY
+        self.retries = retries
+        self.progress_interval = progress_interval or Config.FANOUT_PROGRESS_INTERVAL
+        self.limiter = RateLimiter(rate or Config.FANOUT_RATE)
+        self.stats = {"sent": 0, "skipped": 0, "failed": 0, "dead": 0}
+        self.cancelled = False
+        # Resume watermark: targets stream order mein, done hote hi set mein
+        self._order = deque()
+        self._done = set()
+        self.watermark = None
+
+    def _count(self, result: str):
+        self.stats[result] += 1
+        FANOUT_SENDS.inc(job=self.name, result=result)
+
+    def _advance_watermark(self):
+        while self._order and self._order[0] in self._done:
+            self.watermark = self._order.popleft()
+            self._done.discard(self.watermark)
+        return self.watermark
+
+    async def _deliver(self, chat_id):
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire()
+            try:
+                await self.send(chat_id)
+                return self._count("sent")
+            except FloodWait as e:
+                self.limiter.pause(e.value + 1)
+            except DEAD_CHAT_ERRORS:
+                self._count("dead")
+                if self.on_dead:
+                    try:
+                        await self.on_dead(chat_id)
+                    except Exception as e:
+                        logger.warning(f"Fan-out {self.name}: on_dead({chat_id}) fail: {e}")
+                return
+            except Exception as e:
+                logger.debug(f"Fan-out {self.name}: {chat_id} fail: {e}")
+                break
+        self._count("failed")
+
+    async def _report(self):
+        if self.on_progress:
+            try:
+                await self.on_progress(dict(self.stats), self._advance_watermark())
+            except Exception as e:
+                logger.warning(f"Fan-out {self.name}: progress save fail: {e}")
+
+    async def run(self, targets) -> dict:
+        """targets: async iterator of (chat_id, skip_reason ya None)"""
+        queue = asyncio.Queue(maxsize=self.concurrency * 4)
+        QUEUE_DEPTH.set_function(queue.qsize, queue=f"fanout_{self.name}")
+
+        async def feeder():
+            try:
+                async for chat_id, skip in targets:
+                    if self.cancelled:
+                        break
+                    self._order.append(chat_id)
+                    if skip:
+                        self._count("skipped")
+                        self._done.add(chat_id)
+                        continue
+                    await queue.put(chat_id)
+            finally:
+                for _ in range(self.concurrency):
+                    await queue.put(None)
+
+        async def worker():
+            while True:
+                chat_id = await queue.get()
+                if chat_id is None:
+                    return
+                await self._deliver(chat_id)
+                self._done.add(chat_id)
+
+        async def reporter():
+            while True:
+                await asyncio.sleep(self.progress_interval)
+                await self._report()
+
+        progress = asyncio.create_task(reporter())
+        try:
+            await asyncio.gather(feeder(), *[worker() for _ in range(self.concurrency)])
+        finally:
+            progress.cancel()
+        await self._report()
+        return dict(self.stats)
@@ -0,0 +1,122 @@
+import time
+from collections import OrderedDict, deque
+from config import Config
+from metrics import QUEUE_DEPTH, FLOOD_HITS
+
+# ===================== FLOOD / SPAM DETECTOR =====================
+# Har chat ke har user ke liye chhote ring buffers (timestamps + message hashes).
+# Check O(1) hai aur koi DB call nahi hoti. Memory bounded: chats aur users dono
+# LRU order mein rakhe jaate hain, idle wale apne aap nikal jaate hain.
+
+class _UserWindow:
+    __slots__ = ("times", "hashes", "last_seen")
+
+    def __init__(self, size: int, now: float):
+        self.times = deque(maxlen=size)
+        self.hashes = deque(maxlen=size)
+        self.last_seen = now
+
+class _ChatWindow:
+    __slots__ = ("users", "wave", "wave_counts", "last_seen")
+
+    def __init__(self, now: float):
+        self.users = OrderedDict()
+        # Chat-wide copy-paste wave: (time, hash, user) aur hash -> set(users)
+        self.wave = deque()
+        self.wave_counts = {}
+        self.last_seen = now
+
+class FloodDetector:
+
+    def __init__(self, max_msgs: int = None, window: float = None, dup_limit: int = None,
+                 wave_users: int = None, wave_window: float = None, wave_min_len: int = None,
+                 max_chats: int = None, max_users: int = None, idle: float = None):
+        self.max_msgs = max_msgs or Config.FLOOD_MAX_MSGS
+        self.window = window or Config.FLOOD_WINDOW
+        self.dup_limit = dup_limit or Config.FLOOD_DUP_LIMIT
+        self.wave_users = wave_users or Config.FLOOD_WAVE_USERS
+        self.wave_window = wave_window or Config.FLOOD_WAVE_WINDOW
+        self.wave_min_len = wave_min_len or Config.FLOOD_WAVE_MIN_LEN
+        self.max_chats = max_chats or Config.FLOOD_MAX_CHATS
+        self.max_users = max_users or Config.FLOOD_MAX_USERS
+        self.idle = idle or Config.FLOOD_IDLE
+        self.chats = OrderedDict()
+
+    def check(self, chat_id: int, user_id: int, text: str, now: float = None):
+        """None ya reason ("FLOOD" / "DUPLICATE" / "WAVE")"""
+        now = now or time.monotonic()
+        chat = self._chat(chat_id, now)
+        user = self._user(chat, user_id, now)
+        h = hash(" ".join(text.casefold().split()))
+
+        user.times.append(now)
+        user.hashes.append(h)
+
+        # N messages T seconds mein (ring full + sabse purana window ke andar)
+        if len(user.times) == user.times.maxlen and now - user.times[0] <= self.window:
+            return self._hit(user, "FLOOD")
+
+        # Same text baar baar (window ke andar); ring chhota hai isliye yeh bhi O(1)
+        dups = sum(1 for t, old in zip(user.times, user.hashes) if old == h and now - t <= self.window)
+        if dups >= self.dup_limit:
+            return self._hit(user, "DUPLICATE")
+
+        if len(text) >= self.wave_min_len and self._wave(chat, h, user_id, now):
+            return self._hit(user, "WAVE")
+        return None
+
+    def _hit(self, user: _UserWindow, reason: str) -> str:
+        FLOOD_HITS.inc(reason=reason)
+        # Reset taaki agla hit naye N messages ke baad hi ho (warning spam na ho)
+        user.times.clear()
+        user.hashes.clear()
+        return reason
+
+    def _wave(self, chat: _ChatWindow, h: int, user_id: int, now: float) -> bool:
+        while chat.wave and now - chat.wave[0][0] > self.wave_window:
+            _, old_h, old_u = chat.wave.popleft()
+            users = chat.wave_counts.get(old_h)
+            if users is not None:
+                users.discard(old_u)
+                if not users:
+                    del chat.wave_counts[old_h]
+        if len(chat.wave) >= self.max_users:
+            return False
+        chat.wave.append((now, h, user_id))
+        users = chat.wave_counts.setdefault(h, set())
+        users.add(user_id)
+        return len(users) >= self.wave_users
+
+    def _chat(self, chat_id: int, now: float) -> _ChatWindow:
+        chat = self.chats.get(chat_id)
+        if chat is None:
+            # last_seen = now pehle se, warna idle sweep naya entry hi nikal deta
+            chat = self.chats[chat_id] = _ChatWindow(now)
+            self._evict(self.chats, self.max_chats, now)
+        else:
+            self.chats.move_to_end(chat_id)
+        chat.last_seen = now
+        return chat
+
+    def _user(self, chat: _ChatWindow, user_id: int, now: float) -> _UserWindow:
+        user = chat.users.get(user_id)
+        if user is None:
+            user = chat.users[user_id] = _UserWindow(self.max_msgs, now)
+            self._evict(chat.users, self.max_users, now)
+        else:
+            chat.users.move_to_end(user_id)
+        user.last_seen = now
+        return user
+
+    def _evict(self, table: OrderedDict, limit: int, now: float):
+        """LRU front se: limit se upar wale aur idle wale nikalo (amortized O(1))"""
+        while len(table) > limit:
+            table.popitem(last=False)
+        while table:
+            oldest = next(iter(table.values()))
+            if now - oldest.last_seen <= self.idle:
+                break
+            table.popitem(last=False)
+
+flood_detector = FloodDetector()
+QUEUE_DEPTH.set_function(lambda: len(flood_detector.chats), queue="flood_tracked_chats")
@@ -0,0 +1,98 @@
+from config import Config
+from cache import TTLCache
+from matcher import token_form
+from metrics import INTENT_HITS
+
+# ===================== KEYWORD INTENTS =====================
+# Purana trigger filters.regex(r'(how|where|when).*(download|watch|get).*(movie|film|series)')
+# tha — teen `.*` ki wajah se non-matching lamba message (4096 chars "how get how get ...")
+# cubic backtracking karta tha aur event loop seconds tak ruk jaata tha.
+# Ab intent = keyword stages: har stage ka koi word, isi order mein, alag tokens mein.
+# Tokens ek pass mein dekhe jaate hain, har token pe constant kaam.
+# Intents alag handler nahi hain: group_filter (bot.py) classify ke baad intent_router
+# se poochta hai, per-chat cooldown ke andar dobara jawab nahi jaata.
+
+# Isse lambe text ka baaki hissa intent ke liye nahi dekha jaata
+INTENT_MAX_CHARS = 1024
+
+class KeywordIntent:
+    """Words prefix se match hote hain: "movies", "downloading" bhi chalega.
+    Words bhi matcher.token_form se normalize hote hain, text ki tarah.
+    reply: group mein bhejne wala jawab, delete_after sec baad delete hota hai."""
+
+    def __init__(self, name: str, stages: list, reply: str = "", delete_after: float = 0):
+        self.name = name
+        self.reply = reply
+        self.delete_after = delete_after
+        self.stages = []
+        for words in stages:
+            forms = frozenset(token_form(w).strip() for w in words)
+            self.stages.append((forms, sorted({len(w) for w in forms})))
+
+    def match(self, text: str) -> bool:
+        stage = 0
+        forms, lengths = self.stages[0]
+        for token in token_form(text[:INTENT_MAX_CHARS]).split():
+            for n in lengths:
+                if token[:n] in forms:
+                    stage += 1
+                    if stage == len(self.stages):
+                        return True
+                    forms, lengths = self.stages[stage]
+                    break
+        return False
+
+class IntentRouter:
+    """group_filter ke andar chalta hai: text -> pehla matching intent.
+    Har (chat, intent) ka cooldown — FAQ ek chat mein window mein ek hi baar post hota hai."""
+
+    def __init__(self, intents: list, cooldown: float, max_chats: int):
+        self.intents = intents
+        self.cooldown = cooldown
+        self.recent = TTLCache("intent_cooldown", max_size=max_chats, ttl=cooldown)
+
+    def match(self, text: str):
+        for intent in self.intents:
+            if intent.match(text):
+                return intent
+        return None
+
+    def claim(self, chat_id, intent: KeywordIntent) -> bool:
+        """True = abhi jawab do; False = is chat mein cooldown chal raha hai"""
+        if self.recent.add((chat_id, intent.name)):
+            INTENT_HITS.inc(intent=intent.name, result="replied")
+            return True
+        INTENT_HITS.inc(intent=intent.name, result="cooldown")
+        return False
+
+DOWNLOAD_HELP_TEXT = """
+🔍 **Looking for Movies?**
+
+📌 **How to Find Movies:**
+1. Use proper format: `Movie Name (Year) [Language]`
+2. Check pinned messages for available content
+3. Use `/request` command for specific movies
+4. Browse through group files/search
+
+🚫 **Important:**
+• Direct download links are not allowed
+• Respect copyright laws
+• Support official platforms when possible
+
+🎬 **Official Platforms:**
+• Netflix, Amazon Prime, Hotstar
+• YouTube Movies, Google Play
+• Theater releases
+
+Need help? Ask admins politely! 😊
+"""
+
+DOWNLOAD_HELP = KeywordIntent("download_help", [
+    ("how", "where", "when"),
+    ("download", "watch", "get"),
+    ("movie", "film", "series"),
+], reply=DOWNLOAD_HELP_TEXT, delete_after=Config.INTENT_REPLY_DELETE)
+
+intent_router = IntentRouter(
+    [DOWNLOAD_HELP], cooldown=Config.INTENT_COOLDOWN, max_chats=Config.INTENT_COOLDOWN_SIZE
+)
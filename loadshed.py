@@ -0,0 +1,67 @@
+import logging
+from config import Config
+from metrics import SHED_LEVEL, SHED_SKIPPED
+
+logger = logging.getLogger(__name__)
+
+# ===================== LOAD SHEDDING =====================
+# Loop lag badhne pe kam zaroori kaam band karo taaki moderation time pe chale.
+#   Level 1: auto-AI replies band
+#   Level 2: advanced spelling -> simple, welcome sirf text
+#   Level 3: moderation (link/abuse/flood) ke alawa sab band
+# Lag neeche aane pe level apne aap wapas girta hai (hysteresis ke saath).
+
+FEATURE_LEVELS = {
+    "auto_ai": 1,
+    "advanced_spelling": 2,
+    "welcome_photo": 2,
+    "spelling": 3,
+    "welcome": 3,
+    "ai_command": 3,
+    "extras": 3,
+}
+
+class LoadShedder:
+
+    def __init__(self, thresholds=None, alpha: float = 0.3, recover_ratio: float = 0.5, recover_samples: int = 6):
+        self.thresholds = tuple(thresholds or Config.SHED_THRESHOLDS)
+        self.alpha = alpha
+        self.recover_ratio = recover_ratio
+        self.recover_samples = recover_samples
+        self.lag = 0.0
+        self.level = 0
+        self.calm = 0
+        SHED_LEVEL.set(0)
+
+    def observe(self, lag: float):
+        """Loop lag sample (seconds) se level update karo"""
+        self.lag = self.alpha * lag + (1 - self.alpha) * self.lag
+
+        target = sum(1 for t in self.thresholds if self.lag >= t)
+        if target > self.level:
+            self._set_level(target)
+            self.calm = 0
+            return
+
+        # Recovery: lag current level ke threshold ke aadhe se neeche kuch samples tak rahe
+        if self.level and self.lag < self.thresholds[self.level - 1] * self.recover_ratio:
+            self.calm += 1
+            if self.calm >= self.recover_samples:
+                self._set_level(self.level - 1)
+                self.calm = 0
+        else:
+            self.calm = 0
+
+    def _set_level(self, level: int):
+        if level != self.level:
+            logger.warning(f"⚖️ Load shedding level {self.level} -> {level} (loop lag {self.lag * 1000:.0f}ms)")
+        self.level = level
+        SHED_LEVEL.set(level)
+
+    def allows(self, feature: str) -> bool:
+        if self.level < FEATURE_LEVELS[feature]:
+            return True
+        SHED_SKIPPED.inc(feature=feature)
+        return False
+
+shedder = LoadShedder()
@@ -3,60 +3,145 @@ import logging
 import sys
 import os
 import time
-from threading import Thread
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from aiohttp import web
+from config import Config
+from metrics import QUEUE_DEPTH, render_metrics
+from sharding import worker_port
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class HealthHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        if self.path in ['/', '/health', '/ping']:
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            html = f"""<!DOCTYPE html>
-<html>
-<head><title>Movie Helper Bot</title>
-<style>
-body{{font-family:Arial,sans-serif;display:flex;align-items:center;justify-content:center;min-height:100vh;margin:0;background:linear-gradient(135deg,#1a1a2e,#16213e,#0f3460);color:white;}}
-.card{{background:rgba(255,255,255,0.08);padding:40px;border-radius:20px;text-align:center;max-width:500px;backdrop-filter:blur(10px);border:1px solid rgba(255,255,255,0.1);}}
-h1{{font-size:2em;margin:0 0 10px;}}
-.badge{{background:#00b09b;padding:8px 20px;border-radius:20px;display:inline-block;margin:15px 0;font-weight:bold;}}
-p{{color:rgba(255,255,255,0.7);}}
-.time{{font-size:0.85em;color:rgba(255,255,255,0.4);margin-top:20px;}}
-</style></head>
-<body>
-<div class="card">
-<h1>🎬 Movie Helper Bot</h1>
-<div class="badge">✅ Running</div>
-<p>Telegram groups ke liye ek smart bot</p>
-<p>• Spelling Check • Auto Accept • AI Chat • Protection</p>
-<p class="time">Last checked: {time.strftime('%Y-%m-%d %H:%M:%S UTC')}</p>
-</div>
-</body>
-</html>"""
-            self.wfile.write(html.encode())
-        else:
-            self.send_response(404)
-            self.end_headers()
+# ===================== HEALTH / METRICS SERVER =====================
+# Bot ke hi event loop pe chalta hai, alag thread nahi
+
+async def health(request):
+    return web.Response(text="OK")
+
+async def ready(request):
+    from bot import app
+    from database import ping_db
+
+    checks = {
+        "telegram": bool(app.is_connected),
+        "mongo": await ping_db(timeout=2),
+    }
+    body = "\n".join(f"{k}: {'ok' if v else 'fail'}" for k, v in checks.items()) + "\n"
+    return web.Response(text=body, status=200 if all(checks.values()) else 503)
+
+async def metrics(request):
+    return web.Response(text=render_metrics(), content_type="text/plain", charset="utf-8",
+                        headers={"X-Content-Type-Options": "nosniff"})
 
-    def log_message(self, *args):
-        pass
+async def shard_updates(request):
+    """Receiver worker se forward hue updates (sirf WORKERS > 1, sharding.py dekho)"""
+    from bot import app
+    if not app.caches_ready.is_set():
+        # Receiver khud handle kar lega
+        return web.Response(status=503)
+    return await app.dispatcher.updates_queue.receive(request)
 
-def run_health_server():
+async def start_health_server():
+    server = web.Application()
+    server.router.add_get("/", health)
+    server.router.add_get("/health", health)
+    server.router.add_get("/ping", health)
+    server.router.add_get("/ready", ready)
+    server.router.add_get("/metrics", metrics)
+    if Config.WORKERS > 1:
+        server.router.add_post("/updates", shard_updates)
+
+    QUEUE_DEPTH.set_function(lambda: len(asyncio.all_tasks()), queue="asyncio_tasks")
+
+    runner = web.AppRunner(server, access_log=None)
+    await runner.setup()
     port = int(os.getenv("PORT", "8080"))
-    server = HTTPServer(('0.0.0.0', port), HealthHandler)
+    await web.TCPSite(runner, "0.0.0.0", port).start()
     logger.info(f"Health server: port {port}")
-    server.serve_forever()
+    return runner
+
+# ===================== STARTUP =====================
+
+# Fire-and-forget tasks ke strong references — loop sirf weak ref rakhta hai, GC beech mein maar sakta hai
+background_tasks = set()
+
+def _background_done(task: asyncio.Task):
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error(f"Background task {task.get_name()} fail: {task.exception()!r}")
+
+def keep_task(task: asyncio.Task) -> asyncio.Task:
+    """Task ka reference rakho aur uska error log karo (koi await nahi karega)"""
+    background_tasks.add(task)
+    task.add_done_callback(_background_done)
+    return task
+
+async def timed_phase(name, coro):
+    """Ek warm-up step chalao aur uska time log karo; fail ho to bot start rukna nahi chahiye"""
+    start = time.perf_counter()
+    try:
+        result = await coro
+        logger.info(f"⏱ {name}: {(time.perf_counter() - start) * 1000:.0f}ms")
+        return result
+    except Exception as e:
+        logger.warning(f"⚠️ {name} fail ({(time.perf_counter() - start) * 1000:.0f}ms): {e}")
+
+async def mongo_warmup():
+    from database import ping_db, ensure_indexes
+    if not await ping_db(timeout=5):
+        raise RuntimeError("Mongo ping fail")
+    await ensure_indexes()
+
+async def open_update_gate(app, preload_task):
+    """Preload ho jaaye (ya PRELOAD_MAX_WAIT nikal jaaye) tab updates dispatch hone do"""
+    done, _ = await asyncio.wait({preload_task}, timeout=Config.PRELOAD_MAX_WAIT)
+    if not done:
+        logger.warning(f"⏳ Cache preload {Config.PRELOAD_MAX_WAIT}s mein nahi hua, updates ab se (preload chalta rahega)")
+    app.caches_ready.set()
+
+async def startup():
+    """Health server, Telegram connect aur warm-up steps ek saath chalao"""
+    boot = time.perf_counter()
+    await timed_phase("health server", start_health_server())
+
+    from bot import app, set_bot_commands, notify_owner_start, start_background_tasks
+    import other  # noqa: F401  (extra group handlers register karta hai)
+
+    # Mongo warm-up connect ke saath parallel mein
+    mongo_task = asyncio.create_task(timed_phase("mongo ping + indexes", mongo_warmup()))
+    # Settings / flags preload bhi; tab tak aaye updates ruke rehte hain (cold read herd nahi)
+    from database import preload_caches
+    preload_task = asyncio.create_task(timed_phase("cache preload", preload_caches()))
+    gate_task = asyncio.create_task(open_update_gate(app, preload_task))
+
+    # app.start() dispatcher bhi start karta hai, updates yahin se serve hone lagte hain.
+    # Yeh step fail hua to bot start hi nahi hona chahiye, isliye timed_phase nahi
+    connect_start = time.perf_counter()
+    await app.start()
+    connected = time.perf_counter()
+    logger.info(f"⏱ telegram connect: {(connected - connect_start) * 1000:.0f}ms")
+    logger.info(f"✅ @{app.me.username} updates serve kar raha hai ({(connected - boot) * 1000:.0f}ms boot)")
+
+    # Commands aur owner notification sirf pehla worker kare
+    primary = Config.WORKER_INDEX == 0
+    await asyncio.gather(
+        mongo_task,
+        gate_task,
+        timed_phase("bot commands", set_bot_commands()) if primary else asyncio.sleep(0),
+    )
+    for task in start_background_tasks():
+        keep_task(task)
+    from database import run_migrations
+    keep_task(asyncio.create_task(timed_phase("migrations", run_migrations()), name="migrations"))
+    if primary:
+        keep_task(asyncio.create_task(notify_owner_start(), name="notify_owner_start"))
+    logger.info(f"🏁 Startup complete: {(time.perf_counter() - boot) * 1000:.0f}ms "
+                f"(warm-up after connect {(time.perf_counter() - connected) * 1000:.0f}ms)")
+    return app
 
 async def run_bot():
     try:
-        from bot import app
         logger.info("🚀 Bot start ho raha hai...")
-        await app.start()
-        bot_info = await app.get_me()
-        logger.info(f"✅ @{bot_info.username} ready!")
+        app = await startup()
 
         try:
             while True:
@@ -70,10 +155,95 @@ async def run_bot():
         traceback.print_exc()
         sys.exit(1)
 
+# ===================== SUPERVISOR (WORKERS > 1) =====================
+# N worker processes chalao, health/metrics aggregate karo, crash hone pe restart karo
+
+def label_worker_metrics(text: str, index: int, seen_meta: set) -> list:
+    """Worker ke metrics mein worker="i" label jodo; HELP/TYPE sirf ek baar"""
+    lines = []
+    for line in text.splitlines():
+        if not line:
+            continue
+        if line.startswith("#"):
+            if line not in seen_meta:
+                seen_meta.add(line)
+                lines.append(line)
+            continue
+        name, value = line.rsplit(" ", 1)
+        if name.endswith("}"):
+            name = f'{name[:-1]},worker="{index}"}}'
+        else:
+            name = f'{name}{{worker="{index}"}}'
+        lines.append(f"{name} {value}")
+    return lines
+
+async def fetch_workers(session, path: str, workers: int) -> list:
+    async def fetch(i):
+        try:
+            async with session.get(f"http://127.0.0.1:{worker_port(i)}{path}") as resp:
+                return resp.status, await resp.text()
+        except Exception as e:
+            return 503, f"unreachable: {e}\n"
+    return await asyncio.gather(*[fetch(i) for i in range(workers)])
+
+async def run_worker_process(index: int, workers: int, procs: dict):
+    env = dict(os.environ, WORKERS=str(workers), WORKER_INDEX=str(index), PORT=str(worker_port(index)))
+    while True:
+        proc = await asyncio.create_subprocess_exec(sys.executable, os.path.abspath(__file__), env=env)
+        procs[index] = proc
+        logger.info(f"👷 Worker {index} start (pid {proc.pid})")
+        code = await proc.wait()
+        logger.error(f"💥 Worker {index} exit ({code}), 5s mein restart")
+        await asyncio.sleep(5)
+
+async def run_supervisor(workers: int):
+    import aiohttp
+    import secrets
+
+    # Workers ek dusre ko updates bhejte hain: ports ka base aur shared secret env se
+    os.environ.setdefault("WORKER_PORT_BASE", str(worker_port(0)))
+    os.environ.setdefault("SHARD_SECRET", secrets.token_hex(16))
+    procs = {}
+    session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=3))
+
+    async def sup_health(request):
+        alive = [i for i, p in procs.items() if p.returncode is None]
+        ok = len(alive) == workers
+        return web.Response(text=f"workers alive: {len(alive)}/{workers}\n", status=200 if ok else 503)
+
+    async def sup_ready(request):
+        results = await fetch_workers(session, "/ready", workers)
+        body = "".join(f"[worker {i}]\n{text}" for i, (_, text) in enumerate(results))
+        ok = all(status == 200 for status, _ in results)
+        return web.Response(text=body, status=200 if ok else 503)
+
+    async def sup_metrics(request):
+        results = await fetch_workers(session, "/metrics", workers)
+        seen_meta, lines = set(), []
+        for i, (status, text) in enumerate(results):
+            if status == 200:
+                lines.extend(label_worker_metrics(text, i, seen_meta))
+        return web.Response(text="\n".join(lines) + "\n", content_type="text/plain", charset="utf-8")
+
+    server = web.Application()
+    server.router.add_get("/", sup_health)
+    server.router.add_get("/health", sup_health)
+    server.router.add_get("/ping", sup_health)
+    server.router.add_get("/ready", sup_ready)
+    server.router.add_get("/metrics", sup_metrics)
+    runner = web.AppRunner(server, access_log=None)
+    await runner.setup()
+    port = int(os.getenv("PORT", "8080"))
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    logger.info(f"🧭 Supervisor: {workers} workers, health port {port}")
+
+    await asyncio.gather(*[run_worker_process(i, workers, procs) for i in range(workers)])
+
 def main():
-    Thread(target=run_health_server, daemon=True).start()
-    time.sleep(2)
-    asyncio.run(run_bot())
+    if Config.WORKERS > 1 and os.getenv("WORKER_INDEX") is None:
+        asyncio.run(run_supervisor(Config.WORKERS))
+    else:
+        asyncio.run(run_bot())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,94 @@
+import re
+import unicodedata
+from collections import deque
+
+# ===================== TEXT NORMALIZATION =====================
+# Spammers "b.c", "m@darch0d", "chuuutiya", zero-width chars se filters bypass karte hain.
+# Text aur patterns dono isi normalization se guzarte hain, isliye match consistent rehta hai.
+
+ZERO_WIDTH = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u200e\u200f\u2060\u2061\u2062\u2063\ufeff\u00ad"))
+
+LEET = {"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t"}
+
+# Token form: leet map, zero-width aur punctuation hatao (whitespace word boundary rehta hai)
+_TOKEN_TABLE = dict(ZERO_WIDTH)
+_TOKEN_TABLE.update({ord(k): v for k, v in LEET.items()})
+_TOKEN_TABLE.update(dict.fromkeys(map(ord, "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~"), None))
+
+_INNER_LEET = re.compile(r"(?<=[a-z])[@$](?=[a-z])")
+_REPEATS = re.compile(r"(.)\1+")
+
+def fold_unicode(text: str) -> str:
+    """Accents / fullwidth / fancy fonts ko plain letters mein badlo"""
+    if text.isascii():
+        return text
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+def link_form(text: str) -> str:
+    """Link markers ke liye: punctuation rehta hai, sirf case/unicode/zero-width normalize"""
+    return fold_unicode(text).casefold().translate(ZERO_WIDTH)
+
+def token_form(text: str) -> str:
+    """Words ke liye: ' m@darch0od  b.c ' -> ' madarchod bc ' (space se wrapped)"""
+    t = fold_unicode(text).casefold()
+    t = _INNER_LEET.sub(lambda m: "a" if m.group() == "@" else "s", t)
+    t = _REPEATS.sub(r"\1", t.translate(_TOKEN_TABLE))
+    return " " + " ".join(t.split()) + " "
+
+# ===================== AHO-CORASICK =====================
+
+class Matcher:
+    """Sab patterns ke liye ek hi Aho-Corasick DFA. Scan message length mein linear hai.
+
+    `patterns` -> {pattern: priority}; scan() sabse badi priority lautata hai
+    jo text mein mili (0 = kuch nahi mila).
+    """
+
+    def __init__(self, patterns: dict):
+        self.size = len(patterns)
+        self.top = max(patterns.values(), default=0)
+
+        # Trie
+        trie = [{}]
+        out = [0]
+        for pattern, priority in patterns.items():
+            state = 0
+            for ch in pattern:
+                nxt = trie[state].get(ch)
+                if nxt is None:
+                    nxt = len(trie)
+                    trie[state][ch] = nxt
+                    trie.append({})
+                    out.append(0)
+                state = nxt
+            out[state] = max(out[state], priority)
+
+        # BFS: failure links se full DFA (har state ki complete transition table)
+        fail = [0] * len(trie)
+        delta = [None] * len(trie)
+        delta[0] = dict(trie[0])
+        queue = deque(trie[0].values())
+        while queue:
+            state = queue.popleft()
+            if state:
+                delta[state] = {**delta[fail[state]], **trie[state]}
+                out[state] = max(out[state], out[fail[state]])
+            for ch, nxt in trie[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                queue.append(nxt)
+
+        self.delta = delta
+        self.out = out
+
+    def scan(self, text: str) -> int:
+        delta, out, top = self.delta, self.out, self.top
+        state = best = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            o = out[state]
+            if o > best:
+                best = o
+                if best == top:
+                    break
+        return best
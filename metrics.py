@@ -0,0 +1,305 @@
+import time
+import logging
+import functools
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# ===================== PROMETHEUS TEXT METRICS =====================
+# Chhota sa registry, /metrics endpoint isko Prometheus text format mein render karta hai
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY = []
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _label_str(names, values, extra=None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labels=()):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self.values = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.labels)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in self.samples():
+            lines.append(f"{self.name}{_label_str(self.labels, key)} {value}")
+        return lines
+
+    def samples(self):
+        return list(self.values.items())
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(self._key(labels), 0)
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, labels=()):
+        super().__init__(name, doc, labels)
+        self.functions = {}
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = value
+
+    def set_function(self, fn, **labels):
+        """Value render ke time fn() se aayegi (queue depth jaisi cheezon ke liye)"""
+        self.functions[self._key(labels)] = fn
+
+    def samples(self):
+        out = dict(self.values)
+        for key, fn in self.functions.items():
+            try:
+                out[key] = fn()
+            except Exception:
+                continue
+        return list(out.items())
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        data = self.values.get(key)
+        if data is None:
+            data = self.values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                data["counts"][i] += 1
+                break
+        data["sum"] += value
+        data["count"] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for key, data in self.values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets, data["counts"]):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_label_str(self.labels, key, ('le', bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_str(self.labels, key, ('le', '+Inf'))} {data['count']}")
+            lines.append(f"{self.name}_sum{_label_str(self.labels, key)} {data['sum']}")
+            lines.append(f"{self.name}_count{_label_str(self.labels, key)} {data['count']}")
+        return lines
+
+class Summary(_Metric):
+    """Last N samples se p50/p95/p99 nikalta hai (sliding window)"""
+    kind = "summary"
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, name: str, doc: str, labels=(), window: int = 1024):
+        super().__init__(name, doc, labels)
+        self.window = window
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        data = self.values.get(key)
+        if data is None:
+            data = self.values[key] = {"samples": deque(maxlen=self.window), "sum": 0.0, "count": 0}
+        data["samples"].append(value)
+        data["sum"] += value
+        data["count"] += 1
+
+    def quantiles(self, **labels) -> dict:
+        data = self.values.get(self._key(labels))
+        return _quantiles(data["samples"]) if data else {}
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for key, data in self.values.items():
+            for q, v in _quantiles(data["samples"]).items():
+                lines.append(f"{self.name}{_label_str(self.labels, key, ('quantile', q))} {v}")
+            lines.append(f"{self.name}_sum{_label_str(self.labels, key)} {data['sum']}")
+            lines.append(f"{self.name}_count{_label_str(self.labels, key)} {data['count']}")
+        return lines
+
+def _quantiles(samples) -> dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {q: ordered[min(last, int(q * len(ordered)))] for q in Summary.QUANTILES}
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# ===================== BOT METRICS =====================
+
+HANDLER_LATENCY = Histogram(
+    "moviebot_handler_latency_seconds", "Update handler latency", labels=("handler",)
+)
+CACHE_REQUESTS = Counter(
+    "moviebot_cache_requests_total", "Cache lookups by result (hit/miss)", labels=("cache", "result")
+)
+CACHE_EVICTIONS = Counter(
+    "moviebot_cache_evictions_total", "Cache entries dropped by reason (size/expired)", labels=("cache", "reason")
+)
+CACHE_SIZE = Gauge(
+    "moviebot_cache_size", "Entries currently held per cache", labels=("cache",)
+)
+QUEUE_DEPTH = Gauge(
+    "moviebot_queue_depth", "Pending background work", labels=("queue",)
+)
+TELEGRAM_API_CALLS = Counter(
+    "moviebot_telegram_api_calls_total", "Telegram API calls by method", labels=("method",)
+)
+FLOODWAIT_TOTAL = Counter(
+    "moviebot_floodwait_total", "FloodWait errors by method", labels=("method",)
+)
+FLOODWAIT_SECONDS = Counter(
+    "moviebot_floodwait_seconds_total", "Total seconds Telegram asked us to wait"
+)
+
+ANALYSIS_CALLS = Counter(
+    "moviebot_analysis_total", "Text analysis calls by path (inline/offload)", labels=("path",)
+)
+ANALYSIS_BATCH_SIZE = Histogram(
+    "moviebot_analysis_batch_size", "Messages per offloaded analysis batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+ANALYSIS_OVER_BUDGET = Counter(
+    "moviebot_analysis_over_budget_total", "Messages whose analysis ran past the per-message time budget"
+)
+INTENT_HITS = Counter(
+    "moviebot_intent_hits_total", "Matched keyword intents by result (replied/cooldown)", labels=("intent", "result")
+)
+LOOP_LAG = Gauge(
+    "moviebot_event_loop_lag_seconds", "Latest event loop scheduling lag"
+)
+LOOP_LAG_HIST = Histogram(
+    "moviebot_event_loop_lag_hist_seconds", "Event loop scheduling lag",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+FANOUT_SENDS = Counter(
+    "moviebot_fanout_sends_total", "Fan-out deliveries by job and result", labels=("job", "result")
+)
+FLOOD_HITS = Counter(
+    "moviebot_flood_hits_total", "Flood detector hits by reason", labels=("reason",)
+)
+SHARD_UPDATES = Counter(
+    "moviebot_shard_updates_total", "Updates routed by the receiver worker (local/forwarded/fallback)", labels=("result",)
+)
+SHED_LEVEL = Gauge(
+    "moviebot_load_shed_level", "Current load shedding level (0 = normal)"
+)
+SHED_SKIPPED = Counter(
+    "moviebot_load_shed_skipped_total", "Work skipped due to load shedding", labels=("feature",)
+)
+DB_BREAKER_STATE = Gauge(
+    "moviebot_db_breaker_state", "DB circuit breaker state (0 closed, 1 half-open, 2 open)", labels=("breaker",)
+)
+DB_DEGRADED = Counter(
+    "moviebot_db_degraded_total", "DB ops served without Mongo by mode (fallback/journal)", labels=("op", "mode")
+)
+DB_JOURNAL_DROPPED = Counter(
+    "moviebot_db_journal_dropped_total", "Buffered writes dropped because the journal was full"
+)
+
+CALL_LATENCY = Summary(
+    "moviebot_call_latency_seconds", "Handler / DB call latency", labels=("kind", "name")
+)
+CALL_ERRORS = Counter(
+    "moviebot_call_errors_total", "Handler / DB calls that raised", labels=("kind", "name")
+)
+
+# ===================== INSTRUMENTATION =====================
+
+# Chal rahe handler ka trace: [(stage, seconds), ...]
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+@contextmanager
+def stage(name: str):
+    """Handler ke andar ek hissa time karo, slow call log mein breakdown dikhega"""
+    trace = _current_trace.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if trace is not None:
+            trace.append((name, time.perf_counter() - start))
+
+def instrument(name: str, kind: str = "handler"):
+    """Async function ka count, error count aur latency record karo.
+    Handler calls apna trace khud rakhte hain; unke andar ke DB calls us trace mein stage ban jaate hain."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            owns_trace = kind == "handler" and _current_trace.get() is None
+            token = _current_trace.set([]) if owns_trace else None
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                CALL_ERRORS.inc(kind=kind, name=name)
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                CALL_LATENCY.observe(elapsed, kind=kind, name=name)
+                if kind == "handler":
+                    HANDLER_LATENCY.observe(elapsed, handler=name)
+                if owns_trace:
+                    trace = _current_trace.get()
+                    _current_trace.reset(token)
+                    if elapsed >= Config.SLOW_CALL_THRESHOLD:
+                        breakdown = ", ".join(f"{s}={t * 1000:.0f}ms" for s, t in trace) or "no stages"
+                        logger.warning(f"🐢 Slow {kind} {name}: {elapsed * 1000:.0f}ms [{breakdown}]")
+                elif kind != "handler":
+                    trace = _current_trace.get()
+                    if trace is not None:
+                        trace.append((f"{kind}.{name}", elapsed))
+        return wrapper
+    return decorator
+
+def call_stats(kind: str = None) -> list:
+    """[(kind, name, count, errors, {quantile: seconds})] — /perf command ke liye"""
+    rows = []
+    for (k, n), data in CALL_LATENCY.values.items():
+        if kind and k != kind:
+            continue
+        rows.append((k, n, data["count"], CALL_ERRORS.get(kind=k, name=n), _quantiles(data["samples"])))
+    return rows
+
+async def monitor_loop_lag(interval: float = None, on_sample=None):
+    """Har interval pe sleep karo aur dekho kitna late jaage — wahi loop lag hai"""
+    import asyncio
+    interval = interval or Config.LOOP_LAG_INTERVAL
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - start - interval)
+        LOOP_LAG.set(lag)
+        LOOP_LAG_HIST.observe(lag)
+        if on_sample:
+            on_sample(lag)
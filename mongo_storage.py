@@ -0,0 +1,170 @@
+import time
+import asyncio
+import logging
+from pyrogram.storage import Storage
+from pyrogram.storage.sqlite_storage import get_input_peer
+from config import Config
+from cache import TTLCache
+from metrics import QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+# ===================== MONGO PYROGRAM STORAGE =====================
+# in_memory session har restart pe naya auth key banata tha aur peer cache khali
+# hota tha — broadcast mein PeerIdInvalid aur resolve ke liye extra API calls.
+# Yeh storage session (dc, auth key, user id) aur peers Mongo mein rakhta hai.
+# Peers memory LRU mein bhi rehte hain; naye/badle peers batch mein flush hote hain,
+# same peer baar baar aaye to koi write nahi hota.
+
+SESSION_FIELDS = ("dc_id", "api_id", "test_mode", "auth_key", "date", "user_id", "is_bot")
+
+class MongoStorage(Storage):
+    USERNAME_TTL = 8 * 60 * 60
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.session = {}
+        self.peers = TTLCache("peers", max_size=Config.PEER_CACHE_SIZE)
+        self.dirty = {}
+        self.flusher = None
+        QUEUE_DEPTH.set_function(lambda: len(self.dirty), queue="peer_writes")
+
+    async def open(self):
+        from database import load_session
+        doc = await load_session(self.name) or {}
+        self.session = {field: doc.get(field) for field in SESSION_FIELDS}
+        if self.flusher is None:
+            self.flusher = asyncio.create_task(self._flush_loop())
+
+    async def save(self):
+        from database import save_session
+        await self.flush()
+        self.session["date"] = int(time.time())
+        await save_session(self.name, {"date": self.session["date"]})
+
+    async def close(self):
+        if self.flusher:
+            self.flusher.cancel()
+            self.flusher = None
+        try:
+            await self.save()
+        except Exception as e:
+            logger.warning(f"Session save fail: {e}")
+
+    async def delete(self):
+        from database import delete_session
+        await delete_session(self.name)
+        self.session = {field: None for field in SESSION_FIELDS}
+
+    # ---- peers ----
+
+    async def update_peers(self, peers):
+        now = int(time.time())
+        for peer_id, access_hash, peer_type, username, phone_number in peers:
+            old = self.peers.peek(peer_id)
+            # Kuch nahi badla aur username abhi fresh hai: write skip
+            if old and old[:4] == (access_hash, peer_type, username, phone_number) \
+                    and now - old[4] < self.USERNAME_TTL / 2:
+                continue
+            self.peers.set(peer_id, (access_hash, peer_type, username, phone_number, now))
+            self.dirty[peer_id] = {
+                "access_hash": access_hash, "type": peer_type,
+                "username": username, "phone_number": phone_number, "updated_at": now,
+            }
+        if len(self.dirty) >= Config.PEER_FLUSH_BATCH:
+            asyncio.create_task(self.flush())
+
+    async def flush(self):
+        from database import upsert_peers
+        if not self.dirty:
+            return
+        batch, self.dirty = self.dirty, {}
+        try:
+            await upsert_peers(batch)
+        except Exception as e:
+            # Agli baar phir try; beech mein aaye naye values jeetenge
+            self.dirty = {**batch, **self.dirty}
+            logger.warning(f"Peer flush fail ({len(batch)} peers): {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(Config.PEER_FLUSH_INTERVAL)
+            await self.flush()
+
+    def _pending_peer(self, key: str, value):
+        """Abhi flush nahi hue peers mein dhundo"""
+        if key == "_id":
+            doc = self.dirty.get(value)
+            return (value, doc) if doc else None
+        for peer_id, doc in self.dirty.items():
+            if doc[key] == value:
+                return peer_id, doc
+        return None
+
+    async def _find_peer(self, key: str, value):
+        from database import find_peer
+        pending = self._pending_peer(key, value)
+        if pending:
+            return pending
+        doc = await find_peer({key: value})
+        if not doc:
+            return None
+        self.peers.set(doc["_id"], (doc["access_hash"], doc["type"], doc.get("username"),
+                                    doc.get("phone_number"), doc.get("updated_at", 0)))
+        return doc["_id"], doc
+
+    async def get_peer_by_id(self, peer_id: int):
+        cached = self.peers.get(peer_id)
+        if cached is None:
+            found = await self._find_peer("_id", peer_id)
+            if not found:
+                raise KeyError(f"ID not found: {peer_id}")
+            cached = (found[1]["access_hash"], found[1]["type"])
+        return get_input_peer(peer_id, cached[0], cached[1])
+
+    async def get_peer_by_username(self, username: str):
+        found = await self._find_peer("username", username)
+        if not found:
+            raise KeyError(f"Username not found: {username}")
+        peer_id, doc = found
+        if abs(time.time() - doc.get("updated_at", 0)) > self.USERNAME_TTL:
+            raise KeyError(f"Username expired: {username}")
+        return get_input_peer(peer_id, doc["access_hash"], doc["type"])
+
+    async def get_peer_by_phone_number(self, phone_number: str):
+        found = await self._find_peer("phone_number", phone_number)
+        if not found:
+            raise KeyError(f"Phone number not found: {phone_number}")
+        return get_input_peer(found[0], found[1]["access_hash"], found[1]["type"])
+
+    # ---- session fields ----
+
+    async def _accessor(self, field: str, value):
+        if value is object:
+            return self.session.get(field)
+        self.session[field] = value
+        # date har save pe jaata hai; baaki fields (auth key etc.) turant persist
+        if field != "date":
+            from database import save_session
+            await save_session(self.name, {field: value})
+
+    async def dc_id(self, value: int = object):
+        return await self._accessor("dc_id", value)
+
+    async def api_id(self, value: int = object):
+        return await self._accessor("api_id", value)
+
+    async def test_mode(self, value: bool = object):
+        return await self._accessor("test_mode", value)
+
+    async def auth_key(self, value: bytes = object):
+        return await self._accessor("auth_key", value)
+
+    async def date(self, value: int = object):
+        return await self._accessor("date", value)
+
+    async def user_id(self, value: int = object):
+        return await self._accessor("user_id", value)
+
+    async def is_bot(self, value: bool = object):
+        return await self._accessor("is_bot", value)
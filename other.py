@@ -1,23 +1,33 @@
 import asyncio
 import datetime
+import logging
+import time
 from pyrogram import Client, filters
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 from pyrogram.enums import ChatMemberStatus
+from pyrogram.errors import FloodWait
 from config import Config
 from database import *
 from utils import MovieBotUtils
+from bot import app
+from chatinfo import is_chat_admin
+from metrics import QUEUE_DEPTH
+from loadshed import shedder
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# bot.py ke catch-all handlers (group_filter, callback_handler) group 0 mein hain,
+# isliye yeh handlers pehle wale group mein register hote hain
+OTHER_HANDLERS_GROUP = -1
 
 # ================ GROUP MANAGEMENT COMMANDS ================
 async def is_group_admin(client, chat_id, user_id):
     """Check if user is admin in group"""
-    try:
-        member = await client.get_chat_member(chat_id, user_id)
-        return member.status in [ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER]
-    except:
-        return False
+    return await is_chat_admin(client, chat_id, user_id)
 
 # --- CLEAN GROUP COMMAND ---
-@app.on_message(filters.command(["clean", "cleangroup"]) & filters.group)
+@app.on_message(filters.command(["cleangroup"]) & filters.group, group=OTHER_HANDLERS_GROUP)
 async def clean_group_command(client: Client, message: Message):
     """Clean group from inactive members"""
     if not await is_group_admin(client, message.chat.id, message.from_user.id):
@@ -54,7 +64,7 @@ async def clean_group_command(client: Client, message: Message):
         await processing_msg.edit_text(f"❌ **Error:** {str(e)}")
 
 # --- PINNED MOVIES SYSTEM ---
-@app.on_message(filters.command(["pinmovie", "feature"]) & filters.group)
+@app.on_message(filters.command(["pinmovie", "feature"]) & filters.group, group=OTHER_HANDLERS_GROUP)
 async def pin_movie_command(client: Client, message: Message):
     """Pin important movie messages"""
     if not await is_group_admin(client, message.chat.id, message.from_user.id):
@@ -90,7 +100,7 @@ async def pin_movie_command(client: Client, message: Message):
         await message.reply_text(f"❌ **Error:** Cannot pin message. Make sure I have pin permissions!")
 
 # --- MOVIE OF THE DAY ---
-@app.on_message(filters.command(["movieoftheday", "motd"]) & filters.group)
+@app.on_message(filters.command(["movieoftheday", "motd"]) & filters.group, group=OTHER_HANDLERS_GROUP)
 async def movie_of_the_day(client: Client, message: Message):
     """Feature a movie of the day"""
     popular_movies = [
@@ -132,7 +142,7 @@ This movie is trending across platforms with excellent reviews from both critics
     await message.reply_text(motd_text, reply_markup=buttons)
 
 # --- QUICK POLL FOR MOVIES ---
-@app.on_message(filters.command(["poll", "moviepoll"]) & filters.group)
+@app.on_message(filters.command(["poll", "moviepoll"]) & filters.group, group=OTHER_HANDLERS_GROUP)
 async def create_movie_poll(client: Client, message: Message):
     """Create a movie poll"""
     if len(message.command) < 2:
@@ -156,122 +166,315 @@ async def create_movie_poll(client: Client, message: Message):
         await message.reply_text(f"❌ **Cannot create poll:** {str(e)}")
 
 # --- BULK DELETE MESSAGES ---
-@app.on_message(filters.command(["purge", "clearchat"]) & filters.group)
+# chat_id -> chal rahi purge job ({"cancel": asyncio.Event, "deleted", "total"})
+purge_jobs = {}
+
+QUEUE_DEPTH.set_function(lambda: len(purge_jobs), queue="purge_jobs")
+
+def iter_id_chunks(first_id: int, last_id: int, size: int = Config.PURGE_CHUNK_SIZE):
+    """first_id..last_id ko lazily range chunks mein do (poori list nahi banti)"""
+    for start in range(first_id, last_id + 1, size):
+        yield range(start, min(start + size, last_id + 1))
+
+async def delete_chunk(client: Client, chat_id: int, ids, cancel: asyncio.Event = None) -> int:
+    """Ek chunk delete karo, FloodWait aaye to utna ruk ke dobara try karo.
+    Wait ke beech /cancelpurge aaye (cancel set) to turant chhod do"""
+    while True:
+        try:
+            return await client.delete_messages(chat_id, list(ids)) or 0
+        except FloodWait as e:
+            if cancel is None:
+                await asyncio.sleep(e.value)
+                continue
+            try:
+                await asyncio.wait_for(cancel.wait(), e.value)
+                return 0
+            except asyncio.TimeoutError:
+                pass
+
+async def run_purge(client: Client, chat_id: int, chunks, job: dict, status_msg=None):
+    """Thode se workers ek hi lazy chunk iterator se chunks uthake delete karte hain"""
+    last_edit = time.time()
+
+    async def worker():
+        nonlocal last_edit
+        for ids in chunks:
+            if job["cancel"].is_set():
+                return
+            job["deleted"] += await delete_chunk(client, chat_id, ids, job["cancel"])
+            if status_msg and time.time() - last_edit >= Config.PURGE_PROGRESS_INTERVAL:
+                last_edit = time.time()
+                try:
+                    await status_msg.edit_text(
+                        f"🗑️ **Purge chal raha hai...**\n\n"
+                        f"✅ Deleted: {job['deleted']}/{job['total']}\n"
+                        f"Rokne ke liye `/cancelpurge`"
+                    )
+                except:
+                    pass
+
+    await asyncio.gather(*[worker() for _ in range(Config.PURGE_CONCURRENCY)])
+
+async def claim_purge_job(client: Client, message: Message, total: int = 0):
+    """Chat ke liye purge job (cancel Event ke saath) register karo; pehle se chal raha ho to None"""
+    chat_id = message.chat.id
+    if chat_id in purge_jobs:
+        msg = await message.reply_text("⏳ **Ek purge pehle se chal raha hai!** `/cancelpurge` se roko.")
+        asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 5))
+        return None
+
+    job = {"cancel": asyncio.Event(), "deleted": 0, "total": total}
+    purge_jobs[chat_id] = job
+    return job
+
+async def run_purge_job(client: Client, message: Message, job: dict, chunks):
+    """Claimed job ke chunks delete karo aur status dikhao; khatam hone pe job hata do"""
+    chat_id = message.chat.id
+    status_msg = None
+    try:
+        status_msg = await message.reply_text(f"🗑️ **Purge shuru...** ({job['total']} messages)")
+        await run_purge(client, chat_id, chunks, job, status_msg)
+        head = "⏹️ **Purge rok diya gaya!**" if job["cancel"].is_set() else "✅ **Purge complete!**"
+        await status_msg.edit_text(f"{head}\n\n🗑️ Deleted: {job['deleted']}/{job['total']}")
+    except Exception as e:
+        if status_msg:
+            await status_msg.edit_text(f"❌ **Error:** {str(e)}")
+    finally:
+        purge_jobs.pop(chat_id, None)
+    if status_msg:
+        asyncio.create_task(MovieBotUtils.auto_delete_message(client, status_msg, 5))
+
+async def start_purge_job(client: Client, message: Message, chunks, total: int):
+    job = await claim_purge_job(client, message, total)
+    if job:
+        await run_purge_job(client, message, job, chunks)
+
+async def find_user_message_ids(client: Client, chat_id: int, user_id: int, before_id: int, limit: int,
+                                cancel: asyncio.Event = None) -> list:
+    """Command se peeche ki taraf scan karke user ke last `limit` message ids do.
+    Pages ke beech ya FloodWait mein cancel set ho jaaye to jitna mila utna hi do"""
+    found = []
+    lowest = max(1, before_id - Config.PURGE_USER_SCAN_LIMIT)
+    end = before_id
+    cancel = cancel or asyncio.Event()
+    while end > lowest and len(found) < limit and not cancel.is_set():
+        start = max(lowest, end - 200)
+        try:
+            msgs = await client.get_messages(chat_id, list(range(end - 1, start - 1, -1)))
+        except FloodWait as e:
+            try:
+                await asyncio.wait_for(cancel.wait(), e.value)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        for m in msgs:
+            if not m.empty and m.from_user and m.from_user.id == user_id:
+                found.append(m.id)
+                if len(found) >= limit:
+                    break
+        end = start
+    return found
+
+@app.on_message(filters.command(["purge", "clearchat"]) & filters.group, group=OTHER_HANDLERS_GROUP)
 async def purge_messages(client: Client, message: Message):
     """Delete multiple messages"""
     if not await is_group_admin(client, message.chat.id, message.from_user.id):
         msg = await message.reply_text("❌ **Only admins can purge messages!**")
-        await asyncio.sleep(5)
-        await msg.delete()
-        return
-    
+        return asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 5))
+
     if not message.reply_to_message:
         msg = await message.reply_text("❌ **Reply to a message to start purging from there!**")
-        await asyncio.sleep(5)
-        await msg.delete()
+        return asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 5))
+
+    first_id = message.reply_to_message.id
+    chunks = iter_id_chunks(first_id, message.id)
+    await start_purge_job(client, message, chunks, message.id - first_id + 1)
+
+@app.on_message(filters.command("purgeuser") & filters.group, group=OTHER_HANDLERS_GROUP)
+async def purge_user_messages(client: Client, message: Message):
+    """User ke last N messages delete karo: reply + /purgeuser N  ya  /purgeuser <user_id> N"""
+    if not await is_group_admin(client, message.chat.id, message.from_user.id):
+        msg = await message.reply_text("❌ **Only admins can purge messages!**")
+        return asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 5))
+
+    args = message.command[1:]
+    try:
+        if message.reply_to_message and message.reply_to_message.from_user:
+            target_id = message.reply_to_message.from_user.id
+            count = int(args[0]) if args else 100
+        else:
+            target_id = int(args[0])
+            count = int(args[1]) if len(args) > 1 else 100
+    except (IndexError, ValueError):
+        msg = await message.reply_text("❌ Usage: Reply + `/purgeuser 50` ya `/purgeuser <user_id> 50`")
+        return asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 10))
+
+    # Scan se pehle hi job register — scan ke beech /cancelpurge kaam kare aur doosra /purgeuser na chale
+    job = await claim_purge_job(client, message)
+    if not job:
         return
-    
     try:
-        message_ids = []
-        for i in range(message.reply_to_message.id, message.id + 1):
-            message_ids.append(i)
-        
-        # Delete in chunks of 100 (Telegram limit)
-        for i in range(0, len(message_ids), 100):
-            chunk = message_ids[i:i + 100]
-            await client.delete_messages(message.chat.id, chunk)
-            await asyncio.sleep(1)
-        
-        # Send confirmation
-        confirmation = await message.reply_text(
-            f"✅ **Purged {len(message_ids)} messages successfully!**"
-        )
-        await asyncio.sleep(5)
-        await confirmation.delete()
-        
-    except Exception as e:
-        await message.reply_text(f"❌ **Error:** {str(e)}")
+        ids = await find_user_message_ids(client, message.chat.id, target_id, message.id, count, job["cancel"])
+    except Exception:
+        purge_jobs.pop(message.chat.id, None)
+        raise
+    if job["cancel"].is_set() or not ids:
+        purge_jobs.pop(message.chat.id, None)
+        text = "⏹️ **Purge rok diya gaya!**" if job["cancel"].is_set() else "❌ Is user ke koi recent messages nahi mile!"
+        msg = await message.reply_text(text)
+        return asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 5))
+
+    job["total"] = len(ids)
+    size = Config.PURGE_CHUNK_SIZE
+    chunks = iter(ids[i:i + size] for i in range(0, len(ids), size))
+    await run_purge_job(client, message, job, chunks)
+
+@app.on_message(filters.command("cancelpurge") & filters.group, group=OTHER_HANDLERS_GROUP)
+async def cancel_purge(client: Client, message: Message):
+    """Chal rahe purge ko roko"""
+    if not await is_group_admin(client, message.chat.id, message.from_user.id):
+        return
+    job = purge_jobs.get(message.chat.id)
+    if not job:
+        msg = await message.reply_text("ℹ️ Koi purge nahi chal raha.")
+    else:
+        job["cancel"].set()
+        msg = await message.reply_text("⏹️ Purge rok raha hoon...")
+    asyncio.create_task(MovieBotUtils.auto_delete_message(client, msg, 5))
 
 # --- GROUP STATISTICS ---
-@app.on_message(filters.command(["groupstats", "ginfo"]) & filters.group)
+# chat_id -> last snapshot, ek hi member walk se bana (GROUP_STATS_TTL ke baad bhi dikhta hai,
+# background mein naya banta hai; GROUP_STATS_MAX_AGE ke baad nikal jaata hai)
+group_stats_cache = TTLCache("group_stats", max_size=Config.GROUP_STATS_CACHE_SIZE, ttl=Config.GROUP_STATS_MAX_AGE)
+# chat_id -> chal raha collection task (ek chat ke liye ek hi walk). TTL: atka hua walk
+# hamesha ke liye naye walk ko na roke
+group_stats_tasks = TTLCache("group_stats_walks", max_size=Config.GROUP_STATS_CACHE_SIZE, ttl=Config.GROUP_STATS_TTL)
+# chat_id -> last refresh button time (debounce)
+group_stats_refreshed = TTLCache(
+    "group_stats_refresh", max_size=Config.GROUP_STATS_CACHE_SIZE, ttl=Config.GROUP_STATS_REFRESH_COOLDOWN
+)
+
+async def collect_group_stats(client: Client, chat_id: int) -> dict:
+    """Ek hi member walk mein admins, bots aur deleted accounts gino"""
+    chat = await client.get_chat(chat_id)
+    total = admins = bots = deleted = 0
+    async for member in client.get_chat_members(chat_id):
+        total += 1
+        if member.status in [ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER]:
+            admins += 1
+        if member.user.is_bot:
+            bots += 1
+        if member.user.is_deleted:
+            deleted += 1
+
+    snapshot = {
+        "title": chat.title,
+        "username": chat.username,
+        "created": chat.date,
+        "members": chat.members_count or total,
+        "admins": admins,
+        "bots": bots,
+        "deleted": deleted,
+        "taken_at": time.time(),
+    }
+    group_stats_cache.set(chat_id, snapshot)
+    return snapshot
+
+def _group_stats_done(chat_id: int, task: asyncio.Task):
+    if group_stats_tasks.peek(chat_id) is task:
+        group_stats_tasks.pop(chat_id)
+    # Background refresh ko koi await nahi karta — error yahin log ho, chupchaap na jaaye
+    if not task.cancelled() and task.exception():
+        logger.warning(f"Group stats walk fail ({chat_id}): {task.exception()!r}")
+
+def schedule_group_stats(client: Client, chat_id: int) -> asyncio.Task:
+    """Background walk start karo, agar pehle se chal raha hai to wahi task do"""
+    task = group_stats_tasks.peek(chat_id)
+    if task and not task.done():
+        return task
+    task = asyncio.create_task(collect_group_stats(client, chat_id))
+    group_stats_tasks.set(chat_id, task)
+    task.add_done_callback(lambda t: _group_stats_done(chat_id, t))
+    return task
+
+def get_group_stats_snapshot(chat_id: int):
+    """Cached snapshot aur uski age (seconds) do"""
+    snapshot = group_stats_cache.get(chat_id)
+    if not snapshot:
+        return None, None
+    return snapshot, time.time() - snapshot["taken_at"]
+
+QUEUE_DEPTH.set_function(lambda: len(group_stats_tasks), queue="group_stats_walks")
+
+def format_stats_age(age: float) -> str:
+    if age < 60:
+        return f"{int(age)}s pehle"
+    if age < 3600:
+        return f"{int(age // 60)} min pehle"
+    return f"{int(age // 3600)} ghante pehle"
+
+def render_group_stats(snapshot: dict, age: float) -> str:
+    created = snapshot["created"].strftime('%d %b %Y') if snapshot["created"] else 'N/A'
+    return f"""
+📊 **GROUP STATISTICS**
+
+🏷️ **Name:** {snapshot['title']}
+👥 **Members:** {snapshot['members']}
+👑 **Admins:** {snapshot['admins']}
+🤖 **Bots:** {snapshot['bots']}
+👻 **Deleted Accounts:** {snapshot['deleted']}
+👤 **Users:** {snapshot['members'] - snapshot['bots']}
+
+📅 **Created:** {created}
+🔗 **Username:** @{snapshot['username'] if snapshot['username'] else 'Private'}
+
+🕐 **Updated:** {format_stats_age(age)}
+"""
+
+GROUP_STATS_BUTTONS = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔄 Refresh", callback_data="refresh_group_stats")],
+    [InlineKeyboardButton("📋 Export Data", callback_data="export_group_data")]
+])
+
+async def _edit_group_stats(msg: Message, text: str, reply_markup=None):
+    try:
+        await msg.edit_text(text, reply_markup=reply_markup)
+    except:
+        pass
+
+def edit_when_collected(task: asyncio.Task, msg: Message, error_text: str = None):
+    """Walk khatam hone pe msg ko naye stats se edit karo — handler walk ka wait nahi karta.
+    Walk fail ho to error_text (ho to) dikhao; error _group_stats_done log karta hai"""
+    def done(t: asyncio.Task):
+        if not t.cancelled() and not t.exception():
+            asyncio.create_task(_edit_group_stats(msg, render_group_stats(t.result(), 0), GROUP_STATS_BUTTONS))
+        elif error_text:
+            asyncio.create_task(_edit_group_stats(msg, error_text))
+    task.add_done_callback(done)
+
+@app.on_message(filters.command(["groupstats", "ginfo"]) & filters.group, group=OTHER_HANDLERS_GROUP)
 async def group_statistics(client: Client, message: Message):
     """Show group statistics"""
+    if not shedder.allows("extras"):
+        return
     try:
-        chat = await client.get_chat(message.chat.id)
-        
-        # Get member count
-        member_count = await client.get_chat_members_count(message.chat.id)
-        
-        # Get admin count
-        admin_count = 0
-        async for member in client.get_chat_members(message.chat.id, filter="administrators"):
-            admin_count += 1
-        
-        # Get bot count
-        bot_count = 0
-        async for member in client.get_chat_members(message.chat.id):
-            if member.user.is_bot:
-                bot_count += 1
-        
-        stats_text = f"""
-📊 **GROUP STATISTICS**
+        chat_id = message.chat.id
+        snapshot, age = get_group_stats_snapshot(chat_id)
 
-🏷️ **Name:** {chat.title}
-👥 **Members:** {member_count}
-👑 **Admins:** {admin_count}
-🤖 **Bots:** {bot_count}
-👤 **Users:** {member_count - bot_count}
+        if snapshot:
+            # Purana snapshot turant dikhao, stale ho to background mein naya banao
+            if age > Config.GROUP_STATS_TTL:
+                schedule_group_stats(client, chat_id)
+            await message.reply_text(render_group_stats(snapshot, age), reply_markup=GROUP_STATS_BUTTONS)
+            return
 
-📅 **Created:** {chat.date.strftime('%d %b %Y') if chat.date else 'N/A'}
-🔗 **Username:** @{chat.username if chat.username else 'Private'}
+        # Pehli baar: walk background mein, message walk khatam hone pe edit hoga
+        wait_msg = await message.reply_text("🔄 **Group stats collect ho rahe hain...**")
+        edit_when_collected(schedule_group_stats(client, chat_id), wait_msg, "❌ **Group stats nahi mil paaye!**")
 
-📈 **Activity:** High
-⚡ **Status:** Active
-"""
-        
-        buttons = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🔄 Refresh", callback_data="refresh_group_stats")],
-            [InlineKeyboardButton("📋 Export Data", callback_data="export_group_data")]
-        ])
-        
-        await message.reply_text(stats_text, reply_markup=buttons)
-        
     except Exception as e:
         await message.reply_text(f"❌ **Error:** {str(e)}")
 
-# --- AUTO RESPONDER FOR COMMON QUESTIONS ---
-@app.on_message(filters.group & filters.regex(r'(?i)(how|where|when).*(download|watch|get).*(movie|film|series)'))
-async def auto_respond_download(client: Client, message: Message):
-    """Auto respond to common download questions"""
-    if await is_group_admin(client, message.chat.id, message.from_user.id):
-        return
-    
-    response_text = """
-🔍 **Looking for Movies?**
-
-📌 **How to Find Movies:**
-1. Use proper format: `Movie Name (Year) [Language]`
-2. Check pinned messages for available content
-3. Use `/request` command for specific movies
-4. Browse through group files/search
-
-🚫 **Important:**
-• Direct download links are not allowed
-• Respect copyright laws
-• Support official platforms when possible
-
-🎬 **Official Platforms:**
-• Netflix, Amazon Prime, Hotstar
-• YouTube Movies, Google Play
-• Theater releases
-
-Need help? Ask admins politely! 😊
-"""
-    
-    response = await message.reply_text(response_text)
-    await asyncio.sleep(120)  # Delete after 2 minutes
-    await response.delete()
-
 # --- WELCOME MESSAGE IMPROVEMENT ---
 async def send_improved_welcome(client, chat_id, user):
     """Send improved welcome message with user photo"""
@@ -333,36 +536,33 @@ Enjoy your stay! 🍿
         print(f"Welcome error: {e}")
 
 # --- CALLBACK HANDLERS FOR NEW FEATURES ---
-@app.on_callback_query(filters.regex(r'^refresh_group_stats$'))
+@app.on_callback_query(filters.regex(r'^refresh_group_stats$'), group=OTHER_HANDLERS_GROUP)
 async def refresh_group_stats_callback(client, query):
     """Refresh group statistics"""
+    chat_id = query.message.chat.id
     try:
-        chat = await client.get_chat(query.message.chat.id)
-        member_count = await client.get_chat_members_count(query.message.chat.id)
-        
-        stats_text = f"""
-📊 **GROUP STATISTICS (Refreshed)**
-
-🏷️ **Name:** {chat.title}
-👥 **Members:** {member_count}
-📅 **Updated:** {datetime.datetime.now().strftime('%H:%M:%S')}
+        last = group_stats_refreshed.peek(chat_id, 0)
+        wait = Config.GROUP_STATS_REFRESH_COOLDOWN - (time.time() - last)
+        if wait > 0:
+            snapshot, age = get_group_stats_snapshot(chat_id)
+            if snapshot:
+                try:
+                    await query.message.edit_text(render_group_stats(snapshot, age), reply_markup=GROUP_STATS_BUTTONS)
+                except:
+                    pass
+            return await query.answer(f"⏳ {int(wait) + 1}s baad refresh karo!")
 
-🔧 **Bot Features Active:**
-✅ Spelling Correction
-✅ Auto Format Check
-✅ Movie Requests
-✅ AI Assistance
+        group_stats_refreshed.set(chat_id, time.time())
+        edit_when_collected(schedule_group_stats(client, chat_id), query.message)
+        await query.answer("🔄 Refresh ho raha hai...")
 
-⚡ **Status:** All Systems Operational
-"""
-        
-        await query.message.edit_text(stats_text)
-        await query.answer("✅ Stats refreshed!")
-        
     except Exception as e:
-        await query.answer("❌ Error refreshing stats!")
+        try:
+            await query.answer("❌ Error refreshing stats!")
+        except:
+            pass
 
-@app.on_callback_query(filters.regex(r'^show_rules$'))
+@app.on_callback_query(filters.regex(r'^show_rules$'), group=OTHER_HANDLERS_GROUP)
 async def show_rules_callback(client, query):
     """Show group rules"""
     rules_text = """
@@ -402,25 +602,7 @@ async def show_rules_callback(client, query):
     await query.answer("📜 Rules displayed!")
 
 # --- SCHEDULED MOVIE UPDATES ---
-async def scheduled_movie_updates(client: Client):
-    """Send scheduled movie updates to groups"""
-    while True:
-        try:
-            # Wait for 6 hours
-            await asyncio.sleep(6 * 3600)
-            
-            # Get all active groups
-            groups = await get_all_groups()
-            
-            for group_id in groups:
-                try:
-                    # Check if group is active
-                    group_data = await get_group(group_id)
-                    if not group_data or not group_data.get("active", True):
-                        continue
-                    
-                    # Send movie update
-                    update_text = """
+MOVIE_UPDATE_TEXT = """
 🎬 **DAILY MOVIE UPDATE** 🎬
 
 🌟 **New Releases:**
@@ -439,13 +621,14 @@ Watch **Kalki 2898 AD** for an epic sci-fi experience!
 
 Happy Watching! 🍿
 """
-                    
-                    await client.send_message(group_id, update_text)
-                    await asyncio.sleep(1)  # Avoid flood
-                    
-                except Exception as e:
-                    continue
-                    
-        except Exception as e:
-            print(f"Scheduled update error: {e}")
-            await asyncio.sleep(60)
+
+async def scheduled_movie_updates(run):
+    """Scheduler job (Config.MOVIE_UPDATE_CRON): sab active groups ko update bhejo.
+    Premium groups skip; crash ke baad `run.resume_after` se aage continue."""
+    from fanout import Fanout
+
+    async def send(chat_id):
+        await app.send_message(chat_id, MOVIE_UPDATE_TEXT)
+
+    fanout = Fanout("movie_updates", send, on_dead=deactivate_group, on_progress=run.checkpoint)
+    return await fanout.run(iter_broadcast_groups(after_id=run.resume_after))
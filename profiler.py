@@ -0,0 +1,68 @@
+import sys
+import time
+import threading
+from collections import Counter
+
+# ===================== SAMPLING PROFILER =====================
+# Alag thread event loop wale thread ka stack har `interval` sec pe sample karta hai.
+# Owner /profile command se on/off hota hai, band rehne pe koi cost nahi.
+
+class SamplingProfiler:
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 30):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self._target = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self.stacks.clear()
+        self.samples = 0
+        self.started_at = time.time()
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def top_functions(self, limit: int = 15) -> list:
+        """[(function, percent)] — jis function ke andar sabse zyada samples aaye (leaf)"""
+        leaves = Counter()
+        for stack, n in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += n
+        total = self.samples or 1
+        return [(fn, n * 100 / total) for fn, n in leaves.most_common(limit)]
+
+    def collapsed(self) -> str:
+        """flamegraph.pl / speedscope ke liye collapsed stacks"""
+        return "\n".join(f"{stack} {n}" for stack, n in self.stacks.most_common())
+
+profiler = SamplingProfiler()
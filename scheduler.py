@@ -0,0 +1,139 @@
+import asyncio
+import datetime
+import logging
+from config import Config
+from sharding import WORKER_ID
+
+logger = logging.getLogger(__name__)
+
+# ===================== CRON SCHEDULER =====================
+# Jobs cron spec pe chalte hain ("minute hour day month weekday", server time).
+# Agla run time Mongo (schedules) mein rehta hai, isliye restart se time drift nahi
+# hota aur miss hua slot restart ke baad turant chal jaata hai. Har run ka progress
+# record job_runs mein hai; run beech mein crash ho to agla worker wahin se resume karta hai.
+# Multi-worker mein job lease se sirf ek worker chalata hai.
+
+_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+def _parse_field(field: str, low: int, high: int) -> frozenset:
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/")
+            step = int(step)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = map(int, part.split("-"))
+        else:
+            start = end = int(part)
+        if not (low <= start <= end <= high) or step < 1:
+            raise ValueError(f"cron field out of range: {field}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+def parse_cron(spec: str) -> tuple:
+    """"0 */6 * * *" -> (minutes, hours, days, months, weekdays); weekday 0 = Sunday"""
+    fields = spec.split()
+    if len(fields) != 5:
+        raise ValueError(f"cron spec mein 5 fields chahiye: {spec!r}")
+    return tuple(_parse_field(f, lo, hi) for f, (lo, hi) in zip(fields, _FIELD_RANGES))
+
+def next_cron_time(spec: str, after: datetime.datetime) -> datetime.datetime:
+    """`after` ke baad ka pehla matching minute"""
+    minutes, hours, days, months, weekdays = parse_cron(spec)
+    start = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+    day = start.date()
+    for _ in range(366 * 5):
+        if day.month in months and day.day in days and (day.isoweekday() % 7) in weekdays:
+            for hour in sorted(hours):
+                for minute in sorted(minutes):
+                    candidate = datetime.datetime.combine(day, datetime.time(hour, minute))
+                    if candidate >= start:
+                        return candidate
+        day += datetime.timedelta(days=1)
+    raise ValueError(f"cron spec kabhi match nahi hota: {spec!r}")
+
+class JobRun:
+    """Ek scheduled run ka progress record (job_runs collection)"""
+
+    def __init__(self, doc: dict):
+        self.id = doc["_id"]
+        self.resume_after = doc.get("resume_after")
+        # Crash se pehle ke counts, resume hone pe inme jodte hain
+        self.base = dict(doc.get("stats") or {})
+
+    def total(self, stats: dict) -> dict:
+        keys = set(self.base) | set(stats)
+        return {k: self.base.get(k, 0) + stats.get(k, 0) for k in keys}
+
+    async def checkpoint(self, stats: dict, resume_after=None):
+        from database import update_job_run
+        fields = {"stats": self.total(stats)}
+        if resume_after is not None:
+            fields["resume_after"] = resume_after
+        await update_job_run(self.id, fields)
+
+async def _execute(name: str, slot: datetime.datetime, job):
+    from database import start_job_run, update_job_run, acquire_lease
+
+    doc = await start_job_run(name, slot, WORKER_ID)
+    if doc.get("status") == "done":
+        return
+    run = JobRun(doc)
+    if run.resume_after is not None:
+        logger.info(f"⏯ Job {name} resume ho raha hai ({run.resume_after} ke baad se)")
+
+    async def renew():
+        while True:
+            await asyncio.sleep(Config.LEASE_TTL / 3)
+            await acquire_lease(f"job:{name}", WORKER_ID, Config.LEASE_TTL)
+
+    renewer = asyncio.create_task(renew())
+    started = datetime.datetime.now()
+    try:
+        stats = await job(run) or {}
+        await update_job_run(run.id, {
+            "status": "done", "stats": run.total(stats), "finished_at": datetime.datetime.now()
+        })
+        logger.info(f"✅ Job {name} done in {datetime.datetime.now() - started}: {run.total(stats)}")
+    except Exception as e:
+        await update_job_run(run.id, {"status": "failed", "error": str(e), "finished_at": datetime.datetime.now()})
+        logger.error(f"❌ Job {name} fail: {e}")
+    finally:
+        renewer.cancel()
+
+async def run_schedule(name: str, spec: str, job, poll: float = 60):
+    """`job(run: JobRun)` ko cron spec pe chalao. Hamesha chalta rehta hai (background task)."""
+    from database import get_schedule, set_schedule, acquire_lease, release_lease
+
+    parse_cron(spec)  # galat spec startup pe hi pata chale
+    while True:
+        try:
+            schedule = await get_schedule(name)
+            now = datetime.datetime.now()
+            if not schedule or schedule.get("spec") != spec:
+                await set_schedule(name, spec, next_cron_time(spec, now))
+                continue
+
+            next_run = schedule["next_run"]
+            if now < next_run:
+                await asyncio.sleep(min((next_run - now).total_seconds(), poll))
+                continue
+
+            if not await acquire_lease(f"job:{name}", WORKER_ID, Config.LEASE_TTL):
+                # Koi aur worker chala raha hai
+                await asyncio.sleep(poll)
+                continue
+            try:
+                await _execute(name, next_run, job)
+                # Chhoote hue purane slots dobara nahi, seedha agla slot
+                await set_schedule(name, spec, next_cron_time(spec, max(datetime.datetime.now(), next_run)))
+            finally:
+                await release_lease(f"job:{name}", WORKER_ID)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Scheduler {name} error: {e}")
+            await asyncio.sleep(poll)
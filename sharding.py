@@ -0,0 +1,229 @@
+import os
+import hmac
+import time
+import inspect
+import zlib
+import asyncio
+import logging
+from io import BytesIO
+from aiohttp import web
+from pyrogram import raw, utils
+from pyrogram.raw.core import TLObject, Int
+from config import Config
+from metrics import SHARD_UPDATES, QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+# ===================== MULTI-WORKER SHARDING =====================
+# WORKERS > 1 pe har chat ka ek owner worker hai (chat id ka hash). Ek bot token ke kai
+# sessions mein Telegram update kisko deta hai, is par bharosa nahi karte: updates sirf
+# worker 0 (receiver) leta hai, baaki workers apni har API call InvokeWithoutUpdates ke
+# saath bhejte hain. Receiver har raw update dispatcher queue mein daalte waqt owner
+# dekhta hai — apna ho to yahin, warna owner worker ko (localhost HTTP, raw TL bytes).
+# Owner tak na pahunche (restart ho raha ho) to receiver khud handle karta hai, update
+# drop nahi hota. WORKERS = 1 pe sab kuch is worker ka.
+
+WORKER_ID = f"w{Config.WORKER_INDEX}"
+
+def shard_of(chat_id: int, workers: int = None) -> int:
+    workers = workers or Config.WORKERS
+    return zlib.crc32(str(chat_id).encode()) % workers
+
+def owns_chat(chat_id: int) -> bool:
+    return Config.WORKERS <= 1 or shard_of(chat_id) == Config.WORKER_INDEX
+
+def receives_updates() -> bool:
+    """Telegram se updates lene wala worker"""
+    return Config.WORKERS <= 1 or Config.WORKER_INDEX == 0
+
+def worker_port(index: int) -> int:
+    # Worker ke andar PORT uska apna port hai, isliye supervisor base alag se deta hai
+    base = os.getenv("WORKER_PORT_BASE") or int(os.getenv("PORT", "8080")) + 1
+    return int(base) + index
+
+def raw_update_chat_id(update):
+    """Raw update kis chat ka hai (private ho to user ka id) — Message.chat.id wala hi id"""
+    message = getattr(update, "message", None)
+    peer = getattr(message, "peer_id", None) or getattr(update, "peer", None)
+    if isinstance(peer, (raw.types.PeerUser, raw.types.PeerChat, raw.types.PeerChannel)):
+        return utils.get_peer_id(peer)
+    channel_id = getattr(update, "channel_id", None)
+    if isinstance(channel_id, int):
+        return utils.get_channel_id(channel_id)
+    chat_id = getattr(update, "chat_id", None)
+    if isinstance(chat_id, int):
+        return -chat_id
+    return None
+
+# type -> optional fields (__init__ default None)
+_optional_fields = {}
+
+def _write(obj) -> bytes:
+    """obj.write(), par Telegram se padhe object ke liye bhi sahi bytes.
+    pyrogram read() na aaye optional vector ko [] bana deta hai; write() uska flag
+    truthiness se lagata hai par body `is not None` pe likhta hai — bytes kharab ho jaate.
+    Likhte waqt aise [] fields None, phir wapas (local handlers [] hi dekhte hain)."""
+    cleared = []
+
+    def clear(o):
+        if isinstance(o, list):
+            for item in o:
+                clear(item)
+            return
+        if not isinstance(o, TLObject) or isinstance(o, (bytes, int, str)):
+            return
+        cls = type(o)
+        if cls not in _optional_fields:
+            params = inspect.signature(cls.__init__).parameters.values()
+            _optional_fields[cls] = tuple(p.name for p in params if p.default is None)
+        for name in _optional_fields[cls]:
+            if getattr(o, name, None) == []:
+                setattr(o, name, None)
+                cleared.append((o, name))
+        for name in o.__slots__:
+            clear(getattr(o, name, None))
+
+    clear(obj)
+    try:
+        return obj.write()
+    finally:
+        for o, name in cleared:
+            setattr(o, name, [])
+
+def encode_packets(packets: list) -> bytes:
+    """Dispatcher packets (update, users, chats) -> bytes: teen lists, har object length ke saath.
+    Har object apne alag buffer se padha jaata hai — pyrogram ka bina type wala Vector read
+    element ka type buffer mein bache bytes se andaaza lagata hai, peeche data ho to galat."""
+    users, chats = {}, {}
+    for _, u, c in packets:
+        users.update(u)
+        chats.update(c)
+    parts = []
+    for objects in ([update for update, _, _ in packets], list(users.values()), list(chats.values())):
+        parts.append(Int(len(objects)))
+        for obj in objects:
+            data = _write(obj)
+            parts.append(Int(len(data)))
+            parts.append(data)
+    return b"".join(parts)
+
+def _read_objects(b: BytesIO) -> list:
+    return [TLObject.read(BytesIO(b.read(Int.read(b)))) for _ in range(Int.read(b))]
+
+def decode_packets(body: bytes) -> list:
+    b = BytesIO(body)
+    updates = _read_objects(b)
+    users = {u.id: u for u in _read_objects(b)}
+    chats = {c.id: c for c in _read_objects(b)}
+    return [(update, users, chats) for update in updates]
+
+_session = None
+
+async def post_updates(index: int, body: bytes):
+    global _session
+    import aiohttp
+    if _session is None:
+        _session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=Config.SHARD_FORWARD_TIMEOUT))
+    async with _session.post(f"http://127.0.0.1:{worker_port(index)}/updates", data=body,
+                             headers={"X-Shard-Secret": Config.SHARD_SECRET}) as resp:
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}")
+
+class ShardQueue(asyncio.Queue):
+    """Dispatcher ki updates_queue. Client.handle_updates put_nowait karta hai — wahin
+    owner dekha jaata hai. Har owner worker ke liye ek outbox aur ek sender task,
+    isliye ek chat ke updates order mein pahunchte hain.
+    client: forward hoke aaye updates ke peers isi ke storage mein jaate hain."""
+
+    def __init__(self, index: int, workers: int, send=post_updates, client=None):
+        super().__init__()
+        self.index = index
+        self.workers = workers
+        self.send = send
+        self.client = client
+        self.outbox = {}    # worker -> pending packets
+        self.senders = {}   # worker -> sender task
+        QUEUE_DEPTH.set_function(lambda: sum(map(len, self.outbox.values())), queue="shard_outbox")
+
+    def put_nowait(self, packet):
+        # None = dispatcher stop signal
+        if packet is not None:
+            chat_id = raw_update_chat_id(packet[0])
+            owner = self.index if chat_id is None else shard_of(chat_id, self.workers)
+            if owner != self.index:
+                return self._forward(owner, packet)
+            SHARD_UPDATES.inc(result="local")
+        return super().put_nowait(packet)
+
+    def deliver(self, packet):
+        """Seedha is worker ke handlers tak (forward hoke aaya, ya owner tak nahi gaya)"""
+        super().put_nowait(packet)
+
+    def _forward(self, owner: int, packet):
+        pending = self.outbox.setdefault(owner, [])
+        if len(pending) >= Config.SHARD_OUTBOX_SIZE:
+            SHARD_UPDATES.inc(result="fallback")
+            return self.deliver(packet)
+        pending.append(packet)
+        task = self.senders.get(owner)
+        if task is None or task.done():
+            self.senders[owner] = asyncio.get_running_loop().create_task(self._flush(owner))
+
+    async def _flush(self, owner: int):
+        while self.outbox.get(owner):
+            batch = self.outbox.pop(owner)
+            try:
+                await self.send(owner, encode_packets(batch))
+                SHARD_UPDATES.inc(len(batch), result="forwarded")
+            except Exception as e:
+                logger.warning(f"Worker {owner} tak {len(batch)} updates nahi gaye ({e!r}), yahin handle")
+                SHARD_UPDATES.inc(len(batch), result="fallback")
+                for packet in batch:
+                    self.deliver(packet)
+
+    async def receive(self, request):
+        """POST /updates — receiver worker se aaye updates"""
+        secret = request.headers.get("X-Shard-Secret", "")
+        if not Config.SHARD_SECRET or not hmac.compare_digest(secret, Config.SHARD_SECRET):
+            return web.Response(status=403)
+        await self.accept(decode_packets(await request.read()))
+        return web.Response(text="OK")
+
+    async def accept(self, packets: list):
+        """Forward hoke aaye packets: pehle users/chats storage mein (access hash), phir dispatch.
+        Client.handle_updates yahi fetch_peers karta hai; forwarded updates woh raasta nahi lete,
+        warna naye user / chat pe reply, mute, ban peer resolve na hone se fail hote."""
+        if packets and self.client is not None:
+            # Ek batch ke sab packets ka users/chats dict ek hi hai (decode_packets)
+            _, users, chats = packets[0]
+            await self.client.fetch_peers(list(users.values()))
+            await self.client.fetch_peers(list(chats.values()))
+        for packet in packets:
+            self.deliver(packet)
+
+# ===================== EXACTLY-ONCE BACKGROUND JOBS =====================
+
+async def run_once_per_slot(name: str, interval: float, job) -> bool:
+    """Har `interval` seconds ke slot mein `job()` sirf ek worker chalaye.
+    Lease slot ke hisaab se naam li jaati hai, isliye job khatam hone ke baad
+    bhi usi slot mein koi dusra worker dobara nahi chalayega."""
+    from database import acquire_lease
+
+    slot = int(time.time() // interval)
+    lease = f"{name}:{slot}"
+    if not await acquire_lease(lease, WORKER_ID, Config.LEASE_TTL):
+        return False
+
+    async def renew():
+        while True:
+            await asyncio.sleep(Config.LEASE_TTL / 3)
+            await acquire_lease(lease, WORKER_ID, max(Config.LEASE_TTL, interval))
+
+    renewer = asyncio.create_task(renew())
+    try:
+        await job()
+    finally:
+        renewer.cancel()
+        # Slot khatam hone tak lease rakho
+        await acquire_lease(lease, WORKER_ID, max(1, (slot + 1) * interval - time.time()))
+    return True
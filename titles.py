@@ -0,0 +1,183 @@
+import re
+import string
+from matcher import fold_unicode
+
+# ===================== TITLE PARSER =====================
+# Pehle "clean format" ek bada regex tha ([...]+ ke baad optional year/season/episode
+# groups) jo fail hone wale lambe input pe har position pe backtrack karta tha.
+# Ab ek pass mein char check + whitespace tokens; har token pe sirf chhote (bounded)
+# patterns chalte hain. Cost message length mein linear hai.
+
+# Clean title mein sirf yeh chars (aur whitespace) allowed hain
+CLEAN_TITLE_CHARS = frozenset(string.ascii_letters + string.digits + "-:'&.")
+
+def is_clean_title(text: str) -> bool:
+    """"Kalki 2898 AD", "Mirzapur S02 E05" -> True; emoji / links / @ wale -> False"""
+    if not text:
+        return False
+    # set(text) C mein ek pass; bache hue (distinct) chars sirf whitespace hone chahiye
+    return all(c.isspace() for c in set(text).difference(CLEAN_TITLE_CHARS))
+
+# ===================== MOVIE QUERY PARSER =====================
+# Group message -> title / year / season / episode / quality / language ek pass mein.
+# Har whitespace word normalize hota hai (unicode fold, casefold, punctuation hatao)
+# aur constant kaam mein classify: junk, language, quality, tag (S02E05, season 2,
+# ep 5) ya title word. Tag patterns sirf MAX_TAG_LEN tak ke words pe chalte hain.
+# MovieQuery.key OMDb cache, /request dedup aur spelling suggestion teeno ka key hai.
+
+MAX_TAG_LEN = 12
+_NON_WORD = re.compile(r"[^\w]")
+_YEAR = re.compile(r"(?:19|20)\d\d")
+_NUMBER = re.compile(r"\d{1,3}")
+_TAG = re.compile(r"(?:s|season)(\d{1,2})(?:(?:e|ep|episode)(\d{1,3}))?|(?:e|ep|episode)(\d{1,3})")
+
+# "season 2", "ep 5" — agla word number ho to
+_SEASON_WORDS = frozenset(["s", "season", "seasons"])
+_EPISODE_WORDS = frozenset(["e", "ep", "episode", "episodes", "episod"])
+# "all episodes", "complete season" — season/episode word se pehle ho to title nahi
+_SERIES_PREFIX = frozenset(["all", "complete"])
+# Kabhi title nahi: "hd print", "cam rip"
+_NOISE_WORDS = frozenset(["print", "rip", "quality"])
+
+LANGUAGES = {
+    "hindi": "Hindi", "hin": "Hindi", "english": "English", "eng": "English",
+    "tamil": "Tamil", "telugu": "Telugu", "malayalam": "Malayalam", "kannada": "Kannada",
+    "marathi": "Marathi", "punjabi": "Punjabi", "bengali": "Bengali", "bangla": "Bengali",
+    "gujarati": "Gujarati", "korean": "Korean", "japanese": "Japanese",
+}
+
+QUALITIES = {
+    "360p": "360p", "480p": "480p", "720p": "720p", "hd": "720p",
+    "1080p": "1080p", "fhd": "1080p", "fullhd": "1080p",
+    "2160p": "2160p", "4k": "2160p", "uhd": "2160p",
+    "hdrip": "hdrip", "webrip": "webrip", "webdl": "webdl", "bluray": "bluray",
+    "brrip": "bluray", "dvdrip": "dvdrip", "camrip": "cam", "hdcam": "cam", "hdtc": "cam",
+}
+
+def _query_word(word: str) -> str:
+    """"Spider-Man," -> "spiderman" (unicode fold pehle ho chuka ho)"""
+    return _NON_WORD.sub("", word.casefold())
+
+def normalize_title(text: str) -> str:
+    """Title ka comparable form: "Spider-Man: No Way Home" -> "spiderman no way home" """
+    return " ".join(w for w in map(_query_word, fold_unicode(text).split()) if w)
+
+def _capitalize(word: str) -> str:
+    # str.title() "Don't" ko "Don'T" aur "KGF" ko "Kgf" bana deta hai
+    return word[:1].upper() + word[1:]
+
+class MovieQuery:
+    """parse_query ka result. key mein quality / language nahi hain —
+    "Pushpa 2 hindi 720p dedo" aur "pushpa 2 plz" ek hi cheez maang rahe hain."""
+
+    def __init__(self, title, title_key, year=None, season=None, episode=None,
+                 quality=None, language=None, junk=()):
+        self.title = title              # display: "Kalki 2898 AD"
+        self.title_key = title_key      # normalized: "kalki 2898 ad"
+        self.year = year
+        self.season = season
+        self.episode = episode
+        self.quality = quality
+        self.language = language
+        self.junk = list(junk)
+
+    @property
+    def key(self) -> str:
+        return "|".join("" if v is None else str(v) for v in (self.title_key, self.year, self.season, self.episode))
+
+    @property
+    def label(self) -> str:
+        """User ko dikhane wala sahi format: "Mirzapur (2018) S02 E05 [Hindi]" """
+        parts = [self.title]
+        if self.year:
+            parts.append(f"({self.year})")
+        if self.season is not None:
+            parts.append(f"S{self.season:02d}")
+        if self.episode is not None:
+            parts.append(f"E{self.episode:02d}")
+        if self.language:
+            parts.append(f"[{self.language}]")
+        return " ".join(p for p in parts if p)
+
+    def as_dict(self) -> dict:
+        return {
+            "title": self.title_key, "year": self.year, "season": self.season,
+            "episode": self.episode, "quality": self.quality, "language": self.language,
+            "key": self.key,
+        }
+
+    def __repr__(self):
+        return f"MovieQuery({self.as_dict()!r})"
+
+def _unclaimed(pending, raw_words, keys, junk_words):
+    """Season / episode word ke baad number nahi aaya. "S" / "E" akele title ka hissa
+    ho sakte hain; "episodes" jaise words (aur unse pehle "all") nahi."""
+    raw, word = pending
+    if len(word) == 1 and word not in junk_words:
+        raw_words.append(raw)
+        keys.append(word)
+    elif keys and keys[-1] in _SERIES_PREFIX:
+        raw_words.pop()
+        keys.pop()
+
+def parse_query(text: str, junk_words=frozenset()) -> MovieQuery:
+    """junk_words: yeh words title mein nahi jaate, `junk` mein aate hain (format warning ke liye).
+    Tag words (season, hd, 720p...) junk bhi ho sakte hain aur parse bhi hote hain."""
+    raw_words, keys, junk = [], [], []
+    season = episode = quality = language = None
+    pending = None      # ("season" | "episode", word) — agle number ka intezaar
+
+    for raw in fold_unicode(text).split():
+        word = _query_word(raw)
+        if not word:
+            continue
+
+        if pending is not None:
+            kind, prev = pending
+            pending = None
+            if _NUMBER.fullmatch(word):
+                if kind == "season":
+                    season = int(word)
+                else:
+                    episode = int(word)
+                continue
+            _unclaimed(prev, raw_words, keys, junk_words)
+
+        is_junk = word in junk_words
+        if is_junk and word not in junk:
+            junk.append(word)
+
+        if word in LANGUAGES:
+            language = LANGUAGES[word]
+        elif word in QUALITIES:
+            # Resolution (720p) source (webrip) se zyada kaam ki hai
+            if quality is None or QUALITIES[word].endswith("p"):
+                quality = QUALITIES[word]
+        elif word in _SEASON_WORDS or word in _EPISODE_WORDS:
+            pending = ("season" if word in _SEASON_WORDS else "episode", (raw, word))
+        elif len(word) <= MAX_TAG_LEN and (m := _TAG.fullmatch(word)):
+            if m.group(1):
+                season = int(m.group(1))
+                if m.group(2):
+                    episode = int(m.group(2))
+            else:
+                episode = int(m.group(3))
+        elif not is_junk and word not in _NOISE_WORDS:
+            raw_words.append(raw.strip(string.punctuation))
+            keys.append(word)
+
+    if pending is not None:
+        _unclaimed(pending[1], raw_words, keys, junk_words)
+
+    # Aakhri title word saal ho to woh year hai ("Pushpa 2 2024"), par akela "2012" title hai
+    year = None
+    if len(keys) > 1 and _YEAR.fullmatch(keys[-1]):
+        year = int(keys.pop())
+        raw_words.pop()
+
+    return MovieQuery(
+        title=" ".join(map(_capitalize, raw_words)),
+        title_key=" ".join(keys),
+        year=year, season=season, episode=episode,
+        quality=quality, language=language, junk=junk,
+    )
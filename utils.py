@@ -1,4 +1,5 @@
 import re
+import time
 import aiohttp
 import asyncio
 import difflib
@@ -6,6 +7,10 @@ import random
 from config import Config
 from typing import Optional
 from urllib.parse import quote
+from matcher import Matcher, link_form, token_form
+from cache import TTLCache
+from autodelete import schedule_delete
+from titles import is_clean_title, parse_query, normalize_title
 
 try:
     import g4f
@@ -38,6 +43,12 @@ ABUSE_WARNINGS = [
     "🚫 {name} bhai, abusive language? {count}/{limit} warnings. Careful raho!",
 ]
 
+FLOOD_WARNINGS = [
+    "🌊 {name} bhai, itne saare messages ek saath? Aaram se! Warning {count}/{limit}.",
+    "⏳ Oye {name}, spam mat karo. Ek baar likhna kaafi hai. {count}/{limit} warning.",
+    "🚫 {name}, same message baar baar? Warning {count}/{limit}. Dobara kiya to mute!",
+]
+
 SIMPLE_CORRECTIONS = [
     "Arrey {name} bhai! 🎬\n\nTune likha: *{original}*\nSahi format: *{correct}*\n\nBas naam likho, aur kuch nahi! 😄",
     "Oi {name}! 👋\n\nYe sahi format hai:\n✅ *{correct}*\n\n'{original}' se kaise search karega bot? 😅",
@@ -64,94 +75,100 @@ AI_THINKING = [
     "AI brain chal raha hai... ⚡",
 ]
 
+# ===================== QUALITY VOCABULARIES =====================
+
+LINK_MARKERS = [
+    "t.me/", "telegram.me/", "http://", "https://", "www.", ".com", ".in", ".net",
+    ".org", ".io", "joinchat", "bit.ly", "tinyurl"
+]
+
+ABUSE_WORDS = [
+    "mc", "bc", "bkl", "chutiya", "kutta", "fuck", "bitch", "porn",
+    "randi", "gand", "lund", "bhosda", "madarchod", "behenchod", "harami",
+    "bsdk", "gandu", "lavde", "motherfucker", "asshole", "bastard"
+]
+
+QUALITY_JUNK_WORDS = [
+    "dedo", "chahiye", "chaiye", "mangta", "bhej", "send", "kardo",
+    "karo", "plz", "pls", "please", "request", "link", "download",
+    "downlod", "movie", "film", "series", "season", "episode", "hd",
+    "480p", "720p", "1080p", "bhai", "bro", "sir", "admin", "yaar",
+    "mujhe", "mereko", "full", "dubbed", "dena", "chahie", "milega"
+]
+
+# Format check (validate_movie_format) ke words — quality junk se thoda bada set
+FORMAT_JUNK_WORDS = frozenset([
+    "dedo", "chahiye", "chaiye", "season", "bhejo", "send", "kardo", "karo", "do",
+    "plz", "pls", "please", "request", "mujhe", "mereko", "koi", "link",
+    "download", "movie", "film", "series", "full", "hd", "480p", "720p", "1080p",
+    "webseries", "episode", "dubbed", "episod", "movies", "dena", "admin", "yaar",
+    "upload", "uploded", "zaldi", "seassion", "post", "watch", "bhai", "bro",
+    "sir", "abhi", "jaldi", "chahie", "milega", "nahi"
+])
+
+# Matcher priority -> quality (bada number jeetta hai)
+QUALITY_LEVELS = {1: "JUNK", 2: "ABUSE", 3: "LINK"}
+
+# Itne ya zyada letters wale abuse words dusre words ke andar bhi pakde jaate hain
+ABUSE_SUBSTRING_LEN = 6
+
+def build_quality_matcher(abuse_words=ABUSE_WORDS, junk_words=QUALITY_JUNK_WORDS,
+                          link_markers=LINK_MARKERS) -> Matcher:
+    patterns = {}
+
+    def add(pattern, level):
+        if pattern.strip():
+            patterns[pattern] = max(patterns.get(pattern, 0), level)
+
+    for word in junk_words:
+        add(token_form(word), 1)
+    for word in abuse_words:
+        key = token_form(word)
+        add(key.strip() if len(key.strip()) >= ABUSE_SUBSTRING_LEN else key, 2)
+    for marker in link_markers:
+        add(link_form(marker), 3)
+    return Matcher(patterns)
+
+def quality_scan_text(text: str) -> str:
+    """Link markers raw (punctuation ke saath) form mein, words normalized token form mein"""
+    return link_form(text) + "\n" + token_form(text)
+
+DEFAULT_QUALITY_MATCHER = build_quality_matcher()
+
+# OMDb results MovieQuery.key pe (titles.py)
+omdb_cache = TTLCache("omdb", max_size=Config.OMDB_CACHE_SIZE, ttl=Config.OMDB_CACHE_TTL)
+
 # ===================== MAIN UTILS CLASS =====================
 
 class MovieBotUtils:
 
     # --- FORMAT VALIDATION ---
     @staticmethod
-    def validate_movie_format(text: str) -> dict:
-        text_lower = text.lower().strip()
-
-        junk_words_list = [
-            "dedo", "chahiye", "chaiye", "season", "bhejo", "send", "kardo", "karo", "do",
-            "plz", "pls", "please", "request", "mujhe", "mereko", "koi", "link",
-            "download", "movie", "film", "series", "full", "hd", "480p", "720p", "1080p",
-            "webseries", "episode", "dubbed", "episod", "movies", "dena", "admin", "yaar",
-            "upload", "uploded", "zaldi", "seassion", "post", "watch", "bhai", "bro",
-            "sir", "please", "abhi", "jaldi", "chahie", "milega", "nahi"
-        ]
-
-        languages = {'hindi', 'english', 'tamil', 'telugu', 'malayalam', 'kannada', 'marathi', 'punjabi'}
-
-        words = text_lower.split()
-        found_junk = []
-        detected_lang = ""
-        clean_words = []
-
-        for word in words:
-            clean_w = re.sub(r'[^\w]', '', word)
-            if clean_w in junk_words_list:
-                if clean_w not in found_junk:
-                    found_junk.append(clean_w)
-            elif clean_w in languages:
-                detected_lang = clean_w.title()
-            else:
-                clean_words.append(word)
-
-        clean_text = " ".join(clean_words).title()
-        correct_format = f"{clean_text} [{detected_lang}]" if detected_lang else clean_text
-
+    def validate_movie_format(text: str, junk_words=None) -> dict:
+        query = parse_query(text, FORMAT_JUNK_WORDS if junk_words is None else junk_words)
         return {
-            'is_valid': len(found_junk) == 0,
-            'found_junk': found_junk,
-            'clean_name': clean_text,
-            'correct_format': correct_format,
-            'search_query': clean_text.replace(" ", "+")
+            'is_valid': not query.junk,
+            'found_junk': query.junk,
+            'clean_name': query.title,
+            'correct_format': query.label,
+            'search_query': query.title.replace(" ", "+"),
+            'query': query,
         }
 
     # --- MESSAGE QUALITY CHECK ---
     @staticmethod
-    def check_message_quality(text: str) -> str:
-        text_lower = text.lower().strip()
-
-        # Link detection
-        link_patterns = [
-            r't\.me/', r'telegram\.me/', r'http://', r'https://',
-            r'www\.', r'\.com', r'\.in', r'\.net', r'\.org', r'\.io',
-            r'joinchat', r'bit\.ly', r'tinyurl'
-        ]
-        for p in link_patterns:
-            if re.search(p, text_lower):
-                return "LINK"
-
-        # Abuse detection
-        abuse_words = [
-            "mc", "bc", "bkl", "chutiya", "kutta", "fuck", "bitch", "porn",
-            "randi", "gand", "lund", "bhosda", "madarchod", "behenchod", "harami",
-            "bsdk", "gandu", "lavde", "motherfucker", "asshole", "bastard"
-        ]
-        words = text_lower.split()
-        for word in abuse_words:
-            if word in words:
-                return "ABUSE"
-
-        # Junk detection
-        junk_words = [
-            "dedo", "chahiye", "chaiye", "mangta", "bhej", "send", "kardo",
-            "karo", "plz", "pls", "please", "request", "link", "download",
-            "downlod", "movie", "film", "series", "season", "episode", "hd",
-            "480p", "720p", "1080p", "bhai", "bro", "sir", "admin", "yaar",
-            "mujhe", "mereko", "full", "dubbed", "dena", "chahie", "milega"
-        ]
-        for word in junk_words:
-            clean_words = [re.sub(r'[^\w]', '', w) for w in words]
-            if word in clean_words:
-                return "JUNK"
-
-        # Clean format check
-        clean_pattern = r'^[a-zA-Z0-9\s\-\:\'\&\.]+(?:\s\d{4})?(?:\s?[Ss]\d{1,2})?(?:\s?[Ee][Pp]?\d{1,2})?$'
-        if re.match(clean_pattern, text, re.IGNORECASE):
+    def check_message_quality(text: str, matcher: Matcher = None, deadline: float = None) -> str:
+        """deadline (time.thread_time) nikal gaya ho to scan ke baad seedha OVER_BUDGET
+        (IGNORE nahi — woh "dekha, kuch nahi mila" hai, yeh "dekha hi nahi")"""
+        # Link / abuse / junk: ek hi Aho-Corasick pass, normalized text pe
+        level = (matcher or DEFAULT_QUALITY_MATCHER).scan(quality_scan_text(text))
+        if level:
+            return QUALITY_LEVELS[level]
+        if deadline is not None and time.thread_time() > deadline:
+            return "OVER_BUDGET"
+
+        # Clean format check (linear, titles.py)
+        if is_clean_title(text):
             return "CLEAN"
 
         return "IGNORE"
@@ -172,6 +189,11 @@ class MovieBotUtils:
         msg = random.choice(ABUSE_WARNINGS)
         return msg.format(name=name, count=count, limit=limit)
 
+    @staticmethod
+    def get_flood_warning(name: str, count: int, limit: int) -> str:
+        msg = random.choice(FLOOD_WARNINGS)
+        return msg.format(name=name, count=count, limit=limit)
+
     @staticmethod
     def get_advanced_found_msg(name: str, original: str) -> str:
         msg = random.choice(ADVANCED_FOUND)
@@ -188,10 +210,12 @@ class MovieBotUtils:
 
     # --- OMDb INFO (WITH PHOTO) ---
     @staticmethod
-    async def get_omdb_info(movie_name: str) -> dict:
+    async def get_omdb_info(movie_name: str, year: int = None) -> dict:
         """Returns dict with text and poster_url"""
         try:
             url = f"http://www.omdbapi.com/?t={quote(movie_name)}&apikey={Config.OMDB_API_KEY}"
+            if year:
+                url += f"&y={year}"
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
                     data = await resp.json()
@@ -232,13 +256,29 @@ class MovieBotUtils:
                     "found": True,
                     "text": text,
                     "poster": poster if poster and poster != "N/A" else None,
-                    "title": title
+                    "title": title,
+                    "imdb_id": imdb_id
                 }
 
             return {"found": False, "text": "", "poster": None, "title": ""}
         except Exception as e:
             return {"found": False, "text": "", "poster": None, "title": ""}
 
+    @staticmethod
+    async def find_movie(query) -> dict:
+        """OMDb lookup, query.key pe cached: "pushpa 2 movie dedo" aur "Pushpa 2 plz" ek hi call.
+        Saal ke saath na mile to bina saal ke try. Not-found chhote TTL tak cache hota hai."""
+        async def load():
+            omdb = await MovieBotUtils.get_omdb_info(query.title, query.year)
+            if not omdb["found"] and query.year:
+                omdb = await MovieBotUtils.get_omdb_info(query.title)
+            return omdb
+
+        omdb = await omdb_cache.get_or_load(query.key, load)
+        if not omdb["found"]:
+            omdb_cache.set(query.key, omdb, ttl=Config.OMDB_MISS_TTL)
+        return omdb
+
     # --- AI RESPONSE ---
     @staticmethod
     async def get_ai_response(query: str, context: str = "") -> str:
@@ -287,14 +327,16 @@ class MovieBotUtils:
     # --- AUTO DELETE ---
     @staticmethod
     async def auto_delete_message(client, message, delay: int = Config.AUTO_DELETE_TIME):
-        await asyncio.sleep(delay)
-        try:
-            await client.delete_messages(message.chat.id, message.id)
-        except:
-            pass
+        """Delete schedule karke turant lautta hai (autodelete.py), sleep nahi karta"""
+        schedule_delete(client, message, delay)
 
     # --- SPELLING SUGGESTION ---
     @staticmethod
     def get_spelling_suggestion(user_text: str, movie_list: list) -> Optional[str]:
-        matches = difflib.get_close_matches(user_text, movie_list, n=1, cutoff=0.5)
-        return matches[0] if matches else None
+        """Dono taraf normalized title compare hota hai ("pushpa 2 dedo hindi" ~ "Pushpa 2: The Rule")"""
+        candidates = {}
+        for movie in movie_list:
+            candidates.setdefault(normalize_title(movie), movie)
+        title = parse_query(user_text, FORMAT_JUNK_WORDS).title_key or normalize_title(user_text)
+        matches = difflib.get_close_matches(title, list(candidates), n=1, cutoff=0.5)
+        return candidates[matches[0]] if matches else None
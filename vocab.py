@@ -0,0 +1,81 @@
+import re
+import itertools
+from collections import OrderedDict
+from config import Config
+from metrics import CACHE_REQUESTS, QUEUE_DEPTH
+from utils import (
+    ABUSE_WORDS, QUALITY_JUNK_WORDS, FORMAT_JUNK_WORDS, LINK_MARKERS, build_quality_matcher
+)
+
+# ===================== PER-CHAT FILTER VOCABULARY =====================
+# Admins apne group ke liye abuse/junk words add ya default words allow kar sakte hain.
+# Lists settings_col mein rehti hain (custom_abuse, custom_junk, allowed_words) aur har
+# change pe filters_version badhta hai. Compiled matcher version ke hisaab se cache hota
+# hai, isliye message path pe sirf ek dict lookup lagta hai — rebuild tabhi jab list badle.
+
+WORD_KINDS = ("abuse", "junk")
+
+_WORD_RE = re.compile(r"^[\w@$.\-]{2,32}$")
+
+def normalize_word(word: str):
+    """Admin ka diya word clean karo; invalid ho to None"""
+    word = word.strip().casefold()
+    return word if _WORD_RE.match(word) else None
+
+def is_default_word(word: str) -> bool:
+    return word in ABUSE_WORDS or word in QUALITY_JUNK_WORDS or word in FORMAT_JUNK_WORDS
+
+def has_custom_words(settings: dict) -> bool:
+    return bool(settings.get("custom_abuse") or settings.get("custom_junk") or settings.get("allowed_words"))
+
+# Har ChatVocab ka unique key (analysis memo isi pe keyed hai; list badli = naya object = naya key)
+_vocab_keys = itertools.count(1)
+
+class ChatVocab:
+    """Ek chat ka compiled vocabulary: quality matcher + format junk set"""
+    __slots__ = ("key", "version", "matcher", "format_junk")
+
+    def __init__(self, version: int, custom_abuse=(), custom_junk=(), allowed=()):
+        allowed = set(allowed)
+        abuse = [w for w in ABUSE_WORDS if w not in allowed] + list(custom_abuse)
+        junk = [w for w in QUALITY_JUNK_WORDS if w not in allowed] + list(custom_junk)
+        self.key = next(_vocab_keys)
+        self.version = version
+        self.matcher = build_quality_matcher(abuse, junk, LINK_MARKERS)
+        self.format_junk = (FORMAT_JUNK_WORDS - allowed) | set(custom_junk)
+
+class VocabCache:
+    """chat_id -> ChatVocab, LRU bounded. Default vocabulary wale chats cache mein nahi aate."""
+
+    def __init__(self, max_size: int = None):
+        self.max_size = max_size or Config.VOCAB_CACHE_SIZE
+        self.entries = OrderedDict()
+        QUEUE_DEPTH.set_function(lambda: len(self.entries), queue="vocab_cache")
+
+    def get(self, chat_id, settings: dict):
+        """Chat ka ChatVocab, ya None agar chat default lists use karta hai"""
+        if not has_custom_words(settings):
+            self.entries.pop(chat_id, None)
+            return None
+
+        version = settings.get("filters_version", 0)
+        vocab = self.entries.get(chat_id)
+        if vocab is not None and vocab.version == version:
+            self.entries.move_to_end(chat_id)
+            CACHE_REQUESTS.inc(cache="vocab", result="hit")
+            return vocab
+
+        CACHE_REQUESTS.inc(cache="vocab", result="miss")
+        vocab = ChatVocab(
+            version,
+            settings.get("custom_abuse", []),
+            settings.get("custom_junk", []),
+            settings.get("allowed_words", []),
+        )
+        self.entries[chat_id] = vocab
+        self.entries.move_to_end(chat_id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return vocab
+
+vocab_cache = VocabCache()